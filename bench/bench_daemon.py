@@ -0,0 +1,83 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC)
+
+from corpus import generate_site
+from daemon_client import send_request
+
+# Latency of rebuilding one edited page three ways: a fresh `main.py --incremental`
+# process, the thin client process talking to a warm daemon, and a bare socket
+# request to the daemon (the rebuild itself without interpreter startup).
+
+
+def edit_page(path, round_number):
+    with open(path, "a") as f:
+        f.write(f"\nEdit number {round_number}.\n")
+
+
+def run_quietly(command):
+    subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+
+
+def wait_for_socket(socket_path, process, timeout=120):
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(socket_path):
+        if process.poll() is not None or time.monotonic() > deadline:
+            raise RuntimeError("Build daemon did not start")
+        time.sleep(0.05)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm daemon rebuild latency against a cold CLI rebuild")
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--paragraphs", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        generate_site(root, args.pages, args.paragraphs)
+        page = os.path.join("section0", "page0", "index.md")
+        page_path = os.path.join(root, "content", page)
+        socket_path = os.path.join(root, "daemon.sock")
+        timings = {"cli --incremental": [], "thin client": [], "socket request": []}
+
+        run_quietly([sys.executable, os.path.join(SRC, "main.py"), "/", "--root", root, "--incremental"])
+        daemon = subprocess.Popen(
+            [sys.executable, os.path.join(SRC, "daemon.py"), "/", "--root", root, "--socket", socket_path],
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            wait_for_socket(socket_path, daemon)
+            for round_number in range(args.repeat):
+                edit_page(page_path, round_number)
+                start = time.perf_counter()
+                run_quietly([sys.executable, os.path.join(SRC, "main.py"), "/", "--root", root, "--incremental"])
+                timings["cli --incremental"].append(time.perf_counter() - start)
+
+                edit_page(page_path, round_number)
+                start = time.perf_counter()
+                run_quietly([sys.executable, os.path.join(SRC, "daemon_client.py"), page, "--socket", socket_path])
+                timings["thin client"].append(time.perf_counter() - start)
+
+                edit_page(page_path, round_number)
+                start = time.perf_counter()
+                send_request(socket_path, {"command": "rebuild", "paths": [page]})
+                timings["socket request"].append(time.perf_counter() - start)
+        finally:
+            send_request(socket_path, {"command": "shutdown"})
+            daemon.wait()
+
+    print(f"{args.pages} pages, {args.paragraphs} paragraphs each, one page edited per round")
+    for name, runs in timings.items():
+        print(f"{name:<20} median {statistics.median(runs) * 1000:9.2f} ms  min {min(runs) * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
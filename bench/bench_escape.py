@@ -0,0 +1,104 @@
+import argparse
+import os
+import random
+import sys
+import time
+from html import escape
+from html.parser import HTMLParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import htmlnode
+import leafnode
+from corpus import page_markdown
+from website_handler import markdown_to_html_node
+
+# Cost of escaping text and attribute values while rendering, against rendering raw and
+# escaping afterwards with a parse-and-reserialize pass over the finished HTML.
+
+
+class PostPassEscaper(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.parts = []
+
+    def handle_starttag(self, tag, attrs):
+        self.parts.append(f"<{tag}" + "".join(f' {key}="{escape(value or "")}"' for key, value in attrs) + ">")
+
+    def handle_endtag(self, tag):
+        self.parts.append(f"</{tag}>")
+
+    def handle_data(self, data):
+        self.parts.append(escape(data, quote=False))
+
+    def handle_entityref(self, name):
+        self.parts.append(f"&{name};")
+
+    def handle_charref(self, name):
+        self.parts.append(f"&#{name};")
+
+
+def post_pass(html):
+    escaper = PostPassEscaper()
+    escaper.feed(html)
+    escaper.close()
+    return "".join(escaper.parts)
+
+
+def render_all(documents):
+    return [markdown_to_html_node(document).to_html() for document in documents]
+
+
+def render_unescaped(documents):
+    # The renderer as it was before escaping moved into it.
+    saved = (leafnode.escape_text, htmlnode.escape_attribute)
+    leafnode.escape_text = htmlnode.escape_attribute = lambda value: value
+    htmlnode.href_attribute.cache_clear()
+    htmlnode.image_attributes.cache_clear()
+    try:
+        return render_all(documents)
+    finally:
+        leafnode.escape_text, htmlnode.escape_attribute = saved
+        htmlnode.href_attribute.cache_clear()
+        htmlnode.image_attributes.cache_clear()
+
+
+def best_time(function, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Escape-on-render against an escaping post-pass")
+    parser.add_argument("--documents", type=int, default=500)
+    parser.add_argument("--paragraphs", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    # The corpus has no markup characters of its own; give it some ampersands.
+    documents = [
+        page_markdown(rng, f"Page {index}", args.paragraphs).replace(" and _", " & _")
+        for index in range(args.documents)
+    ]
+    raw = best_time(lambda: render_unescaped(documents), args.repeat)
+    on_render = best_time(lambda: render_all(documents), args.repeat)
+    unescaped = render_unescaped(documents)
+    if [post_pass(html) for html in unescaped] != render_all(documents):
+        raise RuntimeError("Post-pass and escape-on-render disagree")
+    post = best_time(lambda: [post_pass(html) for html in unescaped], args.repeat)
+    megabytes = sum(len(html) for html in unescaped) / 1e6
+
+    print(f"{args.documents} documents, {megabytes:.1f} MB of HTML")
+    print(f"{'render, no escaping':<28} {raw * 1000:9.1f} ms")
+    print(f"{'render, escape on render':<28} {on_render * 1000:9.1f} ms  (+{(on_render - raw) * 1000:.1f} ms)")
+    print(f"{'render, then post-pass':<28} {(raw + post) * 1000:9.1f} ms  (+{post * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import gc
+import os
+import random
+import resource
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from block_handler import BlockType, parse_blocks
+from corpus import page_markdown
+from inline_handler import text_to_textnodes
+from website_handler import markdown_to_html_node
+
+NODE_TYPES = ("TextNode", "HTMLNode", "LeafNode", "ParentNode")
+
+
+def build(markdown):
+    text_nodes = [
+        text_to_textnodes(" ".join(block.lines))
+        for block in parse_blocks(markdown)
+        if block.block_type == BlockType.PARAGRAPH
+    ]
+    return text_nodes, markdown_to_html_node(markdown)
+
+
+def count_nodes():
+    counts = dict.fromkeys(NODE_TYPES, 0)
+    for obj in gc.get_objects():
+        name = type(obj).__name__
+        if name in counts:
+            counts[name] += 1
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak memory for a large synthetic document")
+    parser.add_argument("--paragraphs", type=int, default=50000)
+    args = parser.parse_args()
+
+    markdown = page_markdown(random.Random(0), "Memory", args.paragraphs)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    document = build(markdown)
+    elapsed = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    counts = count_nodes()
+    del document
+    gc.collect()
+
+    tracemalloc.start()
+    document = build(markdown)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"document: {len(markdown) / 1e6:.1f} MB markdown, {args.paragraphs} paragraphs")
+    print(f"build time: {elapsed:.2f}s")
+    print(f"peak RSS: {rss_after / 1024:.1f} MiB (+{(rss_after - rss_before) / 1024:.1f} MiB for the build)")
+    print(f"traced: {current / 2**20:.1f} MiB retained, {peak / 2**20:.1f} MiB peak")
+    for name, count in counts.items():
+        print(f"{name:<12} {count:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from corpus import generate_site
+from website_handler import generate_pages_recursive
+
+
+def time_build(content_dir, template_path, destination_dir, jobs):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_pages_recursive(content_dir, template_path, destination_dir, "/", jobs=jobs)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Page generation throughput at increasing worker counts")
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--paragraphs", type=int, default=20)
+    parser.add_argument("--jobs", type=int, nargs="*", default=None)
+    args = parser.parse_args()
+
+    cpu_count = os.cpu_count() or 1
+    worker_counts = args.jobs or sorted({1, 2, 4, cpu_count})
+    with tempfile.TemporaryDirectory() as tmpdir:
+        content_dir, template_path = generate_site(tmpdir, args.pages, args.paragraphs)
+        print(f"{args.pages} pages, {args.paragraphs} paragraphs each, {cpu_count} CPUs")
+        baseline = None
+        for jobs in worker_counts:
+            destination_dir = os.path.join(tmpdir, f"docs-{jobs}")
+            elapsed = time_build(content_dir, template_path, destination_dir, jobs)
+            baseline = baseline or elapsed
+            print(
+                f"jobs={jobs:<3} {elapsed:8.3f}s {args.pages / elapsed:10.1f} pages/s"
+                f"  speedup {baseline / elapsed:5.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import argparse
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC)
+
+from corpus import generate_site
+
+# Requests per second from the preview server: every page once while the render cache
+# is cold, then the same pages again warm, then warm with If-None-Match (304s).
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def wait_for_port(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError("Preview server did not start")
+            time.sleep(0.05)
+
+
+def fetch(port, path, etag=None):
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    try:
+        connection.request("GET", path, headers={"If-None-Match": etag} if etag else {})
+        response = connection.getresponse()
+        response.read()
+        if response.status not in (200, 304):
+            raise RuntimeError(f"{path}: HTTP {response.status}")
+        return response.getheader("ETag")
+    finally:
+        connection.close()
+
+
+def load(port, paths, concurrency, etags=None):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        if etags is None:
+            results = list(executor.map(lambda path: fetch(port, path), paths))
+        else:
+            results = list(executor.map(lambda path: fetch(port, path, etags[path]), paths))
+    elapsed = time.perf_counter() - start
+    return dict(zip(paths, results)), len(paths) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold and warm request throughput of the preview server")
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--paragraphs", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=3, help="warm passes over every page")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        generate_site(root, args.pages, args.paragraphs)
+        paths = [f"/section{page % 10}/page{page}/" for page in range(args.pages)]
+        port = free_port()
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                os.path.join(SRC, "preview.py"),
+                "/",
+                "--root",
+                root,
+                "--port",
+                str(port),
+                "--cache-pages",
+                str(args.pages),
+            ],
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            wait_for_port(port, server)
+            etags, cold = load(port, paths, args.concurrency)
+            warm = load(port, paths * args.rounds, args.concurrency)[1]
+            not_modified = load(port, paths * args.rounds, args.concurrency, etags)[1]
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"{args.pages} pages, {args.paragraphs} paragraphs each, {args.concurrency} concurrent clients")
+    print(f"{'cold (render)':<20} {cold:9.0f} requests/s")
+    print(f"{'warm (cached)':<20} {warm:9.0f} requests/s")
+    print(f"{'warm (304)':<20} {not_modified:9.0f} requests/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from block_cache import BlockCache
+from corpus import page_markdown
+from render_api import render_many, render_markdown
+
+# Documents per second through render_many at several batch sizes: one call per
+# document as a baseline, a serial batch, a batch on a worker pool started once, and a
+# batch answered from a warm input cache.
+
+
+def snippets(count, paragraphs, seed=0):
+    rng = random.Random(seed)
+    return [page_markdown(rng, f"Snippet {index}", paragraphs) for index in range(count)]
+
+
+def best_rate(function, documents, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(documents)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(documents) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch rendering throughput of render_many")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1, 100, 10000])
+    parser.add_argument("--paragraphs", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{args.paragraphs} paragraphs per document, pool of {args.jobs} workers")
+    print(f"{'batch':>7} {'per call':>12} {'serial':>12} {'pool':>12} {'warm cache':>12}  documents/s")
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        # Start the workers before timing anything.
+        render_many(snippets(args.jobs * 64, 1), executor=executor)
+        for size in args.sizes:
+            documents = snippets(size, args.paragraphs, seed=size)
+            cache = BlockCache()
+            render_many(documents, cache=cache)
+            rates = (
+                best_rate(lambda batch: [render_markdown(document) for document in batch], documents, args.repeat),
+                best_rate(render_many, documents, args.repeat),
+                best_rate(lambda batch: render_many(batch, executor=executor), documents, args.repeat),
+                best_rate(lambda batch: render_many(batch, cache=cache), documents, args.repeat),
+            )
+            print(f"{size:>7} " + " ".join(f"{rate:12.0f}" for rate in rates))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import argparse
+import json
+import sys
+
+
+def compare(baseline, candidate, threshold):
+    regressions = []
+    print(f"{'stage':<24} {'baseline':>10} {'candidate':>10} {'change':>8}")
+    for name, base in baseline["stages"].items():
+        if name not in candidate["stages"]:
+            print(f"{name:<24} {base['seconds']:10.4f} {'missing':>10}")
+            continue
+        new = candidate["stages"][name]
+        change = new["seconds"] / base["seconds"] - 1 if base["seconds"] else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<24} {base['seconds']:10.4f} {new['seconds']:10.4f} {change:+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flag stages that got slower between two bench/run.py results")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown as a fraction (default 0.10)")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    if baseline.get("corpus") != candidate.get("corpus"):
+        print("warning: results were produced from different corpora")
+    regressions = compare(baseline, candidate, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} stage(s) regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
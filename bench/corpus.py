@@ -0,0 +1,115 @@
+import argparse
+import os
+import random
+
+WORDS = (
+    "ring hobbit shire wizard elf dwarf mountain river forest road tower "
+    "king sword song star shadow light council journey gate ship"
+).split()
+
+# Share of blocks of each kind (the rest are paragraphs) and the chance that a
+# sentence carries each kind of inline markup.
+DEFAULT_DENSITY = {
+    "heading": 0.1,
+    "list": 0.15,
+    "code": 0.05,
+    "quote": 0.05,
+    "emphasis": 0.5,
+    "link": 0.2,
+    "image": 0.05,
+}
+
+TEMPLATE = (
+    "<!doctype html>\n<html>\n  <head>\n    <title>{{ Title }}</title>\n"
+    '    <link href="/index.css" rel="stylesheet" />\n  </head>\n\n'
+    "  <body>\n    <article>{{ Content }}</article>\n  </body>\n</html>"
+)
+
+
+def words(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def sentence(rng, length, density=DEFAULT_DENSITY):
+    parts = [words(rng, length).capitalize()]
+    if rng.random() < density["emphasis"]:
+        parts.append(f"with **bold {rng.choice(WORDS)}** and _{rng.choice(WORDS)}_ and `{rng.choice(WORDS)}`")
+    if rng.random() < density["link"]:
+        parts.append(f"see [{rng.choice(WORDS)}](/blog/{rng.choice(WORDS)})")
+    if rng.random() < density["image"]:
+        parts.append(f"![{rng.choice(WORDS)}](/images/{rng.choice(WORDS)}.png)")
+    return " ".join(parts) + "."
+
+
+def block_markdown(rng, density=DEFAULT_DENSITY):
+    roll = rng.random()
+    if roll < density["heading"]:
+        return f"{'#' * rng.randint(2, 4)} {words(rng, 4).capitalize()}"
+    roll -= density["heading"]
+    if roll < density["list"]:
+        if rng.random() < 0.5:
+            return "\n".join(f"- {sentence(rng, 6, density)}" for _ in range(rng.randint(2, 6)))
+        return "\n".join(f"{index}. {sentence(rng, 6, density)}" for index in range(1, rng.randint(3, 7)))
+    roll -= density["list"]
+    if roll < density["code"]:
+        lines = [f"    {words(rng, 3).replace(' ', '_')}({rng.randint(0, 99)})" for _ in range(rng.randint(2, 8))]
+        return "```\n" + "\n".join(lines) + "\n```"
+    roll -= density["code"]
+    if roll < density["quote"]:
+        return "\n".join(f"> {sentence(rng, 8, density)}" for _ in range(rng.randint(1, 3)))
+    return "\n".join(sentence(rng, 12, density) for _ in range(rng.randint(1, 4)))
+
+
+def page_markdown(rng, title, paragraphs, density=DEFAULT_DENSITY):
+    blocks = [f"# {title}"]
+    blocks.extend(block_markdown(rng, density) for _ in range(paragraphs))
+    return "\n\n".join(blocks) + "\n"
+
+
+def generate_site(root, pages, paragraphs=20, seed=0, density=DEFAULT_DENSITY):
+    rng = random.Random(seed)
+    content_dir = os.path.join(root, "content")
+    for page in range(pages):
+        page_dir = os.path.join(content_dir, f"section{page % 10}", f"page{page}")
+        os.makedirs(page_dir, exist_ok=True)
+        with open(os.path.join(page_dir, "index.md"), "w") as f:
+            f.write(page_markdown(rng, f"Page {page}", paragraphs, density))
+
+    static_dir = os.path.join(root, "static", "images")
+    os.makedirs(static_dir, exist_ok=True)
+    with open(os.path.join(root, "static", "index.css"), "w") as f:
+        f.write("body { font-family: serif; }\n")
+    for name in WORDS[:4]:
+        with open(os.path.join(static_dir, f"{name}.png"), "wb") as f:
+            f.write(rng.randbytes(4096))
+
+    template_path = os.path.join(root, "template.html")
+    with open(template_path, "w") as f:
+        f.write(TEMPLATE)
+    return content_dir, template_path
+
+
+def parse_density(values):
+    density = dict(DEFAULT_DENSITY)
+    for value in values or []:
+        key, _, amount = value.partition("=")
+        if key not in density:
+            raise ValueError(f"Unknown density key: {key}")
+        density[key] = float(amount)
+    return density
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a deterministic synthetic site")
+    parser.add_argument("root")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--paragraphs", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--density", nargs="*", metavar="KIND=SHARE", help=f"override {sorted(DEFAULT_DENSITY)}")
+    args = parser.parse_args()
+    generate_site(args.root, args.pages, args.paragraphs, args.seed, parse_density(args.density))
+    print(f"Wrote {args.pages} pages to {args.root}")
+
+
+if __name__ == "__main__":
+    main()
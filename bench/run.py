@@ -0,0 +1,120 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from corpus import DEFAULT_DENSITY, generate_site, parse_density
+from block_handler import BlockType, block_to_block_type, markdown_to_blocks, parse_blocks
+from inline_handler import text_to_textnodes
+from website_handler import find_pages, generate_page, markdown_to_html_node
+import main as site_main
+
+
+def inline_texts(block):
+    lines = block.lines
+    if block.block_type == BlockType.PARAGRAPH:
+        return [" ".join(lines)]
+    if block.block_type == BlockType.HEADING:
+        return [lines[0].lstrip("#")[1:]]
+    if block.block_type == BlockType.QUOTE:
+        return [" ".join(line.lstrip(">").lstrip(" ") for line in lines)]
+    if block.block_type in (BlockType.UNORDERED_LIST, BlockType.ORDERED_LIST):
+        return [line.split(" ", 1)[1] for line in lines]
+    return []
+
+
+def time_stage(function, repeat):
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            function()
+        runs.append(time.perf_counter() - start)
+    return runs
+
+
+def run_benchmarks(root, repeat):
+    content_dir = os.path.join(root, "content")
+    template_path = os.path.join(root, "template.html")
+    output_dir = os.path.join(root, "bench-output")
+    pages = find_pages(content_dir, output_dir)
+    markdowns = []
+    for _, source_path, _ in pages:
+        with open(source_path) as f:
+            markdowns.append(f.read())
+    block_texts = [block for markdown in markdowns for block in markdown_to_blocks(markdown)]
+    texts = [text for markdown in markdowns for block in parse_blocks(markdown) for text in inline_texts(block)]
+    html_nodes = [markdown_to_html_node(markdown) for markdown in markdowns]
+
+    def build_site():
+        site_main.main(["/", "--root", root, "--clean"])
+
+    stages = {
+        "markdown_to_blocks": (lambda: [markdown_to_blocks(markdown) for markdown in markdowns], len(markdowns)),
+        "block_to_block_type": (lambda: [block_to_block_type(block) for block in block_texts], len(block_texts)),
+        "text_to_textnodes": (lambda: [text_to_textnodes(text) for text in texts], len(texts)),
+        "markdown_to_html_node": (lambda: [markdown_to_html_node(markdown) for markdown in markdowns], len(markdowns)),
+        "to_html": (lambda: [node.to_html() for node in html_nodes], len(html_nodes)),
+        "generate_page": (
+            lambda: [
+                generate_page(source_path, template_path, destination_path, "/")
+                for _, source_path, destination_path in pages
+            ],
+            len(pages),
+        ),
+        "main": (build_site, len(pages)),
+    }
+    results = {}
+    for name, (function, items) in stages.items():
+        runs = time_stage(function, repeat)
+        median = statistics.median(runs)
+        results[name] = {
+            "seconds": median,
+            "min_seconds": min(runs),
+            "runs": runs,
+            "items": items,
+            "per_item_us": median / items * 1e6 if items else 0.0,
+        }
+        print(f"{name:<24} {median:9.4f}s  {results[name]['per_item_us']:10.2f} us/item  ({items} items)")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time each stage of the site build on a synthetic corpus")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--paragraphs", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--density", nargs="*", metavar="KIND=SHARE", help=f"override {sorted(DEFAULT_DENSITY)}")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    density = parse_density(args.density)
+    with tempfile.TemporaryDirectory() as root:
+        generate_site(root, args.pages, args.paragraphs, args.seed, density)
+        stages = run_benchmarks(root, args.repeat)
+
+    results = {
+        "corpus": {"pages": args.pages, "paragraphs": args.paragraphs, "seed": args.seed, "density": density},
+        "repeat": args.repeat,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "stages": stages,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
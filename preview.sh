@@ -0,0 +1 @@
+python3 src/preview.py "/static-site-generator/"
\ No newline at end of file
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+from asset_sync import scan_files, sync_directory
+from manifest import hash_file
+
+FINGERPRINT_LENGTH = 6
+# Files fetched by a fixed name (favicon.ico, robots.txt, ...) keep it.
+FINGERPRINT_EXTENSIONS = frozenset(
+    (".css", ".js", ".mjs", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".avif", ".woff", ".woff2", ".ttf")
+)
+ASSET_MANIFEST_NAME = "asset-manifest.json"
+
+
+def fingerprint_name(relative_path, file_hash):
+    stem, extension = os.path.splitext(relative_path)
+    return f"{stem}.{file_hash[:FINGERPRINT_LENGTH]}{extension}"
+
+
+def hash_static_files(static_dir, cache_path):
+    # sha256 of every static file, reusing the cached digest while a file's size and
+    # mtime are unchanged so large images are not read again.
+    try:
+        with open(cache_path, "r") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        cached = {}
+    hashes = {}
+    entries = {}
+    for relative_path, file_stat in scan_files(static_dir).items():
+        signature = [file_stat.st_mtime_ns, file_stat.st_size]
+        entry = cached.get(relative_path)
+        if entry is not None and entry[:2] == signature:
+            file_hash = entry[2]
+        else:
+            file_hash = hash_file(os.path.join(static_dir, relative_path))
+        hashes[relative_path] = file_hash
+        entries[relative_path] = signature + [file_hash]
+    if entries != cached:
+        cache_directory = os.path.dirname(cache_path)
+        if cache_directory:
+            os.makedirs(cache_directory, exist_ok=True)
+        temporary_path = f"{cache_path}.tmp"
+        with open(temporary_path, "w") as f:
+            json.dump(entries, f, sort_keys=True)
+        os.replace(temporary_path, cache_path)
+    return hashes
+
+
+class AssetMap:
+    # Maps root-relative asset URLs to their fingerprinted URLs. digest identifies the
+    # whole mapping so it can be part of render cache keys.
+    def __init__(self, files):
+        self.files = files
+        self.urls = {
+            "/" + source.replace(os.sep, "/"): "/" + destination.replace(os.sep, "/")
+            for source, destination in files.items()
+        }
+        digest = hashlib.sha256()
+        for url, fingerprinted_url in sorted(self.urls.items()):
+            digest.update(f"{url}\0{fingerprinted_url}\0".encode("utf-8"))
+        self.digest = digest.hexdigest()[:16]
+
+    def rewrite(self, url):
+        path, separator, rest = url.partition("#")
+        path, query_separator, query = path.partition("?")
+        fingerprinted = self.urls.get(path)
+        if fingerprinted is None:
+            return url
+        if query_separator:
+            fingerprinted = f"{fingerprinted}?{query}"
+        if separator:
+            fingerprinted = f"{fingerprinted}#{rest}"
+        return fingerprinted
+
+    def to_json(self):
+        return json.dumps(self.urls, indent=1, sort_keys=True)
+
+    def __repr__(self):
+        return f"AssetMap({len(self.urls)} assets, {self.digest})"
+
+
+def build_asset_map(static_dir, cache_path):
+    hashes = hash_static_files(static_dir, cache_path)
+    files = {
+        relative_path: fingerprint_name(relative_path, file_hash)
+        for relative_path, file_hash in hashes.items()
+        if os.path.splitext(relative_path)[1].lower() in FINGERPRINT_EXTENSIONS
+    }
+    return AssetMap(files)
+
+
+def write_asset_manifest(destination_dir, assets):
+    path = os.path.join(destination_dir, ASSET_MANIFEST_NAME)
+    data = assets.to_json()
+    try:
+        with open(path, "r") as f:
+            if f.read() == data:
+                return
+    except OSError:
+        pass
+    temporary_path = os.path.join(destination_dir, f".{ASSET_MANIFEST_NAME}.tmp")
+    with open(temporary_path, "w") as f:
+        f.write(data)
+    os.replace(temporary_path, path)
+
+
+def sync_fingerprinted_assets(static_dir, destination_dir, assets, protected=(), verify_hash=False):
+    result = sync_directory(
+        static_dir,
+        destination_dir,
+        protected=[*protected, ASSET_MANIFEST_NAME],
+        verify_hash=verify_hash,
+        renames=assets.files,
+    )
+    write_asset_manifest(destination_dir, assets)
+    return result
@@ -0,0 +1,149 @@
+from concurrent.futures import ThreadPoolExecutor
+from manifest import hash_file
+import os
+import shutil
+import tracing
+
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+COPY_WORKERS = 8
+
+
+def scan_files(directory, suffix=""):
+    files = {}
+    pending = [(directory, "")]
+    while pending:
+        current, prefix = pending.pop()
+        with os.scandir(current) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append((entry.path, f"{prefix}{entry.name}{os.sep}"))
+                elif entry.name.endswith(suffix) and entry.is_file():
+                    files[f"{prefix}{entry.name}"] = entry.stat()
+    return files
+
+
+def copy_file_contents(source_path, destination_path):
+    with open(source_path, "rb") as source, open(destination_path, "wb") as destination:
+        source_fd = source.fileno()
+        destination_fd = destination.fileno()
+        remaining = os.fstat(source_fd).st_size
+        if hasattr(os, "copy_file_range"):
+            try:
+                while remaining > 0:
+                    copied = os.copy_file_range(source_fd, destination_fd, min(remaining, COPY_CHUNK_SIZE))
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                return
+            except OSError:
+                pass
+        if hasattr(os, "sendfile"):
+            try:
+                offset = os.lseek(source_fd, 0, os.SEEK_CUR)
+                while remaining > 0:
+                    sent = os.sendfile(destination_fd, source_fd, offset, min(remaining, COPY_CHUNK_SIZE))
+                    if sent == 0:
+                        break
+                    offset += sent
+                    remaining -= sent
+                return
+            except OSError:
+                pass
+        source.seek(0)
+        destination.seek(0)
+        destination.truncate()
+        shutil.copyfileobj(source, destination, COPY_CHUNK_SIZE)
+
+
+def copy_file(source_path, destination_path):
+    with tracing.span("copy_file", {"path": source_path}):
+        copy_file_atomically(source_path, destination_path)
+    tracing.count("bytes_copied", os.path.getsize(destination_path))
+
+
+def copy_file_atomically(source_path, destination_path):
+    destination_directory = os.path.dirname(destination_path)
+    if os.path.isdir(destination_path):
+        shutil.rmtree(destination_path)
+    os.makedirs(destination_directory, exist_ok=True)
+    temporary_path = os.path.join(destination_directory, f".{os.path.basename(destination_path)}.tmp")
+    try:
+        copy_file_contents(source_path, temporary_path)
+        shutil.copystat(source_path, temporary_path)
+        os.replace(temporary_path, destination_path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+
+def file_is_current(source_path, source_stat, destination_path, destination_stat, verify_hash):
+    if destination_stat is None or destination_stat.st_size != source_stat.st_size:
+        return False
+    if destination_stat.st_mtime_ns == source_stat.st_mtime_ns:
+        return True
+    if not verify_hash:
+        return False
+    if hash_file(source_path) != hash_file(destination_path):
+        return False
+    # A hard-linked destination, such as a staged copy of a live file, shares its inode
+    # and so its metadata with the other link; leave it alone.
+    if destination_stat.st_nlink == 1:
+        shutil.copystat(source_path, destination_path)
+    return True
+
+
+def remove_empty_directories(directory):
+    for root, _, _ in os.walk(directory, topdown=False):
+        if root != directory:
+            try:
+                os.rmdir(root)
+            except OSError:
+                pass
+
+
+def sync_directory(source_dir, destination_dir, protected=(), verify_hash=False, workers=COPY_WORKERS, renames=None):
+    # renames maps a source relative path to a different destination relative path.
+    with tracing.span("sync_directory", {"source": source_dir}):
+        return sync_directory_contents(source_dir, destination_dir, protected, verify_hash, workers, renames or {})
+
+
+def sync_directory_contents(source_dir, destination_dir, protected, verify_hash, workers, renames):
+    if not os.path.exists(source_dir):
+        raise ValueError(f"Source directory does not exist: {source_dir}")
+    os.makedirs(destination_dir, exist_ok=True)
+
+    source_files = scan_files(source_dir)
+    destination_files = scan_files(destination_dir)
+    protected = set(protected)
+
+    to_copy = []
+    unchanged = 0
+    expected = set()
+    for relative_path, source_stat in source_files.items():
+        destination_relative_path = renames.get(relative_path, relative_path)
+        expected.add(destination_relative_path)
+        source_path = os.path.join(source_dir, relative_path)
+        destination_path = os.path.join(destination_dir, destination_relative_path)
+        destination_stat = destination_files.get(destination_relative_path)
+        if file_is_current(source_path, source_stat, destination_path, destination_stat, verify_hash):
+            unchanged += 1
+        else:
+            to_copy.append((source_path, destination_path))
+
+    deleted = 0
+    for relative_path in destination_files:
+        if relative_path in expected or relative_path in protected:
+            continue
+        os.remove(os.path.join(destination_dir, relative_path))
+        deleted += 1
+
+    if to_copy:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for _ in executor.map(lambda paths: copy_file(*paths), to_copy):
+                pass
+    if deleted:
+        remove_empty_directories(destination_dir)
+
+    print(f"Synced {source_dir} -> {destination_dir}: copied {len(to_copy)}, unchanged {unchanged}, deleted {deleted}")
+    return {"copied": len(to_copy), "unchanged": unchanged, "deleted": deleted}
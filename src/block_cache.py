@@ -0,0 +1,82 @@
+from collections import OrderedDict
+import itertools
+import os
+import weakref
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+STAT_NAMES = ("hits", "misses", "evictions")
+
+_cache_ids = itertools.count()
+# Pool workers rebuild a cache from its id, so every chunk of pages sent to the same
+# process shares one set of entries instead of a fresh pickled copy. Worker copies are
+# held for the life of the process; caches created here go away with their owner.
+_process_caches = weakref.WeakValueDictionary()
+_worker_caches = {}
+
+
+class BlockCache:
+    # In-memory LRU of rendered block HTML keyed by (render key, block type, block text).
+    # It lives as long as its process: a command-line build starts empty, and only a
+    # long-running watcher or build daemon reuses blocks from one rebuild to the next.
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_id = (os.getpid(), next(_cache_ids))
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.stats = dict.fromkeys(STAT_NAMES, 0)
+        _process_caches[self.cache_id] = self
+
+    def __getstate__(self):
+        return {"cache_id": self.cache_id, "max_bytes": self.max_bytes}
+
+    def __setstate__(self, state):
+        existing = _process_caches.get(state["cache_id"]) or _worker_caches.get(state["cache_id"])
+        if existing is not None:
+            self.__dict__ = existing.__dict__
+            return
+        self.cache_id = state["cache_id"]
+        self.max_bytes = state["max_bytes"]
+        self.entries = OrderedDict()
+        self.size = 0
+        self.stats = dict.fromkeys(STAT_NAMES, 0)
+        _worker_caches[self.cache_id] = self
+
+    def get(self, key):
+        html = self.entries.get(key)
+        if html is None:
+            self.stats["misses"] += 1
+            return None
+        self.entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return html
+
+    def put(self, key, html):
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.size -= len(key[2]) + len(previous)
+        self.entries[key] = html
+        self.size += len(key[2]) + len(html)
+        while self.size > self.max_bytes and self.entries:
+            old_key, old_html = self.entries.popitem(last=False)
+            self.size -= len(old_key[2]) + len(old_html)
+            self.stats["evictions"] += 1
+
+    def take_stats(self):
+        stats = self.stats
+        self.stats = dict.fromkeys(STAT_NAMES, 0)
+        return stats
+
+    def merge_stats(self, stats):
+        for name, amount in stats.items():
+            self.stats[name] += amount
+
+    def summary(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        hit_rate = self.stats["hits"] / lookups if lookups else 0.0
+        return (
+            f"Block cache: {self.stats['hits']} hits, {self.stats['misses']} misses "
+            f"({hit_rate:.1%} hit rate), {self.stats['evictions']} evicted"
+        )
+
+    def __repr__(self):
+        return f"BlockCache({len(self.entries)} entries, {self.size} bytes)"
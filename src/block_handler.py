@@ -8,46 +8,116 @@ class BlockType(Enum):
     UNORDERED_LIST = "unordered_list"
     ORDERED_LIST = "ordered_list"
 
-def markdown_to_blocks(markdown):
-	blocks = markdown.split("\n\n")
-	filtered_blocks = []
-	for block in blocks:
-		stripped_block = block.strip()
-		if stripped_block != "":
-			filtered_blocks.append(stripped_block)
-	return filtered_blocks
 
-def block_to_block_type(block):
-    if block.startswith("#"):
-        heading_level = 0
-        while heading_level < len(block) and block[heading_level] == "#":
-            heading_level += 1
-
-        if (
-            heading_level >= 1
-            and heading_level <= 6
-            and heading_level < len(block)
-            and block[heading_level] == " "
-        ):
-            return BlockType.HEADING
-
-    if block.startswith("```\n") and block.endswith("```"):
-        return BlockType.CODE
+class Block:
+    __slots__ = ("block_type", "lines", "start_line", "end_line")
 
-    lines = block.split("\n")
+    def __init__(self, block_type, lines, start_line, end_line):
+        self.block_type = block_type
+        self.lines = lines
+        self.start_line = start_line
+        self.end_line = end_line
 
-    if all(line.startswith(">") for line in lines):
-        return BlockType.QUOTE
+    @property
+    def text(self):
+        return "\n".join(self.lines)
 
-    if all(line.startswith("- ") for line in lines):
-        return BlockType.UNORDERED_LIST
+    def __eq__(self, other):
+        return (
+            self.block_type == other.block_type
+            and self.lines == other.lines
+            and self.start_line == other.start_line
+            and self.end_line == other.end_line
+        )
+
+    def __repr__(self):
+        return f"Block({self.block_type.value}, {self.lines}, {self.start_line}, {self.end_line})"
 
+
+def heading_level(line):
+    level = 0
+    while level < len(line) and line[level] == "#":
+        level += 1
+    if 1 <= level <= 6 and level < len(line) and line[level] == " ":
+        return level
+    return 0
+
+
+def lines_to_block_type(lines):
+    first_line = lines[0]
+    if first_line.startswith("#") and heading_level(first_line):
+        return BlockType.HEADING
+    if first_line == "```" and len(lines) > 1 and lines[-1].endswith("```"):
+        return BlockType.CODE
+
+    is_quote = True
+    is_unordered_list = True
     is_ordered_list = True
     for index, line in enumerate(lines, start=1):
-        if not line.startswith(f"{index}. "):
+        if is_quote and not line.startswith(">"):
+            is_quote = False
+        if is_unordered_list and not line.startswith("- "):
+            is_unordered_list = False
+        if is_ordered_list and not line.startswith(f"{index}. "):
             is_ordered_list = False
-            break
-    if is_ordered_list:
-        return BlockType.ORDERED_LIST
+        if not (is_quote or is_unordered_list or is_ordered_list):
+            return BlockType.PARAGRAPH
+    if is_quote:
+        return BlockType.QUOTE
+    if is_unordered_list:
+        return BlockType.UNORDERED_LIST
+    return BlockType.ORDERED_LIST
 
-    return BlockType.PARAGRAPH
\ No newline at end of file
+
+def make_block(lines, start_line):
+    # Equivalent to "\n".join(lines).strip(): whitespace-only lines at either end are
+    # dropped and the remaining outer lines are stripped on their outer side.
+    first = 0
+    last = len(lines) - 1
+    while first <= last and not lines[first].strip():
+        first += 1
+    while last >= first and not lines[last].strip():
+        last -= 1
+    if first > last:
+        return None
+    block_lines = lines[first : last + 1]
+    block_lines[0] = block_lines[0].lstrip()
+    block_lines[-1] = block_lines[-1].rstrip()
+    return Block(lines_to_block_type(block_lines), block_lines, start_line + first, start_line + last)
+
+
+def iter_blocks(lines):
+    group = []
+    group_start = 1
+    for line_number, line in enumerate(lines, start=1):
+        if line:
+            if not group:
+                group_start = line_number
+            group.append(line)
+            continue
+        if group:
+            block = make_block(group, group_start)
+            if block is not None:
+                yield block
+            group = []
+    if group:
+        block = make_block(group, group_start)
+        if block is not None:
+            yield block
+
+
+def parse_blocks(markdown):
+    return list(iter_blocks(markdown.split("\n")))
+
+
+def text_to_block(block):
+    lines = block.split("\n")
+    return Block(lines_to_block_type(lines), lines, 1, len(lines))
+
+
+def markdown_to_blocks(markdown):
+    return [block.text for block in parse_blocks(markdown)]
+
+
+def block_to_block_type(block):
+    return lines_to_block_type(block.split("\n"))
@@ -0,0 +1,166 @@
+import argparse
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+
+from daemon_client import default_socket_path
+from main import build, parse_args, project_paths
+from watch import SiteWatcher, file_signature
+from website_handler import *
+
+
+class BuildDaemon:
+    # Keeps the compiled template, the content and static snapshots and the block cache
+    # of a SiteWatcher alive between requests. Rebuilds are serialized by a lock.
+    def __init__(self, paths, basepath):
+        self.paths = paths
+        self.watcher = SiteWatcher(paths, basepath)
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def content_relative_path(self, path):
+        if os.path.isabs(path):
+            path = os.path.relpath(path, self.paths["content"])
+        path = os.path.normpath(path)
+        if path.startswith(os.pardir) or not path.endswith(".md"):
+            raise ValueError(f"Not a content page: {path}")
+        return path
+
+    def rebuild(self, paths):
+        start = time.perf_counter()
+        relative_paths = sorted({self.content_relative_path(path) for path in paths})
+        watcher = self.watcher
+        rebuilt, removed = [], []
+        for relative_path in relative_paths:
+            source_path, destination_path = watcher.page_paths(relative_path)
+            if os.path.exists(source_path):
+                rebuilt.append(relative_path)
+            else:
+                remove_output(destination_path, self.paths["docs"])
+                watcher.content.pop(relative_path, None)
+                watcher.failed_pages.pop(relative_path, None)
+                removed.append(relative_path)
+        generate_pages(
+            [watcher.page_paths(relative_path) for relative_path in rebuilt],
+            self.paths["template"],
+            watcher.basepath,
+            block_cache=watcher.block_cache,
+        )
+        for relative_path in rebuilt:
+            watcher.content[relative_path] = file_signature(watcher.page_paths(relative_path)[0])
+            watcher.failed_pages.pop(relative_path, None)
+        return {"pages": rebuilt, "removed": removed, "seconds": time.perf_counter() - start}
+
+    def rebuild_all(self):
+        start = time.perf_counter()
+        watcher = self.watcher
+        pages = find_pages(self.paths["content"], self.paths["docs"])
+        page_outputs = [os.path.relpath(page_path, self.paths["docs"]) for _, _, page_path in pages]
+        sync_directory(self.paths["static"], self.paths["docs"], protected=page_outputs)
+        generate_pages(
+            [(source_path, destination_path) for _, source_path, destination_path in pages],
+            self.paths["template"],
+            watcher.basepath,
+            block_cache=watcher.block_cache,
+        )
+        watcher.template = file_signature(self.paths["template"])
+        watcher.content = watcher.content_scanner.scan()
+        watcher.static = watcher.static_scanner.scan()
+        watcher.failed_pages.clear()
+        watcher.failed_assets.clear()
+        return {"pages": len(pages), "seconds": time.perf_counter() - start}
+
+    def rebuild_changed(self):
+        start = time.perf_counter()
+        result = self.watcher.poll() or {"pages": [], "assets": [], "removed": []}
+        result["seconds"] = time.perf_counter() - start
+        return result
+
+    def status(self):
+        block_cache = self.watcher.block_cache
+        return {
+            "pid": os.getpid(),
+            "requests": self.requests,
+            "pages": len(self.watcher.content),
+            "assets": len(self.watcher.static),
+            "block_cache_entries": len(block_cache.entries),
+            "block_cache_bytes": block_cache.size,
+            "block_cache": dict(block_cache.stats),
+        }
+
+    def handle(self, request):
+        command = request.get("command")
+        with self.lock:
+            self.requests += 1
+            if command == "rebuild":
+                return self.rebuild(request.get("paths", []))
+            if command == "rebuild_all":
+                return self.rebuild_all()
+            if command == "rebuild_changed":
+                return self.rebuild_changed()
+            if command == "status":
+                return self.status()
+        raise ValueError(f"Unknown command: {command}")
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, daemon):
+        self.build_daemon = daemon
+        super().__init__(socket_path, DaemonRequestHandler)
+
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+            if request.get("command") == "shutdown":
+                response = {"ok": True, "result": "shutting down"}
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+            else:
+                response = {"ok": True, "result": self.server.build_daemon.handle(request)}
+        except Exception as error:
+            response = {"ok": False, "error": str(error)}
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+def serve(daemon, socket_path):
+    os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    server = DaemonServer(socket_path, daemon)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Keep the site build warm and rebuild on request over a Unix socket")
+    parser.add_argument("basepath", nargs="?", default="/")
+    parser.add_argument("--root", default=os.path.join(os.path.dirname(__file__), ".."))
+    parser.add_argument("--socket", help="socket to listen on (default .build-cache/daemon.sock under --root)")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    paths = project_paths(args.root)
+    build(parse_args([args.basepath, "--root", args.root, "--incremental"]), paths)
+    socket_path = args.socket or default_socket_path(args.root)
+    daemon = BuildDaemon(paths, args.basepath)
+    print(f"Build daemon listening on {socket_path}", flush=True)
+    try:
+        serve(daemon, socket_path)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
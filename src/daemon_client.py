@@ -0,0 +1,66 @@
+import argparse
+import json
+import os
+import socket
+import sys
+
+# Kept free of the site modules so a request costs interpreter startup plus one
+# round trip, not the import chain and a cold parse.
+
+
+def default_socket_path(root_path):
+    return os.path.abspath(os.path.join(root_path, ".build-cache", "daemon.sock"))
+
+
+def send_request(socket_path, request, timeout=None):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(socket_path)
+        client.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with client.makefile("rb") as reader:
+            line = reader.readline()
+    if not line:
+        raise ConnectionError(f"Build daemon at {socket_path} closed the connection without replying")
+    return json.loads(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ask a running build daemon to rebuild pages")
+    parser.add_argument("paths", nargs="*", help="content files to rebuild, relative to content/ or absolute")
+    parser.add_argument("--root", default=os.path.join(os.path.dirname(__file__), ".."))
+    parser.add_argument("--socket", help="daemon socket (default .build-cache/daemon.sock under --root)")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--all", action="store_true", help="rebuild every page and resync static files")
+    group.add_argument("--changed", action="store_true", help="rebuild whatever changed since the last request")
+    group.add_argument("--status", action="store_true", help="show what the daemon holds in memory")
+    group.add_argument("--stop", action="store_true", help="shut the daemon down")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    if args.all:
+        request = {"command": "rebuild_all"}
+    elif args.changed:
+        request = {"command": "rebuild_changed"}
+    elif args.status:
+        request = {"command": "status"}
+    elif args.stop:
+        request = {"command": "shutdown"}
+    elif args.paths:
+        request = {"command": "rebuild", "paths": [os.path.abspath(path) if os.path.exists(path) else path for path in args.paths]}
+    else:
+        parser.error("give content paths to rebuild, or one of --all, --changed, --status, --stop")
+
+    socket_path = args.socket or default_socket_path(args.root)
+    try:
+        response = send_request(socket_path, request)
+    except OSError as error:
+        print(f"Could not reach the build daemon at {socket_path}: {error}")
+        return 2
+    if not response.get("ok"):
+        print(f"Daemon error: {response.get('error')}")
+        return 1
+    print(json.dumps(response.get("result"), indent=1, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
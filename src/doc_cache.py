@@ -0,0 +1,98 @@
+import hashlib
+import os
+import zlib
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+STAT_NAMES = ("hits", "misses", "bytes_read", "bytes_written", "evictions")
+
+
+class DocumentCache:
+    # Rendered page bodies stored zlib-compressed under cache_dir/<2 hex>/<sha256>.
+    # Entries are touched on every hit so eviction can drop the least recently used.
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.stats = dict.fromkeys(STAT_NAMES, 0)
+
+    def key(self, markdown, render_key):
+        digest = hashlib.sha256(render_key.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(markdown.encode("utf-8"))
+        return digest.hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def get(self, key):
+        path = self.entry_path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            html = zlib.decompress(data).decode("utf-8")
+        except (OSError, zlib.error, UnicodeDecodeError):
+            self.stats["misses"] += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.stats["hits"] += 1
+        self.stats["bytes_read"] += len(data)
+        return html
+
+    def put(self, key, html):
+        path = self.entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = zlib.compress(html.encode("utf-8"), 1)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as f:
+            f.write(data)
+        os.replace(temporary_path, path)
+        self.stats["bytes_written"] += len(data)
+
+    def take_stats(self):
+        stats = self.stats
+        self.stats = dict.fromkeys(STAT_NAMES, 0)
+        return stats
+
+    def merge_stats(self, stats):
+        for name, amount in stats.items():
+            self.stats[name] += amount
+
+    def prune(self):
+        if not os.path.isdir(self.cache_dir):
+            return 0
+        entries = []
+        total = 0
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                entry_stat = entry.stat()
+                entries.append((entry_stat.st_mtime_ns, entry_stat.st_size, entry.path))
+                total += entry_stat.st_size
+        if total <= self.max_bytes:
+            return 0
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        self.stats["evictions"] += evicted
+        return evicted
+
+    def summary(self):
+        stats = self.stats
+        return (
+            f"Document cache: {stats['hits']} hits, {stats['misses']} misses, "
+            f"{stats['bytes_read']} bytes read, {stats['bytes_written']} bytes written, "
+            f"{stats['evictions']} evicted"
+        )
+
+    def __repr__(self):
+        return f"DocumentCache({self.cache_dir}, {self.max_bytes})"
@@ -1,22 +1,70 @@
+from functools import lru_cache
+from sys import intern
+
+# Most attributes come from links and images, and the same URLs recur on every page.
+ATTRIBUTE_CACHE_SIZE = 4096
+
+
+def escape_text(text):
+    # Chained replace beats str.translate several times over on CPython, and text
+    # without any of the three characters is returned untouched.
+    if "&" not in text and "<" not in text and ">" not in text:
+        return text
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def escape_attribute(value):
+    if "&" not in value and "<" not in value and ">" not in value and '"' not in value:
+        return value
+    return value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
+
+# Values are converted with str() first, as the f-string did before escaping, so
+# programmatic props such as {"width": 100} keep working. The caches are typed so that
+# 1, 1.0 and True, which compare equal, do not share an entry.
+@lru_cache(maxsize=ATTRIBUTE_CACHE_SIZE, typed=True)
+def href_attribute(href):
+    return f' href="{escape_attribute(str(href))}"'
+
+
+@lru_cache(maxsize=ATTRIBUTE_CACHE_SIZE, typed=True)
+def image_attributes(src, alt):
+    return f' src="{escape_attribute(str(src))}" alt="{escape_attribute(str(alt))}"'
+
+
 class HTMLNode:
+    # Sites build millions of nodes, so skip the per-instance __dict__. Nodes without
+    # attributes share None rather than each holding an empty dict.
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
-        self.tag = tag
+        self.tag = intern(tag) if tag else tag
         self.value = value
         self.children = children
         self.props = props
     
     def to_html(self):
         raise NotImplementedError("to_html method not implemented for HTMLNode")
+
+    def iter_html(self):
+        raise NotImplementedError("iter_html method not implemented for HTMLNode")
+
+    def write_html(self, fp):
+        for chunk in self.iter_html():
+            fp.write(chunk)
     
     def props_to_html(self):
-        if not self.props:
+        props = self.props
+        if not props:
             return ""
-        result = ""
-        for key, value in self.props.items():
-            result += f' {key}="{value}"'
-        return result
+        shape = tuple(props)
+        if shape == ("href",):
+            return href_attribute(props["href"])
+        if shape == ("src", "alt"):
+            return image_attributes(props["src"], props["alt"])
+        return "".join(f' {key}="{escape_attribute(str(value))}"' for key, value in props.items())
     
     def __repr__(self):
         return f"HTMLNode({self.tag}, {self.value}, {self.children}, {self.props})"
     
-    
\ No newline at end of file
+    
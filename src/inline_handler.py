@@ -1,6 +1,18 @@
 from textnode import TextNode, TextType
 import re
 
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+DELIMITER_PATTERN = re.compile(r"\*\*|[*_`]")
+# Applied in this order, matching the split_nodes_delimiter passes of the multipass engine.
+DELIMITER_LEVELS = (
+    ("**", TextType.BOLD),
+    ("*", TextType.ITALIC),
+    ("_", TextType.ITALIC),
+    ("`", TextType.CODE),
+)
+
+
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     new_nodes = []
     for node in old_nodes:
@@ -25,11 +37,11 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
     return new_nodes
 
 def extract_markdown_images(text):
-    matches = re.findall(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    matches = IMAGE_PATTERN.findall(text)
     return matches
 
 def extract_markdown_links(text):
-    matches = re.findall(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    matches = LINK_PATTERN.findall(text)
     return matches
 
 def split_nodes_image(old_nodes):
@@ -128,7 +140,7 @@ def split_nodes_link(old_nodes):
     # Return all transformed nodes.
     return new_nodes
 
-def text_to_textnodes(text):
+def text_to_textnodes_multipass(text):
     nodes = [TextNode(text, TextType.TEXT)]
     nodes = split_nodes_image(nodes)
     nodes = split_nodes_link(nodes)
@@ -136,4 +148,94 @@ def text_to_textnodes(text):
     nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
     nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
     nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    return nodes
\ No newline at end of file
+    return nodes
+
+def lowest_error_level(error_level, other_error_level):
+    if error_level is None:
+        return other_error_level
+    if other_error_level is None:
+        return error_level
+    return min(error_level, other_error_level)
+
+
+def split_delimited_range(text, start, end, tokens, first_token, last_token, level, nodes):
+    # Returns the lowest delimiter level with an unmatched delimiter, or None.
+    matches = None
+    while first_token < last_token:
+        delimiter, text_type = DELIMITER_LEVELS[level]
+        matches = [index for index in range(first_token, last_token) if tokens[index][1] == delimiter]
+        if matches:
+            break
+        level += 1
+    if not matches:
+        if start < end:
+            nodes.append(TextNode(text[start:end], TextType.TEXT))
+        return None
+    if len(matches) % 2 != 0:
+        return level
+
+    error_level = None
+    piece_start = start
+    piece_first_token = first_token
+    for number, index in enumerate(matches):
+        position = tokens[index][0]
+        if number % 2 == 0:
+            piece_error = split_delimited_range(
+                text, piece_start, position, tokens, piece_first_token, index, level + 1, nodes
+            )
+            error_level = lowest_error_level(error_level, piece_error)
+        elif piece_start < position:
+            nodes.append(TextNode(text[piece_start:position], text_type))
+        piece_start = position + len(delimiter)
+        piece_first_token = index + 1
+
+    piece_error = split_delimited_range(
+        text, piece_start, end, tokens, piece_first_token, last_token, level + 1, nodes
+    )
+    return lowest_error_level(error_level, piece_error)
+
+
+def tokenize_delimiters(text, start, end, nodes):
+    if start >= end:
+        return None
+    tokens = [(match.start(), match.group()) for match in DELIMITER_PATTERN.finditer(text, start, end)]
+    return split_delimited_range(text, start, end, tokens, 0, len(tokens), 0, nodes)
+
+
+def tokenize_links(text, start, end, nodes):
+    error_level = None
+    position = start
+    for match in LINK_PATTERN.finditer(text, start, end):
+        segment_error = tokenize_delimiters(text, position, match.start(), nodes)
+        error_level = lowest_error_level(error_level, segment_error)
+        nodes.append(TextNode(match.group(1), TextType.LINK, match.group(2)))
+        position = match.end()
+    segment_error = tokenize_delimiters(text, position, end, nodes)
+    return lowest_error_level(error_level, segment_error)
+
+
+def text_to_textnodes_single_pass(text):
+    # One scan for images, links in the gaps between them, and delimiter tokens in the
+    # remaining text. Produces exactly what the multipass engine produces, including
+    # which delimiter is reported when several are unbalanced.
+    nodes = []
+    if "[" not in text:
+        error_level = tokenize_delimiters(text, 0, len(text), nodes)
+    else:
+        error_level = None
+        position = 0
+        for match in IMAGE_PATTERN.finditer(text):
+            segment_error = tokenize_links(text, position, match.start(), nodes)
+            error_level = lowest_error_level(error_level, segment_error)
+            nodes.append(TextNode(match.group(1), TextType.IMAGE, match.group(2)))
+            position = match.end()
+        segment_error = tokenize_links(text, position, len(text), nodes)
+        error_level = lowest_error_level(error_level, segment_error)
+    if error_level is not None:
+        delimiter = DELIMITER_LEVELS[error_level][0]
+        raise Exception(f"Invalid Markdown syntax: missing closing delimiter '{delimiter}'")
+    return nodes
+
+
+def text_to_textnodes(text):
+    return text_to_textnodes_single_pass(text)
@@ -1,6 +1,13 @@
-from htmlnode import HTMLNode
+from htmlnode import HTMLNode, escape_text
+
+# Void elements cannot have closing tags or content
+VOID_ELEMENTS = frozenset(
+    {"img", "br", "hr", "input", "meta", "link", "area", "base", "col", "embed", "param", "source", "track", "wbr"}
+)
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag, value, None, props)
     
@@ -8,15 +15,15 @@ class LeafNode(HTMLNode):
         if self.value is None:
             raise ValueError("LeafNode value cannot be None")
         if not self.tag:
-            return self.value
+            return escape_text(self.value)
 
-        # Void elements cannot have closing tags or content
-        void_elements = {"img", "br", "hr", "input", "meta", "link", "area", "base", "col", "embed", "param", "source", "track", "wbr"}
-
-        if self.tag in void_elements:
+        if self.tag in VOID_ELEMENTS:
             return f"<{self.tag}{self.props_to_html()}>"
 
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+        return f"<{self.tag}{self.props_to_html()}>{escape_text(self.value)}</{self.tag}>"
+
+    def iter_html(self):
+        yield self.to_html()
     
     def __repr__(self):
         return f"LeafNode({self.tag}, {self.value}, {self.props})"
\ No newline at end of file
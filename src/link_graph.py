@@ -0,0 +1,202 @@
+import json
+import os
+import posixpath
+from urllib.parse import unquote, urlsplit
+from textnode import TextType
+
+LINK_GRAPH_VERSION = 1
+
+
+class LinkCollector:
+    # Records the link and image URLs of a page as its text nodes are produced, before
+    # the basepath is applied.
+    __slots__ = ("links", "images")
+
+    def __init__(self):
+        self.links = []
+        self.images = []
+
+    def start_block(self, block):
+        pass
+
+    def add_text(self, text, weight=None):
+        pass
+
+    def add_text_nodes(self, text_nodes):
+        for text_node in text_nodes:
+            if text_node.text_type == TextType.LINK:
+                self.links.append(text_node.url)
+            elif text_node.text_type == TextType.IMAGE:
+                self.images.append(text_node.url)
+
+
+def resolve_target(page_key, url):
+    # Maps a URL found on page_key to the output path it should land on, or None for
+    # external links, fragments and other schemes.
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    path = unquote(parts.path)
+    if not path.startswith("/"):
+        path = posixpath.join(posixpath.dirname(f"/{page_key}"), path)
+    trailing_slash = path.endswith("/")
+    path = posixpath.normpath(path).lstrip("/")
+    if path in ("", "."):
+        return "index.html"
+    return f"{path}/index.html" if trailing_slash else path
+
+
+def target_exists(target, outputs):
+    return target in outputs or f"{target}/index.html" in outputs
+
+
+class LinkGraph:
+    # Outgoing links and images per page (keyed by output path) with the backlinks
+    # derived from them, kept in state_path between builds. check() runs once the
+    # output tree is complete and only re-examines pages whose own links changed or
+    # that point at an output which appeared or disappeared since the last build.
+    def __init__(self, output_dir, state_path, report_path=None):
+        self.output_dir = output_dir
+        self.state_path = state_path
+        self.report_path = report_path
+        self.state = self.load_state()
+        self.added = {}
+
+    def __getstate__(self):
+        return {**self.__dict__, "state": None}
+
+    def load_state(self):
+        try:
+            with open(self.state_path, "r") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = None
+        if not isinstance(state, dict) or state.get("version") != LINK_GRAPH_VERSION:
+            state = {"version": LINK_GRAPH_VERSION, "pages": {}, "backlinks": {}, "outputs": [], "broken": {}}
+        return state
+
+    def save_state(self):
+        state_directory = os.path.dirname(self.state_path)
+        if state_directory:
+            os.makedirs(state_directory, exist_ok=True)
+        temporary_path = f"{self.state_path}.tmp"
+        with open(temporary_path, "w") as f:
+            json.dump(self.state, f, indent=1, sort_keys=True)
+        os.replace(temporary_path, self.state_path)
+
+    def page_key(self, destination_path):
+        return os.path.relpath(destination_path, self.output_dir).replace(os.sep, "/")
+
+    def has_page(self, destination_path):
+        return self.page_key(destination_path) in self.state["pages"]
+
+    def add_page(self, source_path, destination_path, collector):
+        self.added[self.page_key(destination_path)] = {
+            "source": source_path,
+            "links": collector.links,
+            "images": collector.images,
+        }
+
+    def take_stats(self):
+        added = self.added
+        self.added = {}
+        return added
+
+    def merge_stats(self, added):
+        self.added.update(added)
+
+    def check(self, destination_paths, output_files, extra_links=()):
+        # extra_links are (source, url) pairs outside any page, e.g. from the template.
+        pages = self.state["pages"]
+        recheck = set()
+        for page_key, page in self.added.items():
+            previous = pages.get(page_key)
+            if previous is None or (previous["links"], previous["images"]) != (page["links"], page["images"]):
+                recheck.add(page_key)
+            pages[page_key] = page
+        self.added = {}
+        current = {self.page_key(path) for path in destination_paths}
+        for page_key in [page_key for page_key in pages if page_key not in current]:
+            del pages[page_key]
+
+        outputs = {relative_path.replace(os.sep, "/") for relative_path in output_files}
+        appeared_or_vanished = outputs.symmetric_difference(self.state["outputs"])
+        for target in appeared_or_vanished:
+            for candidate in (target, target[: -len("/index.html")] if target.endswith("/index.html") else None):
+                recheck.update(self.state["backlinks"].get(candidate, ()))
+
+        backlinks = {}
+        for page_key, page in pages.items():
+            for url in page["links"] + page["images"]:
+                target = resolve_target(page_key, url)
+                if target is not None:
+                    backlinks.setdefault(target, set()).add(page_key)
+
+        broken = {page_key: urls for page_key, urls in self.state["broken"].items() if page_key in pages}
+        checked = 0
+        for page_key in recheck:
+            if page_key not in pages:
+                continue
+            checked += 1
+            page = pages[page_key]
+            urls = [
+                url
+                for url in page["links"] + page["images"]
+                if (target := resolve_target(page_key, url)) is not None and not target_exists(target, outputs)
+            ]
+            if urls:
+                broken[page_key] = urls
+            else:
+                broken.pop(page_key, None)
+
+        template_broken = sorted(
+            f"{source}: {url}"
+            for source, url in extra_links
+            if (target := resolve_target("index.html", url)) is not None and not target_exists(target, outputs)
+        )
+        linked = {
+            target if target in pages else f"{target}/index.html"
+            for target, sources in backlinks.items()
+            if sources - {target, f"{target}/index.html"}
+        }
+        orphans = sorted(page_key for page_key in pages if page_key != "index.html" and page_key not in linked)
+
+        self.state.update(
+            {
+                "pages": pages,
+                "backlinks": {target: sorted(sources) for target, sources in backlinks.items()},
+                "outputs": sorted(outputs),
+                "broken": broken,
+            }
+        )
+        self.save_state()
+        report = {
+            "checked": checked,
+            "pages": len(pages),
+            "links": sum(len(page["links"]) + len(page["images"]) for page in pages.values()),
+            "broken": {pages[page_key]["source"]: urls for page_key, urls in sorted(broken.items())},
+            "template_broken": template_broken,
+            "orphans": orphans,
+        }
+        if self.report_path:
+            with open(self.report_path, "w") as f:
+                json.dump(report, f, indent=1, sort_keys=True)
+        self.print_report(report)
+        return report
+
+    def print_report(self, report):
+        for source, urls in report["broken"].items():
+            for url in urls:
+                print(f"Broken link in {source}: {url}")
+        for entry in report["template_broken"]:
+            print(f"Broken link in template {entry}")
+        for page_key in report["orphans"]:
+            print(f"Orphan page: {page_key}")
+        broken_count = sum(len(urls) for urls in report["broken"].values()) + len(report["template_broken"])
+        print(
+            f"Link check: {report['links']} links on {report['pages']} pages, {report['checked']} pages rechecked, "
+            f"{broken_count} broken, {len(report['orphans'])} orphans"
+        )
+
+    def __repr__(self):
+        return f"LinkGraph({self.output_dir}, {self.state_path})"
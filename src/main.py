@@ -1,23 +1,322 @@
+import argparse
 import os
+import shutil
 import sys
+import tracing
+from asset_fingerprint import *
+from minify import Minifier
+from precompress import *
+from publish import *
 from website_handler import *
 
-    
+# .build-cache files that describe what is in docs/; see stage_state.
+PUBLISHED_STATE = ("manifest", "search", "links", "link_report", "precompress")
 
-def main():
-    basepath = sys.argv[1] if len(sys.argv) > 1 else "/"
-    source_path = os.path.join(os.path.dirname(__file__), "..", "static")
-    destination_path = os.path.join(os.path.dirname(__file__), "..", "docs")
-    template_path = os.path.join(os.path.dirname(__file__), "..", "template.html")
-    content_path = os.path.join(os.path.dirname(__file__), "..", "content")
-    source_path = os.path.abspath(source_path)
-    destination_path = os.path.abspath(destination_path)
-    template_path = os.path.abspath(template_path)
-    content_path = os.path.abspath(content_path)
-    copy_directory_recursive(source_path, destination_path)
-    generate_pages_recursive(content_path, template_path, destination_path, basepath)
-    
 
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Build the static site into docs/")
+    parser.add_argument("basepath", nargs="?", default="/")
+    parser.add_argument(
+        "--root",
+        default=os.path.join(os.path.dirname(__file__), ".."),
+        help="project directory holding content/, static/ and template.html (default: the repository)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only regenerate pages whose source, template or basepath changed",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="render pages on N worker processes (0 uses every CPU core)",
+    )
+    parser.add_argument(
+        "--clean",
+        action="store_true",
+        help="wipe docs/ and copy every static file instead of syncing changes",
+    )
+    parser.add_argument(
+        "--verify-assets",
+        action="store_true",
+        help="compare static files by content hash when size matches but mtime differs",
+    )
+    parser.add_argument(
+        "--doc-cache",
+        action="store_true",
+        help="reuse rendered page bodies from .build-cache/documents when the markdown is unchanged",
+    )
+    parser.add_argument(
+        "--doc-cache-size",
+        type=int,
+        default=512,
+        metavar="MB",
+        help="evict least recently used cache entries beyond this size (default 512)",
+    )
+    parser.add_argument(
+        "--block-cache",
+        action="store_true",
+        help="render each distinct block once per build and reuse it across pages; the cache is "
+        "in memory, so only watch mode and the build daemon keep it between rebuilds",
+    )
+    parser.add_argument(
+        "--search-index",
+        action="store_true",
+        help="write a sharded inverted index of page text to docs/search/",
+    )
+    parser.add_argument(
+        "--check-links",
+        action="store_true",
+        help="report broken internal links and orphan pages (also written to .build-cache/link-report.json)",
+    )
+    parser.add_argument(
+        "--fingerprint-assets",
+        action="store_true",
+        help="copy css, js, images and fonts as name.<hash>.ext and rewrite references to them",
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="strip template indentation and collapse whitespace in text outside code while rendering",
+    )
+    parser.add_argument(
+        "--precompress",
+        action="store_true",
+        help="write a .gz sidecar next to every compressible page and asset, recompressing only changed files",
+    )
+    parser.add_argument(
+        "--precompress-min-size",
+        type=int,
+        default=DEFAULT_MIN_SIZE,
+        metavar="BYTES",
+        help=f"leave files smaller than this uncompressed (default {DEFAULT_MIN_SIZE})",
+    )
+    parser.add_argument(
+        "--precompress-min-ratio",
+        type=float,
+        default=DEFAULT_MIN_RATIO,
+        metavar="RATIO",
+        help=f"drop sidecars that do not shrink a file by at least this factor (default {DEFAULT_MIN_RATIO})",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="I/N",
+        help="build only shard I of N into the shard directory, with a partial manifest",
+    )
+    parser.add_argument(
+        "--balance-shards",
+        action="store_true",
+        help="assign pages to shards by source size instead of by path hash alone",
+    )
+    parser.add_argument(
+        "--shard-dir",
+        metavar="DIR",
+        help="where a shard writes docs/ and manifest.json (default .build-cache/shards/I-of-N)",
+    )
+    parser.add_argument(
+        "--merge-shards",
+        nargs="+",
+        metavar="DIR",
+        help="combine finished shard directories into docs/ instead of building",
+    )
+    parser.add_argument(
+        "--memory-limit",
+        type=int,
+        metavar="MB",
+        help="bound source read-ahead and stream pages too big to render whole within this budget (default 256)",
+    )
+    parser.add_argument(
+        "--in-place",
+        action="store_true",
+        help="write straight into docs/ instead of building in docs.staging and swapping it in",
+    )
+    parser.add_argument(
+        "--changed-list",
+        metavar="FILE",
+        help="write the paths of changed output files, one per line, e.g. for rsync --files-from",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="record build spans and counters as a Chrome trace_event JSON file and print a summary",
+    )
+    return parser.parse_args(argv)
 
 
-if __name__ == "__main__":    main()
\ No newline at end of file
+def project_paths(root_path):
+    return {
+        "static": os.path.abspath(os.path.join(root_path, "static")),
+        "docs": os.path.abspath(os.path.join(root_path, "docs")),
+        "template": os.path.abspath(os.path.join(root_path, "template.html")),
+        "content": os.path.abspath(os.path.join(root_path, "content")),
+        "manifest": os.path.abspath(os.path.join(root_path, ".build-cache", "manifest.json")),
+        "documents": os.path.abspath(os.path.join(root_path, ".build-cache", "documents")),
+        "shards": os.path.abspath(os.path.join(root_path, ".build-cache", "shards")),
+        "search": os.path.abspath(os.path.join(root_path, ".build-cache", "search.json")),
+        "links": os.path.abspath(os.path.join(root_path, ".build-cache", "links.json")),
+        "asset_hashes": os.path.abspath(os.path.join(root_path, ".build-cache", "asset-hashes.json")),
+        "link_report": os.path.abspath(os.path.join(root_path, ".build-cache", "link-report.json")),
+        "precompress": os.path.abspath(os.path.join(root_path, ".build-cache", "precompress.json")),
+    }
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    if (args.search_index or args.check_links) and (args.shard or args.merge_shards):
+        raise ValueError("--search-index and --check-links are not supported for sharded builds")
+    paths = project_paths(args.root)
+    if args.trace:
+        tracing.enable()
+    try:
+        build(args, paths)
+    finally:
+        tracer = tracing.disable()
+        if tracer is not None:
+            tracing.write_chrome_trace(tracer, args.trace)
+            print(tracing.summarize(tracer))
+            print(f"Wrote trace to {args.trace}")
+
+
+def build(args, paths):
+    build_into = merge_shards_into if args.merge_shards else build_site_into
+    if args.in_place or args.shard is not None:
+        build_into(args, paths, paths["docs"])
+        return None
+    staging_path = prepare_staging(paths["docs"], clean=args.clean)
+    staged_paths = stage_state(paths, PUBLISHED_STATE)
+    try:
+        build_into(args, staged_paths, staging_path)
+    except BaseException:
+        discard_staging(staging_path)
+        discard_state(staged_paths, PUBLISHED_STATE)
+        raise
+    try:
+        published = publish_staging(staging_path, paths["docs"])
+    except BaseException:
+        discard_state(staged_paths, PUBLISHED_STATE)
+        raise
+    commit_state(staged_paths, paths, PUBLISHED_STATE)
+    report_changes(published, args.changed_list)
+    return published
+
+
+def report_changes(published, changed_list_path=None):
+    for relative_path in published["changed"]:
+        print(f"Changed: {relative_path}")
+    for relative_path in published["removed"]:
+        print(f"Removed: {relative_path}")
+    if changed_list_path:
+        with open(changed_list_path, "w") as f:
+            f.writelines(f"{relative_path}\n" for relative_path in published["changed"])
+
+
+def build_site_into(args, paths, destination_path):
+    basepath = args.basepath
+    source_path = paths["static"]
+    template_path = paths["template"]
+    content_path = paths["content"]
+    manifest_path = paths["manifest"]
+    doc_cache = None
+    if args.doc_cache:
+        doc_cache = DocumentCache(paths["documents"], args.doc_cache_size * 1024 * 1024)
+    block_cache = BlockCache() if args.block_cache else None
+    minifier = Minifier() if args.minify else None
+    search_index = None
+    if args.search_index:
+        search_index = SearchIndex(destination_path, paths["search"], normalize_basepath(basepath))
+    link_graph = None
+    if args.check_links:
+        link_graph = LinkGraph(destination_path, paths["links"], paths["link_report"])
+    assets = None
+    if args.fingerprint_assets:
+        assets = build_asset_map(source_path, paths["asset_hashes"])
+    precompressor = None
+    if args.precompress and args.shard is None:
+        precompressor = make_precompressor(args, paths)
+    if args.shard is not None:
+        # Static files are copied once by the merge step, not by every shard.
+        index, count = args.shard
+        shard_dir = args.shard_dir or os.path.join(paths["shards"], f"{index}-of-{count}")
+        destination_path = shard_output_dir(shard_dir)
+        manifest_path = shard_manifest_path(shard_dir)
+        if not args.incremental and os.path.exists(manifest_path):
+            os.remove(manifest_path)
+    elif args.clean and assets is None:
+        copy_directory_recursive(source_path, destination_path)
+    else:
+        if args.clean and os.path.exists(destination_path):
+            shutil.rmtree(destination_path)
+        page_outputs = [
+            os.path.relpath(page_path, destination_path)
+            for _, _, page_path in find_pages(content_path, destination_path)
+        ]
+        if search_index is not None:
+            page_outputs.extend(search_index.output_files())
+        if precompressor is not None:
+            page_outputs.extend(precompressor.sidecars())
+        if assets is not None:
+            sync_fingerprinted_assets(source_path, destination_path, assets, page_outputs, args.verify_assets)
+        else:
+            sync_directory(source_path, destination_path, protected=page_outputs, verify_hash=args.verify_assets)
+    if not args.incremental and args.shard is None:
+        manifest_path = None
+    generate_pages_recursive(
+        content_path,
+        template_path,
+        destination_path,
+        basepath,
+        manifest_path,
+        jobs=args.jobs,
+        doc_cache=doc_cache,
+        block_cache=block_cache,
+        shard=args.shard,
+        balance_shards=args.balance_shards,
+        memory_limit=args.memory_limit * 1024 * 1024 if args.memory_limit else None,
+        search_index=search_index,
+        link_graph=link_graph,
+        assets=assets,
+        minifier=minifier,
+    )
+    if precompressor is not None:
+        precompressor.compress(destination_path)
+    if args.shard is not None:
+        print(f"Shard {index}/{count} written to {shard_dir}")
+    if doc_cache is not None:
+        doc_cache.prune()
+        print(doc_cache.summary())
+    if block_cache is not None:
+        print(block_cache.summary())
+    if minifier is not None:
+        print(minifier.summary())
+
+
+def merge_shards_into(args, paths, destination_path):
+    assets = None
+    if args.fingerprint_assets:
+        assets = build_asset_map(paths["static"], paths["asset_hashes"])
+    if args.clean and assets is None:
+        copy_directory_recursive(paths["static"], destination_path)
+    elif args.clean and os.path.exists(destination_path):
+        shutil.rmtree(destination_path)
+    merged = merge_shards(args.merge_shards, destination_path, paths["manifest"])
+    page_outputs = [entry["output"] for entry in merged["pages"].values()]
+    precompressor = make_precompressor(args, paths) if args.precompress else None
+    if precompressor is not None:
+        page_outputs.extend(precompressor.sidecars())
+    if assets is not None:
+        sync_fingerprinted_assets(paths["static"], destination_path, assets, page_outputs, args.verify_assets)
+    elif not args.clean:
+        sync_directory(paths["static"], destination_path, protected=page_outputs, verify_hash=args.verify_assets)
+    if precompressor is not None:
+        precompressor.compress(destination_path)
+
+
+def make_precompressor(args, paths):
+    return Precompressor(paths["precompress"], args.precompress_min_size, args.precompress_min_ratio)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import hashlib
+import json
+import os
+
+MANIFEST_VERSION = 1
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def empty_manifest():
+    return {"version": MANIFEST_VERSION, "pages": {}}
+
+
+def load_manifest(manifest_path):
+    if not os.path.exists(manifest_path):
+        return empty_manifest()
+    try:
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        print(f"Ignoring unreadable build manifest: {manifest_path}")
+        return empty_manifest()
+    if manifest.get("version") != MANIFEST_VERSION or not isinstance(manifest.get("pages"), dict):
+        return empty_manifest()
+    return manifest
+
+
+def save_manifest(manifest_path, manifest):
+    manifest_directory = os.path.dirname(manifest_path)
+    if manifest_directory:
+        os.makedirs(manifest_directory, exist_ok=True)
+    temporary_path = f"{manifest_path}.tmp"
+    with open(temporary_path, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(temporary_path, manifest_path)
@@ -0,0 +1,91 @@
+import re
+
+# HTML whitespace only: a no-break space or other Unicode space is content.
+WHITESPACE_PATTERN = re.compile(r"[ \t\n\r\f]+")
+# Elements whose whitespace is content, indentation between two tags (a whitespace run
+# spanning a line break), and any other whitespace run, matched in one scan.
+MARKUP_WHITESPACE_PATTERN = re.compile(
+    r"(?P<preserved><(pre|textarea|script|style)\b.*?</\2\s*>)"
+    r"|(?P<indentation>(?<=>)[ \t\r\f]*\n[ \t\n\r\f]*(?=<))"
+    r"|[ \t\n\r\f]+",
+    re.DOTALL | re.IGNORECASE,
+)
+TAG_NAME_PATTERN = re.compile(r"</?([a-zA-Z][a-zA-Z0-9-]*)")
+# Whitespace next to these tags is never rendered; between other tags, such as two
+# spans, a line break shows as a space.
+BLOCK_TAGS = frozenset(
+    """
+    address article aside base blockquote body caption col colgroup dd details dialog div dl dt
+    fieldset figcaption figure footer form h1 h2 h3 h4 h5 h6 head header hgroup hr html li link
+    main meta nav noscript ol optgroup option p pre section summary table tbody td tfoot th thead
+    title tr ul
+    """.split()
+)
+STAT_NAMES = ("pages", "template_bytes_saved", "text_bytes_saved")
+
+
+def collapse_whitespace(text):
+    if "  " not in text and "\n" not in text and "\t" not in text and "\r" not in text and "\f" not in text:
+        return text
+    return WHITESPACE_PATTERN.sub(" ", text)
+
+
+def is_block_tag(html, position):
+    if html.startswith("<!", position):
+        return html[position + 2 : position + 9].lower() == "doctype"
+    tag = TAG_NAME_PATTERN.match(html, position)
+    return tag is not None and tag[1].lower() in BLOCK_TAGS
+
+
+def minify_whitespace(match):
+    if match["preserved"]:
+        return match["preserved"]
+    if match["indentation"] is not None:
+        html = match.string
+        if is_block_tag(html, html.rfind("<", 0, match.start())) or is_block_tag(html, match.end()):
+            return ""
+    return " "
+
+
+def minify_markup(html):
+    # For template text: drops indentation next to block-level and head tags and
+    # collapses other whitespace runs to one space, leaving pre, textarea, script and
+    # style elements untouched.
+    return MARKUP_WHITESPACE_PATTERN.sub(minify_whitespace, html.strip(" \t\n\r\f"))
+
+
+class Minifier:
+    # Render option for minified output. Text nodes outside code are collapsed as they
+    # are built; the template is minified once when it is compiled. Savings are counted
+    # here, so rendered blocks reused from a cache do not count again.
+    def __init__(self):
+        self.stats = dict.fromkeys(STAT_NAMES, 0)
+
+    def text(self, text):
+        collapsed = collapse_whitespace(text)
+        self.stats["text_bytes_saved"] += len(text) - len(collapsed)
+        return collapsed
+
+    def add_page(self, template):
+        self.stats["pages"] += 1
+        self.stats["template_bytes_saved"] += template.bytes_saved
+
+    def take_stats(self):
+        stats = self.stats
+        self.stats = dict.fromkeys(STAT_NAMES, 0)
+        return stats
+
+    def merge_stats(self, stats):
+        for name, amount in stats.items():
+            self.stats[name] += amount
+
+    def summary(self):
+        stats = self.stats
+        saved = stats["template_bytes_saved"] + stats["text_bytes_saved"]
+        return (
+            f"Minified {stats['pages']} pages: saved {saved} bytes "
+            f"({stats['template_bytes_saved']} from the template, {stats['text_bytes_saved']} from text)"
+        )
+
+    def __repr__(self):
+        return "Minifier()"
@@ -0,0 +1,73 @@
+import os
+import re
+from htmlnode import escape_attribute
+from minify import minify_markup
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{ (\w+) \}\}")
+URL_ATTRIBUTE_PATTERN = re.compile(r'(href|src)="(/[^"]*)')
+# The rendered body, as a node or as HTML from the document cache, goes in unescaped.
+# The title and front matter values may land inside attribute values, so they get
+# quotes escaped too.
+CONTENT_PLACEHOLDER = "Content"
+
+
+def rewrite_url(url, basepath, assets=None):
+    if not url or not url.startswith("/"):
+        return url
+    if assets is not None:
+        url = assets.rewrite(url)
+    if basepath == "/":
+        return url
+    return f"{basepath}{url[1:]}"
+
+
+class PageTemplate:
+    def __init__(self, text, basepath="/", assets=None, minify=False):
+        self.bytes_saved = 0
+        if minify:
+            minified = minify_markup(text)
+            self.bytes_saved = len(text) - len(minified)
+            text = minified
+        parts = PLACEHOLDER_PATTERN.split(text)
+        self.basepath = basepath
+        self.chunks = [
+            URL_ATTRIBUTE_PATTERN.sub(lambda match: f'{match[1]}="{rewrite_url(match[2], basepath, assets)}', part)
+            for part in parts[0::2]
+        ]
+        self.names = parts[1::2]
+
+    def render(self, values):
+        return "".join(self.iter_render(values))
+
+    def iter_render(self, values):
+        yield self.chunks[0]
+        for name, chunk in zip(self.names, self.chunks[1:]):
+            value = values.get(name)
+            if value is None:
+                yield f"{{{{ {name} }}}}"
+            elif not isinstance(value, str):
+                yield from value.iter_html()
+            elif name == CONTENT_PLACEHOLDER:
+                yield value
+            else:
+                yield escape_attribute(value)
+            yield chunk
+
+    def __repr__(self):
+        return f"PageTemplate({self.names}, {self.basepath})"
+
+
+_template_cache = {}
+
+
+def load_template(template_path, basepath="/", assets=None, minify=False):
+    template_stat = os.stat(template_path)
+    key = (os.path.abspath(template_path), basepath, assets.digest if assets is not None else None, minify)
+    signature = (template_stat.st_mtime_ns, template_stat.st_size)
+    cached = _template_cache.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    with open(template_path, "r") as f:
+        template = PageTemplate(f.read(), basepath, assets, minify)
+    _template_cache[key] = (signature, template)
+    return template
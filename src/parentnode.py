@@ -1,20 +1,24 @@
 from htmlnode import HTMLNode
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag, None, children, props)
     
     def to_html(self):
+        return "".join(self.iter_html())
+
+    def iter_html(self):
         if not self.tag:
             raise ValueError("ParentNode tag cannot be empty")
         if self.children is None:
             raise ValueError("ParentNode children cannot be None")
 
-        children_html = ""
+        yield f"<{self.tag}{self.props_to_html()}>"
         for child in self.children:
-            children_html += child.to_html()
-
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+            yield from child.iter_html()
+        yield f"</{self.tag}>"
     
     def __repr__(self):
         return f"ParentNode({self.tag}, {self.children}, {self.props})"
\ No newline at end of file
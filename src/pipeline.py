@@ -0,0 +1,84 @@
+import queue
+import threading
+
+# Small building blocks for running build stages concurrently without letting the
+# work in flight between them grow past a fixed number of items or bytes.
+
+_DONE = object()
+
+
+class ByteBudget:
+    # Counts bytes handed from one stage to the next. acquire() blocks while the budget
+    # is spent; an item bigger than the whole budget is let through once nothing else
+    # is in flight, so a single huge item cannot deadlock the pipeline.
+    def __init__(self, limit):
+        self.limit = limit
+        self.used = 0
+        self.peak = 0
+        self.closed = False
+        self.condition = threading.Condition()
+
+    def acquire(self, amount):
+        with self.condition:
+            self.condition.wait_for(lambda: self.closed or self.used == 0 or self.used + amount <= self.limit)
+            self.used += amount
+            self.peak = max(self.peak, self.used)
+
+    def release(self, amount):
+        with self.condition:
+            self.used -= amount
+            self.condition.notify_all()
+
+    def close(self):
+        # Wakes any producer still waiting so its thread can wind down.
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+
+class StageError:
+    __slots__ = ("error",)
+
+    def __init__(self, error):
+        self.error = error
+
+
+def threaded_stage(items, function, queue_size=8):
+    # Applies function to each item on a background thread and yields the results in
+    # order through a bounded queue. An exception in function is re-raised here, and
+    # closing the generator early stops the thread after its current item.
+    results = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def put(result):
+        while not stop.is_set():
+            try:
+                results.put(result, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run():
+        try:
+            for item in items:
+                if not put(function(item)):
+                    return
+        except BaseException as error:
+            put(StageError(error))
+            return
+        put(_DONE)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        while True:
+            result = results.get()
+            if result is _DONE:
+                return
+            if isinstance(result, StageError):
+                raise result.error
+            yield result
+    finally:
+        stop.set()
+        thread.join()
@@ -0,0 +1,150 @@
+import gzip
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from asset_sync import scan_files
+from manifest import hash_file
+import tracing
+
+SIDECAR_SUFFIX = ".gz"
+COMPRESSIBLE_EXTENSIONS = frozenset(
+    (".html", ".htm", ".css", ".js", ".mjs", ".json", ".svg", ".xml", ".txt", ".map", ".ico", ".ttf", ".otf")
+)
+DEFAULT_MIN_SIZE = 1024
+DEFAULT_MIN_RATIO = 1.1
+COMPRESS_WORKERS = 8
+COMPRESS_LEVEL = 9
+STAT_NAMES = ("compressed", "unchanged", "skipped", "removed", "bytes_in", "bytes_out")
+
+
+def compress_file(source_path, sidecar_path, min_ratio):
+    # Returns the compressed size, or None when the sidecar is not worth serving.
+    # mtime=0 keeps the gzip header, and so the sidecar bytes, reproducible.
+    with open(source_path, "rb") as f:
+        data = f.read()
+    compressed = gzip.compress(data, COMPRESS_LEVEL, mtime=0)
+    if len(compressed) * min_ratio > len(data):
+        return None
+    temporary_path = os.path.join(os.path.dirname(sidecar_path), f".{os.path.basename(sidecar_path)}.tmp")
+    with open(temporary_path, "wb") as f:
+        f.write(compressed)
+    os.replace(temporary_path, sidecar_path)
+    return len(compressed)
+
+
+class Precompressor:
+    # Writes name.ext.gz next to every compressible output. state_path remembers each
+    # output's mtime, size and hash so only outputs whose bytes changed are recompressed.
+    def __init__(self, state_path, min_size=DEFAULT_MIN_SIZE, min_ratio=DEFAULT_MIN_RATIO, workers=COMPRESS_WORKERS):
+        self.state_path = state_path
+        self.min_size = min_size
+        self.min_ratio = min_ratio
+        self.workers = workers
+        self.stats = dict.fromkeys(STAT_NAMES, 0)
+        self.seconds = 0.0
+        try:
+            with open(state_path, "r") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        if state.get("settings") != [min_size, min_ratio]:
+            state = {"files": {}}
+        self.files = state["files"]
+
+    def sidecars(self):
+        # Relative paths of the sidecars written so far, for syncs that must keep them.
+        return [relative_path + SIDECAR_SUFFIX for relative_path, entry in self.files.items() if entry[3] is not None]
+
+    def compress(self, output_dir):
+        start = time.perf_counter()
+        with tracing.span("precompress", {"directory": output_dir}):
+            self.compress_outputs(output_dir)
+        self.seconds = time.perf_counter() - start
+        self.save()
+        print(self.summary())
+        return self.stats
+
+    def compress_outputs(self, output_dir):
+        outputs = {
+            relative_path: file_stat
+            for relative_path, file_stat in scan_files(output_dir).items()
+            if os.path.splitext(relative_path)[1].lower() in COMPRESSIBLE_EXTENSIONS
+        }
+        for relative_path in list(self.files):
+            if relative_path not in outputs:
+                self.remove_sidecar(output_dir, relative_path)
+                del self.files[relative_path]
+
+        pending = []
+        for relative_path, file_stat in outputs.items():
+            signature = [file_stat.st_mtime_ns, file_stat.st_size]
+            entry = self.files.get(relative_path)
+            if entry is not None and entry[:2] == signature and self.sidecar_is_present(output_dir, relative_path, entry):
+                self.stats["unchanged"] += 1
+                continue
+            if file_stat.st_size < self.min_size:
+                self.remove_sidecar(output_dir, relative_path)
+                self.files[relative_path] = signature + [None, None]
+                self.stats["skipped"] += 1
+                continue
+            output_hash = hash_file(os.path.join(output_dir, relative_path))
+            if entry is not None and entry[2] == output_hash and self.sidecar_is_present(output_dir, relative_path, entry):
+                self.files[relative_path] = signature + entry[2:]
+                self.stats["unchanged"] += 1
+                continue
+            pending.append((relative_path, signature, output_hash))
+
+        def compress_output(item):
+            relative_path = item[0]
+            source_path = os.path.join(output_dir, relative_path)
+            return compress_file(source_path, source_path + SIDECAR_SUFFIX, self.min_ratio)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = list(executor.map(compress_output, pending))
+        for (relative_path, signature, output_hash), compressed_size in zip(pending, results):
+            self.files[relative_path] = signature + [output_hash, compressed_size]
+            if compressed_size is None:
+                self.remove_sidecar(output_dir, relative_path)
+                self.stats["skipped"] += 1
+                continue
+            self.stats["compressed"] += 1
+            self.stats["bytes_in"] += signature[1]
+            self.stats["bytes_out"] += compressed_size
+        tracing.count("bytes_compressed", self.stats["bytes_in"])
+
+    def sidecar_is_present(self, output_dir, relative_path, entry):
+        if entry[3] is None:
+            return True
+        sidecar_path = os.path.join(output_dir, relative_path + SIDECAR_SUFFIX)
+        try:
+            return os.path.getsize(sidecar_path) == entry[3]
+        except OSError:
+            return False
+
+    def remove_sidecar(self, output_dir, relative_path):
+        sidecar_path = os.path.join(output_dir, relative_path + SIDECAR_SUFFIX)
+        if os.path.isfile(sidecar_path):
+            os.remove(sidecar_path)
+            self.stats["removed"] += 1
+
+    def save(self):
+        state_directory = os.path.dirname(self.state_path)
+        if state_directory:
+            os.makedirs(state_directory, exist_ok=True)
+        temporary_path = f"{self.state_path}.tmp"
+        with open(temporary_path, "w") as f:
+            json.dump({"settings": [self.min_size, self.min_ratio], "files": self.files}, f, sort_keys=True)
+        os.replace(temporary_path, self.state_path)
+
+    def summary(self):
+        stats = self.stats
+        saved = 100 * (1 - stats["bytes_out"] / stats["bytes_in"]) if stats["bytes_in"] else 0.0
+        return (
+            f"Precompressed {stats['compressed']} files ({stats['bytes_in']} -> {stats['bytes_out']} bytes, "
+            f"{saved:.1f}% saved), {stats['unchanged']} unchanged, {stats['skipped']} skipped, "
+            f"{stats['removed']} sidecars removed in {self.seconds * 1000:.1f} ms"
+        )
+
+    def __repr__(self):
+        return f"Precompressor({self.state_path}, {self.min_size}, {self.min_ratio})"
@@ -0,0 +1,208 @@
+import argparse
+import hashlib
+import os
+import sys
+import threading
+import urllib.parse
+from collections import OrderedDict
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from main import project_paths
+from watch import file_signature
+from website_handler import *
+
+DEFAULT_CACHE_PAGES = 512
+
+
+def page_etag(body):
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match, etag):
+    if if_none_match is None:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+class RenderedPage:
+    __slots__ = ("signature", "body", "etag")
+
+    def __init__(self, signature, body):
+        self.signature = signature
+        self.body = body
+        self.etag = page_etag(body)
+
+
+class PreviewSite:
+    # Renders content/ pages on request instead of writing docs/. Rendered pages are kept
+    # in an LRU keyed by source path and reused while the source and template mtimes hold.
+    def __init__(self, paths, basepath="/", max_pages=DEFAULT_CACHE_PAGES):
+        self.paths = paths
+        self.basepath = normalize_basepath(basepath)
+        self.max_pages = max_pages
+        self.pages = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def site_path(self, request_path):
+        # Strips the basepath; None when the request falls outside the site.
+        if request_path == self.basepath.rstrip("/"):
+            return "/"
+        if not request_path.startswith(self.basepath):
+            return None
+        return "/" + request_path[len(self.basepath):]
+
+    def source_path(self, site_path):
+        relative_path = site_path.lstrip("/")
+        if ".." in relative_path.split("/"):
+            return None
+        if relative_path == "" or relative_path.endswith("/"):
+            relative_path += "index.md"
+        elif relative_path.endswith(".html"):
+            relative_path = relative_path[: -len(".html")] + ".md"
+        else:
+            return None
+        source_path = os.path.join(self.paths["content"], *relative_path.split("/"))
+        return source_path if os.path.isfile(source_path) else None
+
+    def directory_redirect(self, site_path):
+        # "/blog/tom" names a page directory; the browser needs the slash to resolve
+        # relative links the same way as in the published site.
+        relative_path = site_path.strip("/")
+        if not relative_path or site_path.endswith("/"):
+            return None
+        index_path = os.path.join(self.paths["content"], *relative_path.split("/"), "index.md")
+        return f"{self.basepath}{urllib.parse.quote(relative_path)}/" if os.path.isfile(index_path) else None
+
+    def get(self, source_path):
+        signature = (file_signature(source_path), file_signature(self.paths["template"]))
+        with self.lock:
+            page = self.pages.get(source_path)
+            if page is not None and page.signature == signature:
+                self.pages.move_to_end(source_path)
+                self.stats["hits"] += 1
+                return page
+            self.stats["misses"] += 1
+        page = RenderedPage(signature, self.render(source_path))
+        with self.lock:
+            self.pages[source_path] = page
+            self.pages.move_to_end(source_path)
+            while len(self.pages) > self.max_pages:
+                self.pages.popitem(last=False)
+                self.stats["evictions"] += 1
+        return page
+
+    def render(self, source_path):
+        template = load_template(self.paths["template"], self.basepath)
+        source = read_source(source_path)
+        metadata, markdown = extract_metadata(source)
+        first_line = source.count("\n", 0, len(source) - len(markdown)) + 1
+        body = markdown_to_html_node(markdown, self.basepath, first_line)
+        values = {**metadata, "Title": extract_title(markdown), "Content": body}
+        return template.render(values).encode("utf-8")
+
+    def summary(self):
+        stats = self.stats
+        return (
+            f"Preview cache: {len(self.pages)} pages, {stats['hits']} hits, "
+            f"{stats['misses']} misses, {stats['evictions']} evicted"
+        )
+
+
+def make_handler(site):
+    class PreviewHandler(SimpleHTTPRequestHandler):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=site.paths["static"], **kwargs)
+
+        def do_GET(self):
+            self.handle_request(send_body=True)
+
+        def do_HEAD(self):
+            self.handle_request(send_body=False)
+
+        def handle_request(self, send_body):
+            request_path, separator, query = self.path.split("#", 1)[0].partition("?")
+            # Decoded before the ".." check in source_path, so "%2e%2e" cannot escape the root.
+            site_path = site.site_path(urllib.parse.unquote(request_path))
+            if site_path is None:
+                self.send_error(404)
+                return
+            source_path = site.source_path(site_path)
+            if source_path is not None:
+                try:
+                    page = site.get(source_path)
+                except Exception as error:
+                    self.send_error(500, f"Render failed: {error}")
+                    return
+                self.send_page(page, send_body)
+                return
+            redirect = site.directory_redirect(site_path)
+            if redirect is not None:
+                self.send_response(301)
+                self.send_header("Location", redirect + separator + query)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            # Everything else is a static file, served from static/ as is.
+            # translate_path decodes again, so hand it the path encoded.
+            self.path = urllib.parse.quote(site_path) + separator + query
+            if send_body:
+                super().do_GET()
+            else:
+                super().do_HEAD()
+
+        def send_page(self, page, send_body):
+            if etag_matches(self.headers.get("If-None-Match"), page.etag):
+                self.send_response(304)
+                self.send_header("ETag", page.etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(page.body)))
+            self.send_header("ETag", page.etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            if send_body:
+                self.wfile.write(page.body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return PreviewHandler
+
+
+def make_server(site, port, host=""):
+    server = ThreadingHTTPServer((host, port), make_handler(site))
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve content/ rendered on request, without writing docs/")
+    parser.add_argument("basepath", nargs="?", default="/")
+    parser.add_argument("--root", default=os.path.join(os.path.dirname(__file__), ".."))
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument(
+        "--cache-pages",
+        type=int,
+        default=DEFAULT_CACHE_PAGES,
+        metavar="N",
+        help=f"keep up to N rendered pages in memory (default {DEFAULT_CACHE_PAGES})",
+    )
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    site = PreviewSite(project_paths(args.root), args.basepath, args.cache_pages)
+    server = make_server(site, args.port)
+    print(f"Previewing {site.paths['content']} at http://localhost:{args.port}{site.basepath}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(site.summary())
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import ctypes
+import os
+import shutil
+import time
+from asset_sync import scan_files
+from manifest import hash_file
+import tracing
+
+AT_FDCWD = -100
+RENAME_EXCHANGE = 2
+
+
+def staging_directory(live_dir):
+    return f"{os.path.abspath(live_dir)}.staging"
+
+
+def link_or_copy(source_path, destination_path):
+    try:
+        os.link(source_path, destination_path)
+    except OSError:
+        shutil.copy2(source_path, destination_path)
+
+
+def prepare_staging(live_dir, clean=False):
+    # The staging tree starts as hard links to the live files, so unchanged outputs
+    # cost nothing to carry over. Everything that writes into it replaces files
+    # through a temporary path instead of truncating, leaving the live inodes alone.
+    staging_dir = staging_directory(live_dir)
+    if os.path.lexists(staging_dir):
+        shutil.rmtree(staging_dir)
+    if clean or not os.path.isdir(live_dir):
+        os.makedirs(staging_dir)
+    else:
+        shutil.copytree(os.path.realpath(live_dir), staging_dir, symlinks=True, copy_function=link_or_copy)
+    return staging_dir
+
+
+def discard_staging(staging_dir):
+    if os.path.isdir(staging_dir):
+        shutil.rmtree(staging_dir)
+
+
+def stage_state(paths, names):
+    # The build state describing docs/ (manifest, search and link state) is written to
+    # copies while the staging tree is built, so a failed build or publish leaves the
+    # saved state matching the live tree. Returns paths with those entries redirected.
+    staged_paths = dict(paths)
+    for name in names:
+        staged_paths[name] = f"{paths[name]}.staging"
+        discard_state_file(staged_paths[name])
+        if os.path.exists(paths[name]):
+            shutil.copy2(paths[name], staged_paths[name])
+    return staged_paths
+
+
+def discard_state_file(path):
+    if os.path.lexists(path):
+        os.remove(path)
+
+
+def discard_state(staged_paths, names):
+    for name in names:
+        discard_state_file(staged_paths[name])
+
+
+def commit_state(staged_paths, paths, names):
+    for name in names:
+        if os.path.exists(staged_paths[name]):
+            os.replace(staged_paths[name], paths[name])
+        else:
+            discard_state_file(paths[name])
+
+
+def reconcile_staging(staging_dir, live_dir):
+    # Compares each staged file with the live one. Identical content is linked back
+    # to the live file so it keeps its mtime; the rest is reported as changed.
+    live_files = scan_files(live_dir) if os.path.isdir(live_dir) else {}
+    staged_files = scan_files(staging_dir)
+    changed = []
+    for relative_path, staged_stat in sorted(staged_files.items()):
+        live_stat = live_files.get(relative_path)
+        if live_stat is not None and (live_stat.st_dev, live_stat.st_ino) == (staged_stat.st_dev, staged_stat.st_ino):
+            continue
+        staged_path = os.path.join(staging_dir, relative_path)
+        live_path = os.path.join(live_dir, relative_path)
+        if live_stat is not None and live_stat.st_size == staged_stat.st_size and hash_file(live_path) == hash_file(staged_path):
+            temporary_path = os.path.join(os.path.dirname(staged_path), f".{os.path.basename(staged_path)}.tmp")
+            link_or_copy(live_path, temporary_path)
+            os.replace(temporary_path, staged_path)
+            continue
+        changed.append(relative_path)
+    removed = sorted(relative_path for relative_path in live_files if relative_path not in staged_files)
+    return changed, removed
+
+
+def exchange_paths(first_path, second_path):
+    # Swaps two directory entries in one step with renameat2(RENAME_EXCHANGE) where the
+    # platform has it; returns False so the caller can fall back to two renames.
+    try:
+        renameat2 = ctypes.CDLL(None, use_errno=True).renameat2
+    except (AttributeError, OSError):
+        return False
+    result = renameat2(AT_FDCWD, os.fsencode(first_path), AT_FDCWD, os.fsencode(second_path), RENAME_EXCHANGE)
+    return result == 0
+
+
+def swap_symlink(staging_dir, live_link):
+    # docs/ is a symlink: move the staged tree next to its target under a fresh name and
+    # repoint the link with os.replace. Old trees are only deleted if we created them.
+    old_target = os.path.realpath(live_link)
+    link_name = os.path.basename(os.path.abspath(live_link))
+    release_dir = os.path.join(os.path.dirname(old_target), f"{link_name}-{time.time_ns()}")
+    os.rename(staging_dir, release_dir)
+    temporary_link = f"{os.path.abspath(live_link)}.tmp"
+    if os.path.lexists(temporary_link):
+        os.remove(temporary_link)
+    os.symlink(release_dir, temporary_link)
+    os.replace(temporary_link, live_link)
+    if os.path.basename(old_target).startswith(f"{link_name}-") and os.path.isdir(old_target):
+        shutil.rmtree(old_target)
+
+
+def publish_staging(staging_dir, live_dir):
+    with tracing.span("publish_staging"):
+        changed, removed = reconcile_staging(staging_dir, live_dir)
+        if os.path.islink(live_dir):
+            swap_symlink(staging_dir, live_dir)
+        elif not os.path.exists(live_dir):
+            os.rename(staging_dir, live_dir)
+        elif exchange_paths(staging_dir, live_dir):
+            shutil.rmtree(staging_dir)
+        else:
+            retired_dir = f"{os.path.abspath(live_dir)}.old"
+            if os.path.lexists(retired_dir):
+                shutil.rmtree(retired_dir)
+            os.rename(live_dir, retired_dir)
+            os.rename(staging_dir, live_dir)
+            shutil.rmtree(retired_dir)
+    print(f"Published {live_dir}: {len(changed)} changed, {len(removed)} removed")
+    return {"changed": changed, "removed": removed}
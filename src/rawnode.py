@@ -0,0 +1,17 @@
+from htmlnode import HTMLNode
+
+class RawNode(HTMLNode):
+    # Already rendered markup, e.g. a cached block, emitted as-is.
+    __slots__ = ()
+
+    def __init__(self, html):
+        super().__init__(None, html, None, None)
+
+    def to_html(self):
+        return self.value
+
+    def iter_html(self):
+        yield self.value
+
+    def __repr__(self):
+        return f"RawNode({self.value})"
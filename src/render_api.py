@@ -0,0 +1,81 @@
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+
+from website_handler import markdown_to_html_node, normalize_basepath, render_key, resolve_jobs
+
+# Library entry points for rendering markdown held in memory, e.g. snippets submitted to
+# a web service. The inline patterns and block tables are module level, so each call only
+# pays for the documents themselves.
+
+# Documents handed to a worker at a time; batches up to this size are rendered inline.
+CHUNK_SIZE = 64
+
+
+def render_markdown(markdown, basepath="/", block_cache=None):
+    return markdown_to_html_node(markdown, normalize_basepath(basepath), block_cache=block_cache).to_html()
+
+
+def document_key(markdown, key_prefix):
+    return (key_prefix, "document", hashlib.sha256(markdown.encode("utf-8")).hexdigest())
+
+
+def render_chunk(job):
+    documents, basepath, block_cache = job
+    rendered = []
+    for index, markdown in documents:
+        try:
+            rendered.append(markdown_to_html_node(markdown, basepath, block_cache=block_cache).to_html())
+        except Exception as error:
+            raise Exception(f"document {index}: {error}") from error
+    return rendered
+
+
+def render_many(markdowns, basepath="/", cache=None, jobs=1, executor=None, block_cache=None):
+    # Returns the HTML of every document, in order. cache is any LRU with get(key) and
+    # put(key, html), such as a BlockCache, and is keyed by a hash of each input. Repeated
+    # inputs are rendered once. The remaining documents go to executor, or to a pool of
+    # jobs worker processes, in chunks; a long-running service should pass its own
+    # executor rather than start a pool on every call.
+    basepath = normalize_basepath(basepath)
+    key_prefix = render_key(basepath)
+    results = [None] * len(markdowns)
+    cached = {}
+    misses = {}
+    for index, markdown in enumerate(markdowns):
+        html = cached.get(markdown)
+        if html is not None:
+            results[index] = html
+            continue
+        miss = misses.get(markdown)
+        if miss is not None:
+            miss[1].append(index)
+            continue
+        key = None
+        if cache is not None:
+            key = document_key(markdown, key_prefix)
+            html = cache.get(key)
+        if html is None:
+            misses[markdown] = (key, [index])
+        else:
+            cached[markdown] = results[index] = html
+
+    documents = [(indexes[0], markdown) for markdown, (_, indexes) in misses.items()]
+    chunks = [
+        (documents[start : start + CHUNK_SIZE], basepath, block_cache)
+        for start in range(0, len(documents), CHUNK_SIZE)
+    ]
+    if executor is not None and len(chunks) > 1:
+        rendered = executor.map(render_chunk, chunks)
+    elif executor is None and len(chunks) > 1 and resolve_jobs(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=resolve_jobs(jobs)) as pool:
+            rendered = list(pool.map(render_chunk, chunks))
+    else:
+        rendered = map(render_chunk, chunks)
+
+    chunk_html = (html for chunk in rendered for html in chunk)
+    for (key, indexes), html in zip(misses.values(), chunk_html):
+        if cache is not None:
+            cache.put(key, html)
+        for index in indexes:
+            results[index] = html
+    return results
@@ -0,0 +1,193 @@
+import json
+import os
+import re
+from block_handler import BlockType, heading_level
+
+SEARCH_VERSION = 1
+TERM_PATTERN = re.compile(r"\w+")
+MIN_TERM_LENGTH = 2
+TITLE_WEIGHT = 8
+HEADING_WEIGHTS = (4, 3, 2, 2, 2, 2)
+BODY_WEIGHT = 1
+
+
+def tokenize(text):
+    return [term for term in TERM_PATTERN.findall(text.lower()) if len(term) >= MIN_TERM_LENGTH]
+
+
+def shard_name(term):
+    # Shards by first character so a client knows which file holds a term.
+    first = term[0]
+    if "a" <= first <= "z":
+        return first
+    if "0" <= first <= "9":
+        return "0"
+    return "_"
+
+
+class TermCollector:
+    # Receives a page's text nodes while it is rendered and adds up a weighted
+    # frequency for every term, counting heading text more than body text.
+    __slots__ = ("terms", "weight")
+
+    def __init__(self):
+        self.terms = {}
+        self.weight = BODY_WEIGHT
+
+    def start_block(self, block):
+        if block.block_type == BlockType.HEADING:
+            self.weight = HEADING_WEIGHTS[heading_level(block.lines[0]) - 1]
+        else:
+            self.weight = BODY_WEIGHT
+
+    def add_text(self, text, weight=None):
+        weight = self.weight if weight is None else weight
+        terms = self.terms
+        for term in tokenize(text):
+            terms[term] = terms.get(term, 0) + weight
+
+    def add_text_nodes(self, text_nodes):
+        for text_node in text_nodes:
+            self.add_text(text_node.text)
+
+
+def write_if_changed(path, data):
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    except OSError:
+        pass
+    temporary_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.tmp")
+    with open(temporary_path, "wb") as f:
+        f.write(data)
+    os.replace(temporary_path, path)
+    return True
+
+
+class SearchIndex:
+    # Inverted index of the site written under <output_dir>/search: pages.json lists
+    # [url, title] by page id, and terms-<c>.json maps each term starting with c to a
+    # flat [page id, score, ...] list, best match first. Per-page terms are kept in
+    # state_path so an incremental build only re-renders pages that changed.
+    def __init__(self, output_dir, state_path, basepath="/", directory="search"):
+        self.output_dir = output_dir
+        self.state_path = state_path
+        self.basepath = basepath
+        self.directory = directory
+        self.state = self.load_state()
+        self.added = {}
+
+    def __getstate__(self):
+        # Pool workers only collect pages; the saved state stays with the parent.
+        return {**self.__dict__, "state": None}
+
+    def load_state(self):
+        try:
+            with open(self.state_path, "r") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = None
+        if not isinstance(state, dict) or state.get("version") != SEARCH_VERSION or state.get("basepath") != self.basepath:
+            state = {"version": SEARCH_VERSION, "basepath": self.basepath, "ids": {}, "pages": {}, "files": []}
+        return state
+
+    def save_state(self):
+        state_directory = os.path.dirname(self.state_path)
+        if state_directory:
+            os.makedirs(state_directory, exist_ok=True)
+        temporary_path = f"{self.state_path}.tmp"
+        with open(temporary_path, "w") as f:
+            json.dump(self.state, f, separators=(",", ":"), sort_keys=True)
+        os.replace(temporary_path, self.state_path)
+
+    def page_key(self, destination_path):
+        return os.path.relpath(destination_path, self.output_dir).replace(os.sep, "/")
+
+    def has_page(self, destination_path):
+        return self.page_key(destination_path) in self.state["pages"]
+
+    def output_files(self):
+        return [os.path.join(self.directory, name) for name in self.state["files"]]
+
+    def add_page(self, destination_path, title, collector):
+        terms = collector.terms
+        for term in tokenize(title):
+            terms[term] = terms.get(term, 0) + TITLE_WEIGHT
+        page_key = self.page_key(destination_path)
+        self.added[page_key] = {"url": f"{self.basepath}{page_key}", "title": title, "terms": terms}
+
+    def take_stats(self):
+        added = self.added
+        self.added = {}
+        return added
+
+    def merge_stats(self, added):
+        self.added.update(added)
+
+    def write(self, destination_paths):
+        # Folds pages rendered in this build into the saved state, drops pages that no
+        # longer exist and rewrites only the files whose contents changed.
+        pages = self.state["pages"]
+        pages.update(self.added)
+        self.added = {}
+        current = {self.page_key(path) for path in destination_paths}
+        for page_key in [page_key for page_key in pages if page_key not in current]:
+            del pages[page_key]
+
+        ids = {page_key: page_id for page_key, page_id in self.state["ids"].items() if page_key in pages}
+        free_ids = sorted(set(range(len(ids) + len(pages))) - set(ids.values()), reverse=True)
+        for page_key in sorted(pages):
+            if page_key not in ids:
+                ids[page_key] = free_ids.pop()
+        self.state["ids"] = ids
+
+        listing = [None] * (max(ids.values()) + 1 if ids else 0)
+        postings = {}
+        for page_key, page in pages.items():
+            page_id = ids[page_key]
+            listing[page_id] = [page["url"], page["title"]]
+            for term, score in page["terms"].items():
+                postings.setdefault(term, []).append((score, page_id))
+        shards = {}
+        for term, matches in postings.items():
+            matches.sort(key=lambda match: (-match[0], match[1]))
+            shards.setdefault(shard_name(term), {})[term] = [value for score, page_id in matches for value in (page_id, score)]
+
+        files = {"pages.json": {"version": SEARCH_VERSION, "pages": listing}}
+        for name, terms in shards.items():
+            files[f"terms-{name}.json"] = terms
+        index_dir = os.path.join(self.output_dir, self.directory)
+        os.makedirs(index_dir, exist_ok=True)
+        sizes = {}
+        rewritten = 0
+        for name, content in files.items():
+            data = json.dumps(content, separators=(",", ":"), sort_keys=True, ensure_ascii=False).encode("utf-8")
+            sizes[name] = len(data)
+            rewritten += write_if_changed(os.path.join(index_dir, name), data)
+        for name in self.state["files"]:
+            if name not in files and os.path.exists(os.path.join(index_dir, name)):
+                os.remove(os.path.join(index_dir, name))
+        self.state["files"] = sorted(files)
+        self.save_state()
+
+        report = {
+            "pages": len(pages),
+            "terms": len(postings),
+            "files": len(files),
+            "rewritten": rewritten,
+            "bytes": sum(sizes.values()),
+            "largest": max(sizes.items(), key=lambda item: item[1]),
+        }
+        print(self.summary(report))
+        return report
+
+    def summary(self, report):
+        name, size = report["largest"]
+        return (
+            f"Search index: {report['pages']} pages, {report['terms']} terms in {report['files']} files "
+            f"({report['rewritten']} rewritten), {report['bytes']} bytes, largest {name} at {size} bytes"
+        )
+
+    def __repr__(self):
+        return f"SearchIndex({self.output_dir}, {self.state_path})"
@@ -0,0 +1,125 @@
+import hashlib
+import os
+from manifest import *
+from asset_sync import copy_file, remove_empty_directories
+
+
+def parse_shard(value):
+    index, separator, count = value.partition("/")
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise ValueError(f"Shard must look like I/N, got {value!r}") from None
+    if not separator or count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Shard must look like I/N with 1 <= I <= N, got {value!r}")
+    return index, count
+
+
+def stable_hash(relative_path):
+    # Hash the path with forward slashes so every runner agrees on the assignment.
+    key = relative_path.replace(os.sep, "/").encode("utf-8")
+    return int.from_bytes(hashlib.sha256(key).digest()[:8], "big")
+
+
+def assign_shards(pages, count, balance=False):
+    # Maps each page's relative path to a shard number in 1..count. With balance the
+    # largest sources go first to whichever shard holds the fewest bytes so far.
+    if not balance:
+        return {relative_path: stable_hash(relative_path) % count + 1 for relative_path, _, _ in pages}
+    sized = sorted(
+        ((os.path.getsize(source_path), stable_hash(relative_path), relative_path) for relative_path, source_path, _ in pages),
+        key=lambda item: (-item[0], item[1], item[2]),
+    )
+    loads = [0] * count
+    assignment = {}
+    for size, _, relative_path in sized:
+        shard = min(range(count), key=lambda index: (loads[index], index))
+        loads[shard] += size
+        assignment[relative_path] = shard + 1
+    return assignment
+
+
+def select_shard(pages, shard, balance=False):
+    index, count = shard
+    assignment = assign_shards(pages, count, balance)
+    return [page for page in pages if assignment[page[0]] == index]
+
+
+def merge_manifests(manifests):
+    # Combines partial manifests from every shard of one build, refusing to guess when
+    # shards are missing, disagree on the build settings or claim the same page or output.
+    if not manifests:
+        raise ValueError("No shard manifests to merge")
+    counts = {manifest.get("shard", (None, None))[1] for manifest in manifests}
+    if len(counts) != 1 or None in counts:
+        raise ValueError(f"Shard manifests disagree on the shard count: {sorted(map(str, counts))}")
+    count = counts.pop()
+    indexes = sorted(manifest["shard"][0] for manifest in manifests)
+    if indexes != list(range(1, count + 1)):
+        raise ValueError(f"Expected shards 1..{count}, got {indexes}")
+
+    merged = empty_manifest()
+    outputs = {}
+    settings = None
+    for manifest in manifests:
+        for relative_path, entry in manifest["pages"].items():
+            if relative_path in merged["pages"]:
+                raise ValueError(f"Page {relative_path} was built by more than one shard")
+            if entry["output"] in outputs:
+                raise ValueError(f"Output {entry['output']} is claimed by {outputs[entry['output']]} and {relative_path}")
+            entry_settings = (
+                entry["template_hash"],
+                entry["basepath"],
+                entry.get("assets"),
+                entry.get("render_version"),
+                entry.get("minify", False),
+            )
+            if settings is None:
+                settings = entry_settings
+            elif entry_settings != settings:
+                raise ValueError(f"Page {relative_path} was built with a different template, basepath, assets or renderer")
+            merged["pages"][relative_path] = entry
+            outputs[entry["output"]] = relative_path
+    return merged
+
+
+def shard_manifest_path(shard_dir):
+    return os.path.join(shard_dir, "manifest.json")
+
+
+def shard_output_dir(shard_dir):
+    return os.path.join(shard_dir, "docs")
+
+
+def merge_shards(shard_dirs, destination_dir, manifest_path):
+    manifests = []
+    for shard_dir in shard_dirs:
+        manifest = load_manifest(shard_manifest_path(shard_dir))
+        if "shard" not in manifest:
+            raise ValueError(f"No shard manifest in {shard_dir}")
+        manifests.append(manifest)
+    merged = merge_manifests(manifests)
+
+    copied = 0
+    for shard_dir, manifest in zip(shard_dirs, manifests):
+        for relative_path, entry in manifest["pages"].items():
+            source_path = os.path.join(shard_output_dir(shard_dir), entry["output"])
+            if hash_file(source_path) != entry["output_hash"]:
+                raise ValueError(f"Output for {relative_path} in {shard_dir} does not match its manifest")
+            copy_file(source_path, os.path.join(destination_dir, entry["output"]))
+            copied += 1
+
+    removed = 0
+    for relative_path, entry in load_manifest(manifest_path)["pages"].items():
+        if relative_path in merged["pages"]:
+            continue
+        stale_path = os.path.join(destination_dir, entry["output"])
+        if os.path.isfile(stale_path):
+            os.remove(stale_path)
+            removed += 1
+    if removed:
+        remove_empty_directories(destination_dir)
+
+    save_manifest(manifest_path, merged)
+    print(f"Merged {len(shard_dirs)} shards into {destination_dir}: {copied} pages, removed {removed} stale")
+    return merged
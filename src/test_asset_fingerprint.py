@@ -0,0 +1,117 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from asset_fingerprint import *
+from main import build, parse_args, project_paths
+from page_template import PageTemplate, rewrite_url
+
+
+class TestAssetMap(unittest.TestCase):
+    def test_fingerprint_name(self):
+        self.assertEqual(fingerprint_name(os.path.join("images", "tom.png"), "3f9a1c0000"), os.path.join("images", "tom.3f9a1c.png"))
+        self.assertEqual(fingerprint_name("LICENSE", "abcdef99"), "LICENSE.abcdef")
+
+    def test_rewrite_keeps_query_and_fragment(self):
+        assets = AssetMap({"index.css": "index.3f9a1c.css"})
+        self.assertEqual(assets.rewrite("/index.css?v=1#top"), "/index.3f9a1c.css?v=1#top")
+        self.assertEqual(assets.rewrite("/other.css"), "/other.css")
+        self.assertEqual(rewrite_url("/index.css", "/site/", assets), "/site/index.3f9a1c.css")
+        self.assertEqual(rewrite_url("index.css", "/site/", assets), "index.css")
+
+    def test_template_references(self):
+        assets = AssetMap({"index.css": "index.3f9a1c.css"})
+        template = PageTemplate('<link href="/index.css"><a href="/blog/">{{ Title }}</a>', "/site/", assets)
+        self.assertEqual(template.render({"Title": "x"}), '<link href="/site/index.3f9a1c.css"><a href="/site/blog/">x</a>')
+
+    def test_digest_tracks_mapping(self):
+        self.assertEqual(AssetMap({"a.css": "a.111111.css"}).digest, AssetMap({"a.css": "a.111111.css"}).digest)
+        self.assertNotEqual(AssetMap({"a.css": "a.111111.css"}).digest, AssetMap({"a.css": "a.222222.css"}).digest)
+
+    def test_hashes_are_cached_by_mtime(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            static_dir = os.path.join(tmpdir, "static")
+            os.makedirs(static_dir)
+            path = os.path.join(static_dir, "a.css")
+            cache_path = os.path.join(tmpdir, "hashes.json")
+            with open(path, "w") as f:
+                f.write("one")
+            os.utime(path, ns=(1, 1))
+            first = hash_static_files(static_dir, cache_path)
+            with open(path, "w") as f:
+                f.write("two")
+            os.utime(path, ns=(1, 1))
+            self.assertEqual(hash_static_files(static_dir, cache_path), first)
+            os.utime(path, ns=(2, 2))
+            self.assertNotEqual(hash_static_files(static_dir, cache_path), first)
+
+
+class TestFingerprintBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.root = self.tmpdir.name
+        self.write("template.html", '<link href="/index.css"><title>{{ Title }}</title><body>{{ Content }}</body>')
+        self.write("content/index.md", "# Home\n\n![Logo](/images/logo.png) [Robots](/robots.txt)")
+        self.write("static/index.css", "body {}")
+        self.write("static/images/logo.png", "png")
+        self.write("static/robots.txt", "User-agent: *")
+        self.paths = project_paths(self.root)
+
+    def write(self, relative_path, text):
+        path = os.path.join(self.root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def build(self, *args):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            build(parse_args(["/site/", "--root", self.root, "--fingerprint-assets", *args]), self.paths)
+        return output.getvalue()
+
+    def asset_manifest(self):
+        with open(os.path.join(self.root, "docs", ASSET_MANIFEST_NAME)) as f:
+            return json.load(f)
+
+    def page(self):
+        with open(os.path.join(self.root, "docs", "index.html")) as f:
+            return f.read()
+
+    def test_outputs_and_references(self):
+        self.build("--check-links")
+        manifest = self.asset_manifest()
+        self.assertEqual(sorted(manifest), ["/images/logo.png", "/index.css"])
+        css = manifest["/index.css"]
+        self.assertTrue(os.path.exists(os.path.join(self.root, "docs", css[1:])))
+        self.assertFalse(os.path.exists(os.path.join(self.root, "docs", "index.css")))
+        self.assertTrue(os.path.exists(os.path.join(self.root, "docs", "robots.txt")))
+        self.assertIn(f'href="/site{css}"', self.page())
+        self.assertIn(f'src="/site{manifest["/images/logo.png"]}"', self.page())
+        self.assertIn('href="/site/robots.txt"', self.page())
+        with open(self.paths["link_report"]) as f:
+            report = json.load(f)
+        self.assertEqual((report["broken"], report["template_broken"]), ({}, []))
+
+    def test_fingerprints_are_stable_and_follow_changes(self):
+        self.build("--incremental")
+        first = self.asset_manifest()
+        output = self.build("--incremental")
+        self.assertEqual(self.asset_manifest(), first)
+        self.assertIn("Rebuilt 0 pages", output)
+
+        self.write("static/index.css", "body { color: red; }")
+        output = self.build("--incremental")
+        second = self.asset_manifest()
+        self.assertNotEqual(second["/index.css"], first["/index.css"])
+        self.assertEqual(second["/images/logo.png"], first["/images/logo.png"])
+        self.assertIn("Rebuilt 1 pages", output)
+        self.assertIn(second["/index.css"], self.page())
+        self.assertFalse(os.path.exists(os.path.join(self.root, "docs", first["/index.css"][1:])))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+
+from asset_sync import copy_file, sync_directory
+
+
+class TestAssetSync(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.source_dir = os.path.join(self.tmpdir.name, "static")
+        self.destination_dir = os.path.join(self.tmpdir.name, "docs")
+        self.write(os.path.join(self.source_dir, "index.css"), "body {}")
+        self.write(os.path.join(self.source_dir, "images", "a.png"), "png bytes")
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_first_sync_copies_everything(self):
+        stats = sync_directory(self.source_dir, self.destination_dir)
+        self.assertEqual(stats, {"copied": 2, "unchanged": 0, "deleted": 0})
+        self.assertEqual(self.read(os.path.join(self.destination_dir, "images", "a.png")), "png bytes")
+
+    def test_second_sync_copies_nothing(self):
+        sync_directory(self.source_dir, self.destination_dir)
+        self.assertEqual(
+            sync_directory(self.source_dir, self.destination_dir),
+            {"copied": 0, "unchanged": 2, "deleted": 0},
+        )
+
+    def test_changed_file_is_copied(self):
+        sync_directory(self.source_dir, self.destination_dir)
+        self.write(os.path.join(self.source_dir, "index.css"), "body { color: red }")
+        self.assertEqual(sync_directory(self.source_dir, self.destination_dir)["copied"], 1)
+        self.assertEqual(self.read(os.path.join(self.destination_dir, "index.css")), "body { color: red }")
+
+    def test_touched_file_with_same_content_is_skipped_when_verifying_hash(self):
+        sync_directory(self.source_dir, self.destination_dir)
+        os.utime(os.path.join(self.source_dir, "index.css"), (0, 0))
+        stats = sync_directory(self.source_dir, self.destination_dir, verify_hash=True)
+        self.assertEqual(stats["copied"], 0)
+
+    def test_verifying_hash_leaves_hard_linked_destination_untouched(self):
+        sync_directory(self.source_dir, self.destination_dir)
+        destination_path = os.path.join(self.destination_dir, "index.css")
+        linked_path = os.path.join(self.tmpdir.name, "live.css")
+        os.link(destination_path, linked_path)
+        live_stat = os.stat(linked_path)
+        os.utime(os.path.join(self.source_dir, "index.css"), (0, 0))
+        stats = sync_directory(self.source_dir, self.destination_dir, verify_hash=True)
+        self.assertEqual(stats["copied"], 0)
+        self.assertEqual(os.stat(linked_path).st_mtime_ns, live_stat.st_mtime_ns)
+
+    def test_stale_files_are_deleted_but_protected_files_kept(self):
+        self.write(os.path.join(self.destination_dir, "old", "stale.png"), "old")
+        self.write(os.path.join(self.destination_dir, "blog", "index.html"), "<html>")
+        stats = sync_directory(self.source_dir, self.destination_dir, protected=[os.path.join("blog", "index.html")])
+        self.assertEqual(stats["deleted"], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.destination_dir, "old")))
+        self.assertTrue(os.path.exists(os.path.join(self.destination_dir, "blog", "index.html")))
+
+    def test_missing_source_raises(self):
+        with self.assertRaises(ValueError):
+            sync_directory(os.path.join(self.tmpdir.name, "missing"), self.destination_dir)
+
+    def test_copy_file_preserves_contents_and_mtime(self):
+        source_path = os.path.join(self.source_dir, "index.css")
+        destination_path = os.path.join(self.tmpdir.name, "copy", "index.css")
+        copy_file(source_path, destination_path)
+        self.assertEqual(self.read(destination_path), "body {}")
+        self.assertEqual(os.stat(destination_path).st_mtime_ns, os.stat(source_path).st_mtime_ns)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import pickle
+import unittest
+
+from block_cache import BlockCache
+from rawnode import RawNode
+from website_handler import markdown_to_html_node
+
+PAGE = "# Title\n\nDisclaimer with **bold** text.\n\n- one\n- two"
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_matches_uncached_render(self):
+        cache = BlockCache()
+        expected = markdown_to_html_node(PAGE).to_html()
+        self.assertEqual(markdown_to_html_node(PAGE, block_cache=cache).to_html(), expected)
+        self.assertEqual(markdown_to_html_node(PAGE, block_cache=cache).to_html(), expected)
+        self.assertEqual((cache.stats["hits"], cache.stats["misses"]), (3, 3))
+
+    def test_edit_rerenders_only_changed_block(self):
+        cache = BlockCache()
+        markdown_to_html_node(PAGE, block_cache=cache)
+        cache.take_stats()
+        edited = PAGE.replace("Disclaimer", "Notice")
+        html = markdown_to_html_node(edited, block_cache=cache).to_html()
+        self.assertIn("<p>Notice with <b>bold</b> text.</p>", html)
+        self.assertEqual((cache.stats["hits"], cache.stats["misses"]), (2, 1))
+
+    def test_key_depends_on_basepath(self):
+        cache = BlockCache()
+        markdown = "[home](/index.html)"
+        markdown_to_html_node(markdown, "/", block_cache=cache)
+        html = markdown_to_html_node(markdown, "/site/", block_cache=cache).to_html()
+        self.assertIn('href="/site/index.html"', html)
+        self.assertEqual(cache.stats["hits"], 0)
+
+    def test_evicts_least_recently_used(self):
+        cache = BlockCache(max_bytes=30)
+        cache.put(("k", "paragraph", "a"), "<p>" + "a" * 10 + "</p>")
+        cache.put(("k", "paragraph", "b"), "<p>" + "b" * 10 + "</p>")
+        self.assertIsNone(cache.get(("k", "paragraph", "a")))
+        self.assertIsNotNone(cache.get(("k", "paragraph", "b")))
+        self.assertEqual(cache.stats["evictions"], 1)
+
+    def test_unpickled_copies_share_entries_in_process(self):
+        cache = BlockCache()
+        cache.put(("k", "paragraph", "a"), "<p>a</p>")
+        first = pickle.loads(pickle.dumps(cache))
+        first.put(("k", "paragraph", "b"), "<p>b</p>")
+        second = pickle.loads(pickle.dumps(cache))
+        self.assertEqual(second.get(("k", "paragraph", "b")), "<p>b</p>")
+
+    def test_raw_node_is_emitted_as_is(self):
+        node = RawNode("<p>a &amp; b</p>")
+        self.assertEqual(node.to_html(), "<p>a &amp; b</p>")
+        self.assertEqual("".join(node.iter_html()), "<p>a &amp; b</p>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
+import random
 import unittest
 
-from block_handler import BlockType, block_to_block_type, markdown_to_blocks
+from block_handler import Block, BlockType, block_to_block_type, iter_blocks, markdown_to_blocks, parse_blocks
 
 
 class TestBlockHandler(unittest.TestCase):
@@ -103,5 +104,33 @@ This is the same paragraph on a new line
         )
 
 
+    def test_parse_blocks_records_types_and_line_ranges(self):
+        markdown = "# Heading\n\n\nSome text\nmore text\n\n- a\n- b\n"
+        self.assertEqual(
+            parse_blocks(markdown),
+            [
+                Block(BlockType.HEADING, ["# Heading"], 1, 1),
+                Block(BlockType.PARAGRAPH, ["Some text", "more text"], 4, 5),
+                Block(BlockType.UNORDERED_LIST, ["- a", "- b"], 7, 8),
+            ],
+        )
+
+    def test_parse_blocks_line_range_skips_whitespace_only_lines(self):
+        blocks = parse_blocks("intro\n\n   \n  text  \n \n")
+        self.assertEqual(blocks[1], Block(BlockType.PARAGRAPH, ["text"], 4, 4))
+
+    def test_iter_blocks_accepts_any_line_iterable(self):
+        blocks = list(iter_blocks(iter(["```", "code", "```", "", "1. one"])))
+        self.assertEqual([block.block_type for block in blocks], [BlockType.CODE, BlockType.ORDERED_LIST])
+
+    def test_markdown_to_blocks_matches_split_and_strip(self):
+        rng = random.Random(5)
+        pieces = ["\n", "\n\n", " ", "\t", "a", "# h", "- i", "1. o", "> q", "```"]
+        for _ in range(3000):
+            markdown = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 16)))
+            expected = [block.strip() for block in markdown.split("\n\n") if block.strip()]
+            self.assertEqual(markdown_to_blocks(markdown), expected, msg=repr(markdown))
+
+
 if __name__ == "__main__":
     unittest.main()
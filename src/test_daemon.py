@@ -0,0 +1,87 @@
+import contextlib
+import io
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+from daemon import BuildDaemon, serve
+from daemon_client import send_request
+from main import build, parse_args, project_paths
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "needs Unix domain sockets")
+class TestBuildDaemon(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.root = self.tmpdir.name
+        self.write("template.html", "<title>{{ Title }}</title><body>{{ Content }}</body>")
+        self.write("content/index.md", "# Home\n\nShared footer.")
+        self.write("content/blog/index.md", "# Blog\n\nShared footer.")
+        self.write("static/index.css", "body {}")
+        self.paths = project_paths(self.root)
+        self.socket_path = os.path.join(self.root, "daemon.sock")
+        # The daemon thread logs every page it writes.
+        self.enterContext(contextlib.redirect_stdout(io.StringIO()))
+        build(parse_args(["/", "--root", self.root, "--incremental"]), self.paths)
+        self.daemon = BuildDaemon(self.paths, "/")
+        thread = threading.Thread(target=serve, args=(self.daemon, self.socket_path), daemon=True)
+        thread.start()
+        self.addCleanup(thread.join, 5)
+        self.addCleanup(self.request, {"command": "shutdown"})
+        for _ in range(500):
+            if os.path.exists(self.socket_path):
+                break
+            threading.Event().wait(0.01)
+
+    def write(self, relative_path, text):
+        path = os.path.join(self.root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def read(self, relative_path):
+        with open(os.path.join(self.root, relative_path)) as f:
+            return f.read()
+
+    def request(self, request):
+        return send_request(self.socket_path, request, timeout=10)
+
+    def test_rebuild_paths(self):
+        self.write("content/blog/index.md", "# Blog\n\nEdited.")
+        response = self.request({"command": "rebuild", "paths": ["blog/index.md"]})
+        self.assertTrue(response["ok"], response)
+        self.assertEqual(response["result"]["pages"], ["blog/index.md"])
+        self.assertIn("<p>Edited.</p>", self.read("docs/blog/index.html"))
+
+    def test_rebuild_absolute_path_and_removed_page(self):
+        os.remove(os.path.join(self.root, "content", "blog", "index.md"))
+        response = self.request({"command": "rebuild", "paths": [os.path.join(self.root, "content", "blog", "index.md")]})
+        self.assertEqual(response["result"]["removed"], ["blog/index.md"])
+        self.assertFalse(os.path.exists(os.path.join(self.root, "docs", "blog", "index.html")))
+
+    def test_rebuild_all_reuses_blocks(self):
+        self.request({"command": "rebuild_all"})
+        response = self.request({"command": "rebuild_all"})
+        self.assertEqual(response["result"]["pages"], 2)
+        status = self.request({"command": "status"})["result"]
+        self.assertGreater(status["block_cache"]["hits"], 0)
+        self.assertEqual(status["requests"], 3)
+
+    def test_rebuild_changed(self):
+        self.write("content/new.md", "# New")
+        response = self.request({"command": "rebuild_changed"})
+        self.assertEqual(response["result"]["pages"], ["new.md"])
+        self.assertEqual(self.request({"command": "rebuild_changed"})["result"]["pages"], [])
+
+    def test_errors_are_reported(self):
+        response = self.request({"command": "rebuild", "paths": ["../outside.md"]})
+        self.assertFalse(response["ok"])
+        self.assertIn("Not a content page", response["error"])
+        self.assertFalse(self.request({"command": "bogus"})["ok"])
+
+
+if __name__ == "__main__":
+    unittest.main()
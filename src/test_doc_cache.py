@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+
+from doc_cache import DocumentCache
+
+
+class TestDocumentCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.cache = DocumentCache(os.path.join(self.tmpdir.name, "documents"))
+
+    def test_miss_then_hit(self):
+        key = self.cache.key("# Title", "1\0/")
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, "<div><h1>Title</h1></div>")
+        self.assertEqual(self.cache.get(key), "<div><h1>Title</h1></div>")
+        stats = self.cache.take_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertGreater(stats["bytes_written"], 0)
+        self.assertEqual(stats["bytes_read"], stats["bytes_written"])
+        self.assertEqual(self.cache.stats["hits"], 0)
+
+    def test_key_depends_on_render_key(self):
+        self.assertNotEqual(self.cache.key("# Title", "1\0/"), self.cache.key("# Title", "1\0/docs/"))
+
+    def test_corrupt_entry_is_a_miss(self):
+        key = self.cache.key("text", "1\0/")
+        self.cache.put(key, "<p>text</p>")
+        with open(self.cache.entry_path(key), "wb") as f:
+            f.write(b"not zlib")
+        self.assertIsNone(self.cache.get(key))
+
+    def test_prune_evicts_least_recently_used(self):
+        self.cache.max_bytes = 1
+        keys = [self.cache.key(str(index), "1") for index in range(3)]
+        for age, key in enumerate(keys):
+            self.cache.put(key, "x" * 100)
+            os.utime(self.cache.entry_path(key), ns=(age, age))
+        self.cache.max_bytes = os.path.getsize(self.cache.entry_path(keys[0])) * 2
+        self.assertEqual(self.cache.prune(), 2)
+        self.assertFalse(os.path.exists(self.cache.entry_path(keys[0])))
+        self.assertTrue(os.path.exists(self.cache.entry_path(keys[2])))
+
+
+if __name__ == "__main__":
+    unittest.main()
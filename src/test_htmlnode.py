@@ -1,6 +1,6 @@
 import unittest
 
-from htmlnode import HTMLNode
+from htmlnode import HTMLNode, escape_attribute, escape_text
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -19,6 +19,30 @@ class TestHTMLNode(unittest.TestCase):
         node = HTMLNode("div", "Hello World", None, None)
         self.assertEqual(node.props_to_html(), "")
     
+    def test_props_to_html_escapes_values(self):
+        node = HTMLNode("a", "x", None, {"href": '/search?q="a"&b=<c>'})
+        self.assertEqual(node.props_to_html(), ' href="/search?q=&quot;a&quot;&amp;b=&lt;c&gt;"')
+        node = HTMLNode("img", "", None, {"src": "/a.png", "alt": 'Tom & "Goldberry"'})
+        self.assertEqual(node.props_to_html(), ' src="/a.png" alt="Tom &amp; &quot;Goldberry&quot;"')
+        node = HTMLNode("img", "", None, {"alt": "a<b", "src": "/a.png"})
+        self.assertEqual(node.props_to_html(), ' alt="a&lt;b" src="/a.png"')
+
+    def test_props_to_html_accepts_non_string_values(self):
+        node = HTMLNode("a", None, None, {"width": 100})
+        self.assertEqual(node.props_to_html(), ' width="100"')
+        node = HTMLNode("a", "x", None, {"href": 7})
+        self.assertEqual(node.props_to_html(), ' href="7"')
+        node = HTMLNode("img", "", None, {"src": "/a.png", "alt": 3.5})
+        self.assertEqual(node.props_to_html(), ' src="/a.png" alt="3.5"')
+        self.assertEqual(HTMLNode("a", "x", None, {"href": 1}).props_to_html(), ' href="1"')
+        self.assertEqual(HTMLNode("a", "x", None, {"href": True}).props_to_html(), ' href="True"')
+
+    def test_escape_fast_path_returns_the_same_string(self):
+        text = "nothing to escape here"
+        self.assertIs(escape_text(text), text)
+        self.assertIs(escape_attribute(text), text)
+        self.assertEqual(escape_text('a & <b> "c"'), 'a &amp; &lt;b&gt; "c"')
+
     def test_repr(self):
         node = HTMLNode("div", "Hello World", None, {"class": "my-div"})
         self.assertEqual(repr(node), "HTMLNode(div, Hello World, None, {'class': 'my-div'})")
@@ -0,0 +1,70 @@
+import random
+import unittest
+
+from inline_handler import text_to_textnodes, text_to_textnodes_multipass, text_to_textnodes_single_pass
+
+EXISTING_CASES = [
+    "",
+    "just plain text",
+    "This is **bold** text",
+    "A **bold** and **strong** line",
+    "Use `code` here",
+    "**bold**",
+    "a **** b",
+    "This has **unclosed bold",
+    "good *italic* and bad *italic",
+    "This is a [link](https://example.com) in text",
+    "This is an ![image](https://example.com/image.png) in text",
+    "This is text with an ![image](https://i.imgur.com/zjjcJKZ.png) and another ![second image](https://i.imgur.com/3elNhQu.png)",
+    "This is a [link](https://example.com) and an ![image](https://example.com/image.png) in text",
+    "start **bold** *italic* _also italic_ `code` ![image](https://example.com/a.png) [link](https://example.com)",
+    "[a](![b)](c)",
+    "![x](y[z](w)",
+    "!![x](y)",
+    "a***b***c",
+    "`a*b*c`",
+    "**a `b** c`",
+]
+
+ALPHABET = ["a", "b", " ", "*", "**", "_", "`", "[", "]", "(", ")", "!", "![", "](", "x.png"]
+
+
+def run_engine(engine, text):
+    try:
+        return ("ok", engine(text))
+    except Exception as error:
+        return ("error", str(error))
+
+
+class TestInlineTokenizer(unittest.TestCase):
+    def assert_engines_agree(self, text):
+        self.assertEqual(
+            run_engine(text_to_textnodes_single_pass, text),
+            run_engine(text_to_textnodes_multipass, text),
+            msg=repr(text),
+        )
+
+    def test_default_engine_is_single_pass(self):
+        text = "some **bold** and [a link](/x)"
+        self.assertEqual(text_to_textnodes(text), text_to_textnodes_single_pass(text))
+
+    def test_existing_cases_agree(self):
+        for text in EXISTING_CASES:
+            self.assert_engines_agree(text)
+
+    def test_generated_inputs_agree(self):
+        rng = random.Random(1234)
+        for _ in range(5000):
+            text = "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 24)))
+            self.assert_engines_agree(text)
+
+    def test_generated_well_formed_inputs_agree(self):
+        rng = random.Random(99)
+        pieces = ["word ", "**bold** ", "*em* ", "_em_ ", "`code` ", "[link](/a) ", "![img](/b.png) "]
+        for _ in range(2000):
+            text = "".join(rng.choice(pieces) for _ in range(rng.randint(1, 12)))
+            self.assert_engines_agree(text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -32,5 +32,13 @@ class TestLeafNode(unittest.TestCase):
         node = LeafNode("p", "Hello, world!")
         self.assertEqual(node.to_html(), "<p>Hello, world!</p>")
 
+    def test_to_html_escapes_value(self):
+        self.assertEqual(LeafNode(None, "a < b & c").to_html(), "a &lt; b &amp; c")
+        self.assertEqual(LeafNode("code", "<div>").to_html(), "<code>&lt;div&gt;</code>")
+
+    def test_iter_html(self):
+        node = LeafNode("a", "link", {"href": "/"})
+        self.assertEqual(list(node.iter_html()), ['<a href="/">link</a>'])
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,100 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from link_graph import *
+from main import build, parse_args, project_paths
+from website_handler import markdown_to_html_node
+
+
+class TestLinkCollector(unittest.TestCase):
+    def test_collects_urls_before_basepath(self):
+        collector = LinkCollector()
+        markdown_to_html_node("[home](/) and ![map](/images/map.png)\n\n- [post](/blog/)", "/site/", collector=collector)
+        self.assertEqual(collector.links, ["/", "/blog/"])
+        self.assertEqual(collector.images, ["/images/map.png"])
+
+    def test_resolve_target(self):
+        cases = {
+            "/": "index.html",
+            "/blog/": "blog/index.html",
+            "/blog": "blog",
+            "/images/a%20b.png#top": "images/a b.png",
+            "../about/": "blog/about/index.html",
+            "notes.html": "blog/post/notes.html",
+            "https://example.com/": None,
+            "mailto:someone@example.com": None,
+            "#section": None,
+        }
+        for url, expected in cases.items():
+            with self.subTest(url=url):
+                self.assertEqual(resolve_target("blog/post/index.html", url), expected)
+
+    def test_target_exists_through_directory_index(self):
+        self.assertTrue(target_exists("blog", {"blog/index.html"}))
+        self.assertFalse(target_exists("blog", {"blog.html"}))
+
+
+class TestLinkCheck(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.root = self.tmpdir.name
+        self.write("template.html", '<link href="/index.css"><title>{{ Title }}</title><body>{{ Content }}</body>')
+        self.write("content/index.md", "# Home\n\n[Blog](/blog) and [About](/about/)")
+        self.write("content/blog/index.md", "# Blog\n\n![Logo](/logo.png) [Home](/)")
+        self.write("content/about/index.md", "# About\n\n[Missing](/missing/)")
+        self.write("content/lonely.md", "# Lonely\n\n[Home](/)")
+        self.write("static/index.css", "body {}")
+        self.write("static/logo.png", "png")
+        self.paths = project_paths(self.root)
+
+    def write(self, relative_path, text):
+        path = os.path.join(self.root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def build(self, *args):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            build(parse_args(["/", "--root", self.root, "--check-links", *args]), self.paths)
+        with open(self.paths["link_report"]) as f:
+            return json.load(f), output.getvalue()
+
+    def test_reports_broken_links_and_orphans(self):
+        report, output = self.build()
+        about_source = os.path.join(self.paths["content"], "about", "index.md")
+        self.assertEqual(report["broken"], {about_source: ["/missing/"]})
+        self.assertEqual(report["orphans"], ["lonely.html"])
+        self.assertEqual(report["template_broken"], [])
+        self.assertIn(f"Broken link in {about_source}: /missing/", output)
+        self.assertIn("Orphan page: lonely.html", output)
+
+    def test_incremental_recheck(self):
+        self.build("--incremental")
+        self.write("content/blog/index.md", "# Blog\n\nNew words. ![Logo](/logo.png) [Home](/)")
+        report, _ = self.build("--incremental")
+        self.assertEqual(report["checked"], 0)
+
+        self.write("content/missing/index.md", "# Missing\n\n[Home](/)")
+        report, _ = self.build("--incremental")
+        self.assertEqual(report["checked"], 2)
+        self.assertEqual(report["broken"], {})
+
+        os.remove(os.path.join(self.root, "static", "logo.png"))
+        report, _ = self.build("--incremental")
+        self.assertEqual(report["checked"], 1)
+        self.assertEqual(list(report["broken"].values()), [["/logo.png"]])
+
+    def test_broken_template_link(self):
+        os.remove(os.path.join(self.root, "static", "index.css"))
+        report, _ = self.build()
+        self.assertEqual(report["template_broken"], ["template.html: /index.css"])
+
+
+if __name__ == "__main__":
+    unittest.main()
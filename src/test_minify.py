@@ -0,0 +1,98 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from minify import Minifier, collapse_whitespace, minify_markup
+from page_template import PageTemplate
+from website_handler import generate_pages_recursive, markdown_to_html_node, render_key
+
+
+class TestMinify(unittest.TestCase):
+    def test_collapse_whitespace(self):
+        text = "already minimal"
+        self.assertIs(collapse_whitespace(text), text)
+        self.assertEqual(collapse_whitespace("a  b\n\tc "), "a b c ")
+        self.assertEqual(collapse_whitespace("a  b  c"), "a  b c")
+
+    def test_minify_markup_keeps_preformatted_elements(self):
+        html = (
+            "\n<html>\n  <head>\n    <style>\n      p {  margin: 0; }\n    </style>\n  </head>\n"
+            "  <body>\n    <p>Hello   <b>world</b></p>\n    <pre>\n  keep   this\n</pre>\n  </body>\n</html>\n"
+        )
+        self.assertEqual(
+            minify_markup(html),
+            "<html><head><style>\n      p {  margin: 0; }\n    </style></head>"
+            "<body><p>Hello <b>world</b></p><pre>\n  keep   this\n</pre></body></html>",
+        )
+
+    def test_minify_markup_keeps_space_between_inline_elements(self):
+        self.assertEqual(
+            minify_markup("<p><span>a</span>\n  <span>b</span></p>"),
+            "<p><span>a</span> <span>b</span></p>",
+        )
+        self.assertEqual(
+            minify_markup("<!doctype html>\n<ul>\n  <li><a>a</a>\n    <em>b</em></li>\n</ul>"),
+            "<!doctype html><ul><li><a>a</a> <em>b</em></li></ul>",
+        )
+
+    def test_template_counts_bytes_saved(self):
+        text = "<html>\n  <title>{{ Title }}</title>\n  <body>{{ Content }}</body>\n</html>\n"
+        template = PageTemplate(text, minify=True)
+        self.assertEqual(template.render({"Title": "T", "Content": "C"}), "<html><title>T</title><body>C</body></html>")
+        self.assertEqual(template.bytes_saved, 8)
+        self.assertEqual(PageTemplate(text).bytes_saved, 0)
+
+    def test_text_is_collapsed_outside_code(self):
+        minifier = Minifier()
+        markdown = "Some   spaced \ttext with `code   inside`\n\n```\nkeep    this\n```"
+        node = markdown_to_html_node(markdown, minifier=minifier)
+        self.assertEqual(
+            node.to_html(),
+            "<div><p>Some spaced text with <code>code   inside</code></p><pre><code>keep    this\n</code></pre></div>",
+        )
+        self.assertEqual(minifier.stats["text_bytes_saved"], 3)
+        self.assertNotEqual(render_key("/", minifier=minifier), render_key("/"))
+
+    def test_stats_merge(self):
+        minifier = Minifier()
+        minifier.text("a    b")
+        stats = minifier.take_stats()
+        self.assertEqual(minifier.stats["text_bytes_saved"], 0)
+        minifier.merge_stats(stats)
+        self.assertEqual(minifier.summary(), "Minified 0 pages: saved 3 bytes (0 from the template, 3 from text)")
+
+
+class TestMinifiedBuild(unittest.TestCase):
+    def test_minify_setting_change_rebuilds_pages(self):
+        with tempfile.TemporaryDirectory() as root:
+            content_dir = os.path.join(root, "content")
+            os.makedirs(content_dir)
+            with open(os.path.join(content_dir, "index.md"), "w") as f:
+                f.write("# Home\n\nSome   text")
+            template_path = os.path.join(root, "template.html")
+            with open(template_path, "w") as f:
+                f.write("<html>\n  <body>{{ Content }}</body>\n</html>\n")
+            destination_dir = os.path.join(root, "docs")
+            manifest_path = os.path.join(root, "manifest.json")
+
+            def build(minifier=None):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result = generate_pages_recursive(
+                        content_dir, template_path, destination_dir, "/", manifest_path, minifier=minifier
+                    )
+                return result["rebuilt"]
+
+            self.assertEqual(build(), 1)
+            minifier = Minifier()
+            self.assertEqual(build(minifier), 1)
+            self.assertEqual(build(minifier), 0)
+            self.assertEqual(minifier.stats["pages"], 1)
+            with open(os.path.join(destination_dir, "index.html")) as f:
+                self.assertEqual(f.read(), "<html><body><div><h1>Home</h1><p>Some text</p></div></body></html>")
+            self.assertEqual(build(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from page_template import PageTemplate, rewrite_url
+
+
+class TestPageTemplate(unittest.TestCase):
+    def test_compiles_static_chunks_and_names(self):
+        template = PageTemplate("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        self.assertEqual(template.chunks, ["<title>", "</title><main>", "</main>"])
+        self.assertEqual(template.names, ["Title", "Content"])
+
+    def test_render_fills_placeholders(self):
+        template = PageTemplate("<title>{{ Title }}</title>{{ Content }}")
+        self.assertEqual(
+            template.render({"Title": "Home", "Content": "<p>hi</p>"}),
+            "<title>Home</title><p>hi</p>",
+        )
+
+    def test_basepath_applied_to_static_parts_only(self):
+        template = PageTemplate('<link href="/index.css"><script src="/app.js"></script>{{ Content }}', "/docs/")
+        html = template.render({"Content": '<a href="/raw">'})
+        self.assertEqual(html, '<link href="/docs/index.css"><script src="/docs/app.js"></script><a href="/raw">')
+
+    def test_custom_placeholders(self):
+        template = PageTemplate("<meta name=\"author\" content=\"{{ author }}\">{{ Content }}")
+        self.assertEqual(
+            template.render({"author": "Tolkien", "Content": ""}),
+            '<meta name="author" content="Tolkien">',
+        )
+
+    def test_unfilled_placeholder_is_left_in_place(self):
+        template = PageTemplate("{{ Title }} by {{ author }}")
+        self.assertEqual(template.render({"Title": "Home"}), "Home by {{ author }}")
+
+    def test_rewrite_url(self):
+        self.assertEqual(rewrite_url("/images/a.png", "/docs/"), "/docs/images/a.png")
+        self.assertEqual(rewrite_url("https://example.com", "/docs/"), "https://example.com")
+        self.assertEqual(rewrite_url("/images/a.png", "/"), "/images/a.png")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import io
 import unittest
 
 from leafnode import LeafNode
@@ -33,5 +34,22 @@ class TestParentNode(unittest.TestCase):
             "<div><span><b>grandchild</b></span></div>",
         )
 
+    def test_iter_html_matches_to_html(self):
+        node = ParentNode("div", [ParentNode("p", [LeafNode("b", "Bold"), LeafNode(None, " text")])], {"id": "x"})
+        chunks = list(node.iter_html())
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), node.to_html())
+
+    def test_write_html(self):
+        node = ParentNode("ul", [ParentNode("li", [LeafNode(None, "one")])])
+        buffer = io.StringIO()
+        node.write_html(buffer)
+        self.assertEqual(buffer.getvalue(), "<ul><li>one</li></ul>")
+
+    def test_iter_html_missing_tag(self):
+        node = ParentNode(None, [LeafNode("b", "Bold")])
+        with self.assertRaises(ValueError):
+            list(node.iter_html())
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
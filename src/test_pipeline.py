@@ -0,0 +1,136 @@
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+
+from pipeline import ByteBudget, threaded_stage
+from website_handler import generate_page, read_page_header
+
+SRC = os.path.dirname(os.path.abspath(__file__))
+# Size of the page in the RSS test. The default keeps the suite quick; set
+# SSG_HUGE_PAGE_MB=300 to exercise a multi-hundred-megabyte page.
+HUGE_PAGE_MB = int(os.environ.get("SSG_HUGE_PAGE_MB", "4"))
+RSS_BUDGET_MB = 48
+TEMPLATE = "<title>{{ Title }}</title><body>{{ Content }}</body>"
+CHUNK = (
+    "Some **bold** text with a [link](/blog/post) and `code`.\n\n"
+    "- first item\n- second _item_\n\n"
+    "> quoted line\n\n"
+    "```\nprint('hello')\n```\n\n"
+    "## A heading\n\n"
+)
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+class TestPipeline(unittest.TestCase):
+    def test_threaded_stage_keeps_order(self):
+        self.assertEqual(list(threaded_stage(range(50), lambda item: item * 2, 2)), list(range(0, 100, 2)))
+
+    def test_threaded_stage_reraises(self):
+        def fail(item):
+            if item == 3:
+                raise ValueError("bad item")
+            return item
+
+        with self.assertRaisesRegex(ValueError, "bad item"):
+            list(threaded_stage(range(10), fail))
+
+    def test_closing_early_stops_the_thread(self):
+        before = threading.active_count()
+        results = threaded_stage(range(1000), lambda item: item, 1)
+        next(results)
+        results.close()
+        self.assertEqual(threading.active_count(), before)
+
+    def test_byte_budget(self):
+        budget = ByteBudget(10)
+        budget.acquire(6)
+        acquired = threading.Event()
+        thread = threading.Thread(target=lambda: (budget.acquire(6), acquired.set()))
+        thread.start()
+        self.assertFalse(acquired.wait(0.05))
+        budget.release(6)
+        self.assertTrue(acquired.wait(5))
+        thread.join()
+        budget.release(6)
+        budget.acquire(50)
+        self.assertEqual(budget.peak, 50)
+
+
+class TestStreamedPages(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.template_path = os.path.join(self.tmpdir.name, "template.html")
+        write(self.template_path, "<title>{{ Title }}</title><p>{{ author }}</p><body>{{ Content }}</body>")
+
+    def render(self, markdown, stream_threshold):
+        source_path = os.path.join(self.tmpdir.name, "page.md")
+        destination_path = os.path.join(self.tmpdir.name, f"page-{stream_threshold}.html")
+        write(source_path, markdown)
+        generate_page(source_path, self.template_path, destination_path, "/docs/", log=False, stream_threshold=stream_threshold)
+        with open(destination_path) as f:
+            return f.read()
+
+    def test_streamed_output_matches(self):
+        for markdown in (
+            "# Title\n\n" + CHUNK * 3,
+            "---\nauthor: Ann\n---\n" + CHUNK + "# Late title\n",
+            "---\nauthor: unterminated\n\n# Title\n\ntext",
+            "# Title\n\nno trailing newline",
+        ):
+            with self.subTest(markdown=markdown[:20]):
+                self.assertEqual(self.render(markdown, 0), self.render(markdown, 1 << 30))
+
+    def test_streamed_error_line_numbers(self):
+        with self.assertRaisesRegex(Exception, "line 6:"):
+            self.render("---\nauthor: Ann\n---\n# Title\n\n`unclosed\n", 0)
+
+    def test_header_scan(self):
+        source_path = os.path.join(self.tmpdir.name, "page.md")
+        write(source_path, "---\ntitle_tag: x\n---\nintro\n\n# Heading\n")
+        self.assertEqual(read_page_header(source_path), ({"title_tag": "x"}, "Heading", 4))
+        write(source_path, "no heading")
+        with self.assertRaisesRegex(Exception, "No h1 header"):
+            read_page_header(source_path)
+
+
+class TestMemoryBudget(unittest.TestCase):
+    def test_huge_page_builds_within_rss_budget(self):
+        with tempfile.TemporaryDirectory() as root:
+            page_path = os.path.join(root, "content", "huge.md")
+            os.makedirs(os.path.dirname(page_path))
+            repeats = HUGE_PAGE_MB * 1024 * 1024 // len(CHUNK) + 1
+            with open(page_path, "w") as f:
+                f.write("# Huge page\n\n")
+                for _ in range(repeats):
+                    f.write(CHUNK)
+            write(os.path.join(root, "content", "small.md"), "# Small\n\ntext")
+            write(os.path.join(root, "static", "index.css"), "body {}")
+            write(os.path.join(root, "template.html"), TEMPLATE)
+
+            script = (
+                "import resource, sys\n"
+                f"sys.path.insert(0, {SRC!r})\n"
+                "import main\n"
+                f"main.main(['/', '--root', {root!r}, '--memory-limit', '64'])\n"
+                "print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)\n"
+            )
+            result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True)
+            self.assertEqual(result.returncode, 0, result.stderr)
+            peak_mb = int(result.stdout.split()[-1]) / 1024
+            self.assertLess(peak_mb, RSS_BUDGET_MB)
+            self.assertGreater(os.path.getsize(os.path.join(root, "docs", "huge.html")), HUGE_PAGE_MB * 1024 * 1024)
+
+
+if __name__ == "__main__":
+    unittest.main()
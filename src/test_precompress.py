@@ -0,0 +1,118 @@
+import contextlib
+import gzip
+import io
+import os
+import tempfile
+import unittest
+
+from main import build, parse_args, project_paths
+from precompress import *
+
+
+class TestPrecompressor(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.output_dir = os.path.join(self.tmpdir.name, "docs")
+        self.state_path = os.path.join(self.tmpdir.name, "precompress.json")
+
+    def write(self, relative_path, data):
+        path = os.path.join(self.output_dir, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def compress(self, **kwargs):
+        precompressor = Precompressor(self.state_path, **kwargs)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return precompressor.compress(self.output_dir)
+
+    def sidecar(self, relative_path):
+        path = os.path.join(self.output_dir, relative_path + SIDECAR_SUFFIX)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return gzip.decompress(f.read())
+
+    def test_writes_sidecars_for_compressible_files(self):
+        page = b"<p>ring hobbit shire</p>\n" * 200
+        self.write("blog/index.html", page)
+        self.write("index.css", b"body { color: red; }\n" * 100)
+        self.write("images/logo.png", b"\x89PNG" * 1000)
+        stats = self.compress()
+        self.assertEqual(stats["compressed"], 2)
+        self.assertEqual(self.sidecar(os.path.join("blog", "index.html")), page)
+        self.assertIsNotNone(self.sidecar("index.css"))
+        self.assertIsNone(self.sidecar(os.path.join("images", "logo.png")))
+
+    def test_thresholds(self):
+        self.write("small.html", b"<p>x</p>")
+        self.write("random.js", os.urandom(4096))
+        stats = self.compress()
+        self.assertEqual((stats["compressed"], stats["skipped"]), (0, 2))
+        self.assertIsNone(self.sidecar("small.html"))
+        self.assertIsNone(self.sidecar("random.js"))
+
+        stats = self.compress(min_size=1)
+        self.assertEqual(stats["skipped"], 2)
+        stats = self.compress(min_size=1, min_ratio=0.9)
+        self.assertEqual(stats["compressed"], 1)
+        self.assertIsNotNone(self.sidecar("random.js"))
+
+    def test_only_changed_outputs_are_recompressed(self):
+        page_path = self.write("index.html", b"<p>ring</p>\n" * 200)
+        self.write("about.html", b"<p>shire</p>\n" * 200)
+        self.compress()
+        self.assertEqual(self.compress()["compressed"], 0)
+
+        # Rewritten with the same bytes: hashed again, but not recompressed.
+        self.write("index.html", b"<p>ring</p>\n" * 200)
+        os.utime(page_path, ns=(1, 1))
+        stats = self.compress()
+        self.assertEqual((stats["compressed"], stats["unchanged"]), (0, 2))
+
+        self.write("index.html", b"<p>tower</p>\n" * 200)
+        stats = self.compress()
+        self.assertEqual((stats["compressed"], stats["unchanged"]), (1, 1))
+        self.assertEqual(self.sidecar("index.html"), b"<p>tower</p>\n" * 200)
+
+        os.remove(page_path + SIDECAR_SUFFIX)
+        self.assertEqual(self.compress()["compressed"], 1)
+
+    def test_sidecars_of_removed_outputs_are_removed(self):
+        page_path = self.write("index.html", b"<p>ring</p>\n" * 200)
+        self.compress()
+        self.assertEqual(Precompressor(self.state_path).sidecars(), ["index.html.gz"])
+        os.remove(page_path)
+        stats = self.compress()
+        self.assertEqual(stats["removed"], 1)
+        self.assertFalse(os.path.exists(page_path + SIDECAR_SUFFIX))
+        self.assertEqual(Precompressor(self.state_path).sidecars(), [])
+
+
+class TestPrecompressBuild(unittest.TestCase):
+    def test_static_sidecars_survive_the_sync(self):
+        with tempfile.TemporaryDirectory() as root:
+            for relative_path, text in (
+                ("template.html", "<title>{{ Title }}</title><body>{{ Content }}</body>"),
+                ("content/index.md", "# Home\n\n" + "Ring hobbit shire. " * 200),
+                ("static/index.css", "body { color: red; }\n" * 100),
+            ):
+                path = os.path.join(root, relative_path)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w") as f:
+                    f.write(text)
+            paths = project_paths(root)
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                build(parse_args(["/", "--root", root, "--precompress"]), paths)
+                build(parse_args(["/", "--root", root, "--precompress", "--incremental"]), paths)
+            self.assertIn("Precompressed 0 files (0 -> 0 bytes, 0.0% saved), 2 unchanged", output.getvalue())
+            self.assertIn(f"Published {paths['docs']}: 0 changed, 0 removed", output.getvalue())
+            for relative_path in ("index.html.gz", "index.css.gz"):
+                self.assertTrue(os.path.exists(os.path.join(paths["docs"], relative_path)))
+
+
+if __name__ == "__main__":
+    unittest.main()
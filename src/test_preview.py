@@ -0,0 +1,99 @@
+import os
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+
+from main import project_paths
+from preview import PreviewSite, etag_matches, make_server
+
+
+class TestPreview(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.root = self.tmpdir.name
+        self.write("template.html", "<title>{{ Title }}</title><body>{{ Content }}</body>")
+        self.write("content/index.md", "# Home\n\n[Blog](/blog/)")
+        self.write("content/blog/index.md", "# Blog")
+        self.write("content/about.md", "# About")
+        self.write("static/index.css", "body {}")
+        self.site = PreviewSite(project_paths(self.root), "/site/", max_pages=2)
+        self.server = make_server(self.site, 0, "127.0.0.1")
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def write(self, relative_path, text, mtime=None):
+        path = os.path.join(self.root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        if mtime is not None:
+            os.utime(path, ns=(mtime, mtime))
+
+    def fetch(self, path, headers=None):
+        request = urllib.request.Request(self.base_url + path, headers=headers or {})
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, response.headers, response.read().decode("utf-8")
+        except urllib.error.HTTPError as error:
+            return error.code, error.headers, ""
+
+    def test_renders_pages_without_docs(self):
+        status, headers, body = self.fetch("/site/")
+        self.assertEqual(status, 200)
+        self.assertEqual(body, '<title>Home</title><body><div><h1>Home</h1><p><a href="/site/blog/">Blog</a></p></div></body>')
+        self.assertIn("Blog", self.fetch("/site/blog/")[2])
+        self.assertIn("About", self.fetch("/site/about.html")[2])
+        self.assertIn("Blog", self.fetch("/site/blog")[2])
+        self.assertFalse(os.path.exists(os.path.join(self.root, "docs")))
+
+    def test_serves_static_files_and_missing_paths(self):
+        self.assertEqual(self.fetch("/site/index.css")[2], "body {}")
+        self.assertEqual(self.fetch("/site/missing/")[0], 404)
+        self.assertEqual(self.fetch("/elsewhere/")[0], 404)
+        self.assertEqual(self.fetch("/site/../template.html")[0], 404)
+
+    def test_percent_encoded_paths_are_decoded(self):
+        self.write("content/my post/index.md", "# My post")
+        self.write("static/my file.css", "p {}")
+        self.assertIn("My post", self.fetch("/site/my%20post/")[2])
+        self.assertIn("My post", self.fetch("/site/my%20post")[2])
+        self.assertEqual(self.fetch("/site/my%20file.css")[2], "p {}")
+        self.assertEqual(self.fetch("/site/%2e%2e/template.html")[0], 404)
+        self.assertEqual(self.fetch("/site/blog/%2E%2E/%2e%2e/template.html")[0], 404)
+
+    def test_etag_and_not_modified(self):
+        _, headers, _ = self.fetch("/site/")
+        etag = headers["ETag"]
+        status, _, body = self.fetch("/site/", {"If-None-Match": etag})
+        self.assertEqual((status, body), (304, ""))
+        self.assertEqual(self.fetch("/site/", {"If-None-Match": '"other"'})[0], 200)
+        self.assertTrue(etag_matches(f'"other", W/{etag}', etag))
+
+    def test_cache_is_invalidated_by_source_and_template(self):
+        first_etag = self.fetch("/site/")[1]["ETag"]
+        self.fetch("/site/")
+        self.assertEqual((self.site.stats["hits"], self.site.stats["misses"]), (1, 1))
+
+        self.write("content/index.md", "# Home edited", mtime=1)
+        status, headers, body = self.fetch("/site/", {"If-None-Match": first_etag})
+        self.assertEqual(status, 200)
+        self.assertIn("Home edited", body)
+
+        self.write("template.html", "<h1>{{ Title }}</h1>", mtime=1)
+        self.assertEqual(self.fetch("/site/")[2], "<h1>Home edited</h1>")
+        self.assertEqual(self.site.stats["misses"], 3)
+
+    def test_lru_eviction(self):
+        for path in ("/site/", "/site/blog/", "/site/about.html", "/site/"):
+            self.fetch(path)
+        self.assertEqual(len(self.site.pages), 2)
+        self.assertEqual(self.site.stats["evictions"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
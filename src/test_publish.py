@@ -0,0 +1,120 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from main import build, parse_args, project_paths
+from publish import *
+from website_handler import write_chunks
+
+
+class TestPublish(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.root = self.tmpdir.name
+        self.write("template.html", "<title>{{ Title }}</title><body>{{ Content }}</body>")
+        self.write("content/index.md", "# Home")
+        self.write("content/blog/index.md", "# Blog")
+        self.write("static/index.css", "body {}")
+        self.paths = project_paths(self.root)
+
+    def write(self, relative_path, text):
+        path = os.path.join(self.root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def build(self, *args):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return build(parse_args(["/", "--root", self.root, *args]), self.paths)
+
+    def set_old_mtimes(self):
+        for relative_path in ("docs/index.html", "docs/blog/index.html", "docs/index.css"):
+            os.utime(os.path.join(self.root, relative_path), ns=(1, 1))
+
+    def mtime(self, relative_path):
+        return os.stat(os.path.join(self.root, relative_path)).st_mtime_ns
+
+    def test_first_build_reports_everything(self):
+        published = self.build()
+        self.assertEqual(published["changed"], ["blog/index.html", "index.css", "index.html"])
+        self.assertFalse(os.path.exists(staging_directory(self.paths["docs"])))
+
+    def test_unchanged_files_keep_mtimes(self):
+        self.build()
+        self.set_old_mtimes()
+        self.write("content/blog/index.md", "# Blog\n\nNew post.")
+        published = self.build()
+        self.assertEqual(published, {"changed": ["blog/index.html"], "removed": []})
+        self.assertEqual(self.mtime("docs/index.html"), 1)
+        self.assertNotEqual(self.mtime("docs/blog/index.html"), 1)
+
+    def test_clean_build_keeps_mtimes_of_identical_files(self):
+        self.build()
+        self.set_old_mtimes()
+        published = self.build("--clean")
+        self.assertEqual(published["changed"], [])
+        self.assertEqual(self.mtime("docs/index.css"), 1)
+        self.assertEqual(self.mtime("docs/index.html"), 1)
+
+    def test_removed_pages_and_changed_list(self):
+        self.build()
+        os.remove(os.path.join(self.root, "content", "blog", "index.md"))
+        changed_list = os.path.join(self.root, "changed.txt")
+        published = self.build("--changed-list", changed_list)
+        self.assertEqual(published["removed"], ["blog/index.html"])
+        with open(changed_list) as f:
+            self.assertEqual(f.read(), "")
+
+    def test_failed_build_leaves_live_tree(self):
+        self.build()
+        self.write("content/broken.md", "no title here")
+        with self.assertRaises(Exception):
+            self.build()
+        self.assertTrue(os.path.exists(os.path.join(self.root, "docs", "index.html")))
+        self.assertFalse(os.path.exists(os.path.join(self.root, "docs", "broken.html")))
+        self.assertFalse(os.path.exists(staging_directory(self.paths["docs"])))
+
+    def test_failed_publish_keeps_saved_state(self):
+        self.build("--incremental")
+        with open(self.paths["manifest"]) as f:
+            manifest = f.read()
+        self.write("content/blog/index.md", "# Blog\n\nNew post.")
+        with mock.patch("main.publish_staging", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.build("--incremental")
+        with open(self.paths["manifest"]) as f:
+            self.assertEqual(f.read(), manifest)
+        self.assertFalse(os.path.exists(f"{self.paths['manifest']}.staging"))
+        published = self.build("--incremental")
+        self.assertEqual(published["changed"], ["blog/index.html"])
+
+    def test_symlinked_docs_is_swapped(self):
+        release = os.path.join(self.root, "releases", "first")
+        os.makedirs(release)
+        os.symlink(release, self.paths["docs"])
+        self.build()
+        self.build()
+        target = os.path.realpath(self.paths["docs"])
+        self.assertTrue(os.path.islink(self.paths["docs"]))
+        self.assertTrue(os.path.basename(target).startswith("docs-"))
+        self.assertTrue(os.path.exists(os.path.join(target, "index.html")))
+        self.assertTrue(os.path.isdir(release))
+        self.assertEqual(len([name for name in os.listdir(os.path.dirname(target)) if name.startswith("docs-")]), 1)
+
+    def test_write_chunks_keeps_identical_file(self):
+        path = os.path.join(self.root, "page.html")
+        first_hash = write_chunks(path, ["<p>", "same", "</p>"])
+        os.utime(path, ns=(1, 1))
+        self.assertEqual(write_chunks(path, ["<p>same</p>"]), first_hash)
+        self.assertEqual(os.stat(path).st_mtime_ns, 1)
+        write_chunks(path, ["<p>different</p>"])
+        self.assertNotEqual(os.stat(path).st_mtime_ns, 1)
+        self.assertFalse(os.path.exists(os.path.join(self.root, ".page.html.tmp")))
+
+
+if __name__ == "__main__":
+    unittest.main()
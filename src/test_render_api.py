@@ -0,0 +1,41 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from block_cache import BlockCache
+from render_api import CHUNK_SIZE, render_many, render_markdown
+
+
+class TestRenderMany(unittest.TestCase):
+    def test_matches_single_document_rendering(self):
+        documents = ["# Title\n\nSome **bold** text", "- one\n- two", "[Home](/)"]
+        self.assertEqual(render_many(documents), [render_markdown(document) for document in documents])
+        self.assertEqual(render_many([]), [])
+        self.assertEqual(render_many(["[Home](/)"], "/site")[0], '<div><p><a href="/site/">Home</a></p></div>')
+
+    def test_cache_is_keyed_by_input(self):
+        cache = BlockCache()
+        first = render_many(["# A", "# B", "# A"], cache=cache)
+        self.assertEqual(first, ["<div><h1>A</h1></div>", "<div><h1>B</h1></div>", "<div><h1>A</h1></div>"])
+        self.assertEqual((cache.stats["hits"], cache.stats["misses"]), (0, 2))
+        self.assertEqual(render_many(["# B", "# C", "# B"], cache=cache)[2], "<div><h1>B</h1></div>")
+        self.assertEqual((cache.stats["hits"], cache.stats["misses"]), (1, 3))
+        render_many(["# B"], "/site/", cache=cache)
+        self.assertEqual(cache.stats["misses"], 4)
+
+    def test_executor_keeps_order(self):
+        documents = [f"Paragraph {index} with _emphasis_" for index in range(CHUNK_SIZE * 3 + 5)]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            self.assertEqual(render_many(documents, executor=executor), render_many(documents))
+
+    def test_worker_pool(self):
+        documents = [f"## Heading {index}\n\n`code`" for index in range(CHUNK_SIZE * 2 + 1)]
+        self.assertEqual(render_many(documents, jobs=2), render_many(documents))
+
+    def test_error_names_the_document(self):
+        documents = ["fine"] * CHUNK_SIZE + ["**unclosed"]
+        with self.assertRaisesRegex(Exception, f"document {CHUNK_SIZE}: line 1: .*'\\*\\*'"):
+            render_many(documents)
+
+
+if __name__ == "__main__":
+    unittest.main()
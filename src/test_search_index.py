@@ -0,0 +1,104 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from block_cache import BlockCache
+from main import build, parse_args, project_paths
+from search_index import *
+from website_handler import markdown_to_html_node
+
+
+class TestTermCollector(unittest.TestCase):
+    def test_headings_weigh_more_than_body(self):
+        collector = TermCollector()
+        markdown_to_html_node("## Dragons\n\nDragons and **gold**, with [a map](/map).\n\n```\nhoard()\n```", collector=collector)
+        self.assertEqual(collector.terms["dragons"], HEADING_WEIGHTS[1] + BODY_WEIGHT)
+        self.assertEqual(collector.terms["gold"], BODY_WEIGHT)
+        self.assertIn("map", collector.terms)
+        self.assertIn("hoard", collector.terms)
+        self.assertNotIn("a", collector.terms)
+
+    def test_collector_bypasses_block_cache(self):
+        block_cache = BlockCache()
+        markdown_to_html_node("Cached words", block_cache=block_cache)
+        collector = TermCollector()
+        markdown_to_html_node("Cached words", block_cache=block_cache, collector=collector)
+        self.assertEqual(collector.terms, {"cached": 1, "words": 1})
+
+    def test_shard_names(self):
+        self.assertEqual([shard_name(term) for term in ("apple", "42", "_x", "élan")], ["a", "0", "_", "_"])
+
+
+class TestSearchIndexBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.root = self.tmpdir.name
+        self.write("template.html", "<title>{{ Title }}</title><body>{{ Content }}</body>")
+        self.write("content/index.md", "# Home\n\nWelcome to the shire.")
+        self.write("content/blog/index.md", "# Blog\n\n## Shire news\n\nSecond breakfast.")
+        self.write("static/index.css", "body {}")
+        self.paths = project_paths(self.root)
+
+    def write(self, relative_path, text):
+        path = os.path.join(self.root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def build(self, *args):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            build(parse_args(["/", "--root", self.root, "--search-index", *args]), self.paths)
+        return output.getvalue()
+
+    def read_index(self, name):
+        with open(os.path.join(self.root, "docs", "search", name)) as f:
+            return json.load(f)
+
+    def matches(self, term):
+        pages = self.read_index("pages.json")["pages"]
+        postings = self.read_index(f"terms-{shard_name(term)}.json").get(term, [])
+        return [(pages[postings[index]][0], postings[index + 1]) for index in range(0, len(postings), 2)]
+
+    def test_index_ranks_headings_and_titles(self):
+        output = self.build()
+        self.assertIn("Search index: 2 pages", output)
+        self.assertEqual(self.matches("shire"), [("/blog/index.html", HEADING_WEIGHTS[1]), ("/index.html", BODY_WEIGHT)])
+        self.assertEqual(self.matches("home"), [("/index.html", TITLE_WEIGHT + HEADING_WEIGHTS[0])])
+
+    def test_incremental_update(self):
+        self.build("--incremental")
+        blog_id = [page[0] for page in self.read_index("pages.json")["pages"]].index("/blog/index.html")
+        self.write("content/index.md", "# Home\n\nWelcome to bree.")
+        self.write("content/about.md", "# About\n\nHobbits.")
+        output = self.build("--incremental")
+        self.assertIn("Rebuilt 2 pages, skipped 1", output)
+        self.assertEqual(self.matches("shire"), [("/blog/index.html", HEADING_WEIGHTS[1])])
+        self.assertEqual(self.matches("bree"), [("/index.html", BODY_WEIGHT)])
+        self.assertEqual([page[0] for page in self.read_index("pages.json")["pages"]].index("/blog/index.html"), blog_id)
+
+        os.remove(os.path.join(self.root, "content", "about.md"))
+        self.build("--incremental")
+        self.assertEqual(self.matches("hobbits"), [])
+
+    def test_missing_state_reindexes_skipped_pages(self):
+        self.build("--incremental")
+        os.remove(self.paths["search"])
+        output = self.build("--incremental")
+        self.assertIn("Rebuilt 2 pages", output)
+        self.assertEqual(len(self.matches("shire")), 2)
+
+    def test_parallel_build_matches_serial(self):
+        self.build()
+        serial = self.read_index("terms-s.json")
+        os.remove(self.paths["search"])
+        self.build("--jobs", "2")
+        self.assertEqual(self.read_index("terms-s.json"), serial)
+
+
+if __name__ == "__main__":
+    unittest.main()
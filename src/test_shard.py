@@ -0,0 +1,144 @@
+import filecmp
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from shard import *
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+TEMPLATE = "<html><head><title>{{ Title }}</title></head><body>{{ Content }}</body></html>"
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def partial(index, count, pages):
+    manifest = empty_manifest()
+    manifest["shard"] = [index, count]
+    for relative_path, output in pages:
+        manifest["pages"][relative_path] = {
+            "source_hash": "s",
+            "template_hash": "t",
+            "basepath": "/",
+            "output": output,
+            "output_hash": "o",
+            "output_size": 1,
+        }
+    return manifest
+
+
+class TestShardAssignment(unittest.TestCase):
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for value in ("0/4", "5/4", "2", "a/b", "1/0"):
+            with self.assertRaises(ValueError):
+                parse_shard(value)
+
+    def test_every_page_lands_in_exactly_one_shard(self):
+        pages = [(f"section/page{index}.md", None, None) for index in range(50)]
+        selected = [select_shard(pages, (index, 3)) for index in (1, 2, 3)]
+        self.assertEqual(sorted(page for shard in selected for page in shard), sorted(pages))
+        self.assertTrue(all(selected))
+
+    def test_assignment_is_stable(self):
+        pages = [(f"page{index}.md", None, None) for index in range(20)]
+        self.assertEqual(assign_shards(pages, 4), assign_shards(list(reversed(pages)), 4))
+        self.assertEqual(stable_hash(os.path.join("a", "b.md")), stable_hash("a/b.md"))
+
+    def test_balance_by_size(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            pages = []
+            for index, size in enumerate((900, 500, 400, 300, 200, 100)):
+                path = os.path.join(tmpdir, f"page{index}.md")
+                write(path, "x" * size)
+                pages.append((f"page{index}.md", path, None))
+            assignment = assign_shards(pages, 2, balance=True)
+            loads = {1: 0, 2: 0}
+            for relative_path, source_path, _ in pages:
+                loads[assignment[relative_path]] += os.path.getsize(source_path)
+            self.assertEqual(sorted(loads.values()), [1200, 1200])
+
+
+class TestMergeManifests(unittest.TestCase):
+    def test_merges_disjoint_shards(self):
+        merged = merge_manifests([partial(1, 2, [("a.md", "a.html")]), partial(2, 2, [("b.md", "b.html")])])
+        self.assertEqual(sorted(merged["pages"]), ["a.md", "b.md"])
+        self.assertNotIn("shard", merged)
+
+    def test_missing_shard(self):
+        with self.assertRaisesRegex(ValueError, "Expected shards"):
+            merge_manifests([partial(1, 3, []), partial(3, 3, [])])
+
+    def test_page_built_twice(self):
+        with self.assertRaisesRegex(ValueError, "more than one shard"):
+            merge_manifests([partial(1, 2, [("a.md", "a.html")]), partial(2, 2, [("a.md", "a.html")])])
+
+    def test_conflicting_settings(self):
+        second = partial(2, 2, [("b.md", "b.html")])
+        second["pages"]["b.md"]["basepath"] = "/site/"
+        with self.assertRaisesRegex(ValueError, "different template, basepath, assets or renderer"):
+            merge_manifests([partial(1, 2, [("a.md", "a.html")]), second])
+
+
+class TestShardedBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.root = os.path.join(self.tmpdir.name, "site")
+        for index in range(12):
+            write(
+                os.path.join(self.root, "content", f"section{index % 3}", f"page{index}.md"),
+                f"# Page {index}\n\nSome **text** and a [link](/page{index + 1}.html).\n",
+            )
+        write(os.path.join(self.root, "static", "index.css"), "body { margin: 0; }\n")
+        write(os.path.join(self.root, "template.html"), TEMPLATE)
+
+    def run_main(self, root, *args):
+        result = subprocess.run([sys.executable, MAIN, "/site/", "--root", root, *args], capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        return result.stdout
+
+    def test_shards_in_separate_processes_match_single_build(self):
+        reference = os.path.join(self.tmpdir.name, "reference")
+        shutil.copytree(self.root, reference)
+        self.run_main(reference)
+
+        count = 3
+        shard_dirs = [os.path.join(self.tmpdir.name, f"shard{index}") for index in range(1, count + 1)]
+        processes = [
+            subprocess.Popen(
+                [sys.executable, MAIN, "/site/", "--root", self.root, "--shard", f"{index}/{count}", "--shard-dir", shard_dir],
+                stdout=subprocess.DEVNULL,
+            )
+            for index, shard_dir in enumerate(shard_dirs, 1)
+        ]
+        self.assertEqual([process.wait() for process in processes], [0] * count)
+        self.assertFalse(os.path.exists(os.path.join(self.root, "docs")))
+        self.run_main(self.root, "--merge-shards", *shard_dirs)
+
+        comparison = filecmp.dircmp(os.path.join(self.root, "docs"), os.path.join(reference, "docs"))
+        self.assertEqual(self.differences(comparison), [])
+        self.assertEqual(len(load_manifest(os.path.join(self.root, ".build-cache", "manifest.json"))["pages"]), 12)
+
+    def test_merge_rejects_tampered_output(self):
+        shard_dir = os.path.join(self.tmpdir.name, "only")
+        self.run_main(self.root, "--shard", "1/1", "--shard-dir", shard_dir)
+        write(os.path.join(shard_dir, "docs", "section0", "page0.html"), "tampered")
+        with self.assertRaisesRegex(ValueError, "does not match its manifest"):
+            merge_shards([shard_dir], os.path.join(self.root, "docs"), os.path.join(self.tmpdir.name, "manifest.json"))
+
+    def differences(self, comparison):
+        found = comparison.left_only + comparison.right_only + comparison.diff_files
+        for sub in comparison.subdirs.values():
+            found.extend(self.differences(sub))
+        return found
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import tracing
+from website_handler import generate_pages_recursive, markdown_to_html_node
+
+
+class TestTracing(unittest.TestCase):
+    def tearDown(self):
+        tracing.disable()
+
+    def test_disabled_span_is_shared_no_op(self):
+        self.assertFalse(tracing.is_enabled())
+        self.assertIs(tracing.span("anything"), tracing.NULL_SPAN)
+        tracing.count("ignored")
+        self.assertEqual(tracing.drain(), ([], {}))
+
+    def test_records_nested_spans_and_counters(self):
+        tracer = tracing.enable()
+        markdown_to_html_node("# Title\n\nSome **bold** text")
+        tracing.disable()
+        names = [event["name"] for event in tracer.events]
+        self.assertIn("markdown_to_html_node", names)
+        self.assertEqual(names.count("text_to_textnodes"), 2)
+        outer = next(event for event in tracer.events if event["name"] == "markdown_to_html_node")
+        for event in tracer.events:
+            self.assertGreaterEqual(event["ts"], outer["ts"])
+            self.assertLessEqual(event["ts"] + event["dur"], outer["ts"] + outer["dur"] + 1)
+        self.assertEqual(tracer.counters["blocks_parsed"], 2)
+        self.assertEqual(tracer.counters["nodes_created"], 4)
+
+    def test_counts_from_threads_are_not_lost(self):
+        tracer = tracing.enable()
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                for _ in executor.map(lambda _: [tracing.count("bytes_copied", 2) for _ in range(5000)], range(8)):
+                    pass
+        finally:
+            sys.setswitchinterval(interval)
+        self.assertEqual(tracer.counters["bytes_copied"], 8 * 5000 * 2)
+
+    def test_chrome_trace_export_and_summary(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            content_dir = os.path.join(tmpdir, "content")
+            os.makedirs(content_dir)
+            for name in ("a", "b", "c"):
+                with open(os.path.join(content_dir, f"{name}.md"), "w") as f:
+                    f.write(f"# {name}\n\ntext")
+            template_path = os.path.join(tmpdir, "template.html")
+            with open(template_path, "w") as f:
+                f.write("{{ Title }}{{ Content }}")
+
+            tracer = tracing.enable()
+            generate_pages_recursive(content_dir, template_path, os.path.join(tmpdir, "docs"), "/", jobs=2)
+            tracing.disable()
+            trace_path = os.path.join(tmpdir, "trace.json")
+            tracing.write_chrome_trace(tracer, trace_path)
+            with open(trace_path) as f:
+                trace = json.load(f)
+
+        pages = [event for event in trace["traceEvents"] if event["name"] == "generate_page"]
+        self.assertEqual(len(pages), 3)
+        self.assertTrue(all(event["ph"] == "X" for event in pages))
+        counters = {event["name"]: event["args"] for event in trace["traceEvents"] if event["ph"] == "C"}
+        self.assertEqual(counters["pages_built"], {"pages_built": 3})
+        summary = tracing.summarize(tracer)
+        self.assertIn("Slowest 3 pages:", summary)
+        self.assertIn("a.md", summary)
+
+
+if __name__ == "__main__":
+    unittest.main()
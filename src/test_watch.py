@@ -0,0 +1,108 @@
+import contextlib
+import io
+import os
+import tempfile
+import threading
+import unittest
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+from main import build, parse_args, project_paths
+from watch import RELOAD_SCRIPT, ReloadNotifier, SiteWatcher, TreeScanner, make_handler
+
+
+class TestWatch(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.root = self.tmpdir.name
+        self.write("template.html", "<title>{{ Title }}</title><body>{{ Content }}</body>")
+        self.write("content/index.md", "# Home")
+        self.write("content/blog/index.md", "# Blog")
+        self.write("static/index.css", "body {}")
+        self.paths = project_paths(self.root)
+        with contextlib.redirect_stdout(io.StringIO()):
+            build(parse_args(["/", "--root", self.root, "--incremental"]), self.paths)
+        self.notifier = ReloadNotifier()
+        self.watcher = SiteWatcher(self.paths, "/", self.notifier)
+
+    def write(self, relative_path, text, mtime=None):
+        path = os.path.join(self.root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        if mtime is not None:
+            os.utime(path, ns=(mtime, mtime))
+
+    def read(self, relative_path):
+        with open(os.path.join(self.root, relative_path)) as f:
+            return f.read()
+
+    def poll(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return self.watcher.poll()
+
+    def test_no_changes(self):
+        self.assertIsNone(self.poll())
+        self.assertEqual(self.notifier.version, 0)
+
+    def test_page_edit_rebuilds_only_that_page(self):
+        self.write("content/blog/index.md", "# Blog edited", mtime=1)
+        result = self.poll()
+        self.assertEqual(result["pages"], [os.path.join("blog", "index.md")])
+        self.assertIn("Blog edited", self.read("docs/blog/index.html"))
+        self.assertEqual(self.notifier.version, 1)
+
+    def test_template_change_rebuilds_every_page(self):
+        self.write("template.html", "<h1>{{ Title }}</h1>{{ Content }}", mtime=1)
+        self.assertEqual(len(self.poll()["pages"]), 2)
+        self.assertTrue(self.read("docs/index.html").startswith("<h1>Home</h1>"))
+
+    def test_asset_change_and_page_removal(self):
+        self.write("static/index.css", "body { color: red }", mtime=1)
+        os.remove(os.path.join(self.root, "content", "blog", "index.md"))
+        result = self.poll()
+        self.assertEqual(result["assets"], ["index.css"])
+        self.assertEqual(self.read("docs/index.css"), "body { color: red }")
+        self.assertFalse(os.path.exists(os.path.join(self.root, "docs", "blog", "index.html")))
+
+    def test_failing_page_is_retried_and_others_rebuild(self):
+        self.write("content/a/index.md", "no title", mtime=1)
+        self.write("template.html", "<h1>{{ Title }}</h1>{{ Content }}", mtime=1)
+        result = self.poll()
+        self.assertEqual(result["failed"], [os.path.join("a", "index.md")])
+        self.assertEqual(sorted(result["pages"]), [os.path.join("blog", "index.md"), "index.md"])
+        self.assertTrue(self.read("docs/blog/index.html").startswith("<h1>Blog</h1>"))
+        self.assertTrue(self.read("docs/index.html").startswith("<h1>Home</h1>"))
+
+        self.assertIsNone(self.poll())
+        self.write("content/a/index.md", "# A", mtime=1)
+        self.assertEqual(self.poll()["pages"], [os.path.join("a", "index.md")])
+        self.assertTrue(self.read("docs/a/index.html").startswith("<h1>A</h1>"))
+
+    def test_scanner_reuses_listings_of_unchanged_directories(self):
+        for directory in ("content", "content/blog"):
+            os.utime(os.path.join(self.root, directory), ns=(1, 1))
+        scanner = TreeScanner(self.paths["content"], ".md")
+        scanner.scan()
+        self.assertEqual(scanner.listings[""][0], 1)
+        self.write("content/blog/index.md", "# Blog edited", mtime=2)
+        self.write("content/blog/new.md", "# New")
+        signatures = scanner.scan()
+        self.assertEqual(sorted(signatures), [os.path.join("blog", "index.md"), os.path.join("blog", "new.md"), "index.md"])
+        self.assertEqual(signatures[os.path.join("blog", "index.md")][0], 2)
+
+    def test_server_injects_reload_script(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(self.paths["docs"], self.notifier))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(f"{url}/") as response:
+            self.assertIn(RELOAD_SCRIPT + "</body>", response.read().decode())
+        with urllib.request.urlopen(f"{url}/index.css") as response:
+            self.assertEqual(response.read(), b"body {}")
+
+
+if __name__ == "__main__":
+    unittest.main()
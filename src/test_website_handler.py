@@ -2,7 +2,15 @@ import unittest
 import os
 import tempfile
 
-from website_handler import extract_title, markdown_to_html_node, generate_page
+from doc_cache import DocumentCache
+from manifest import load_manifest, save_manifest
+from website_handler import (
+    extract_metadata,
+    extract_title,
+    generate_page,
+    generate_pages_recursive,
+    markdown_to_html_node,
+)
 
 
 class TestWebsiteHandler(unittest.TestCase):
@@ -29,6 +37,15 @@ class TestWebsiteHandler(unittest.TestCase):
         node = markdown_to_html_node(markdown)
         self.assertEqual(node.to_html(), "<div><pre><code>`literal` **not bold**\n</code></pre></div>")
 
+    def test_text_and_attributes_are_escaped(self):
+        markdown = "[<Back> & home](/?a=1&b=\"2\")\n\n```\n<script>\n```"
+        node = markdown_to_html_node(markdown)
+        self.assertEqual(
+            node.to_html(),
+            '<div><p><a href="/?a=1&amp;b=&quot;2&quot;">&lt;Back&gt; &amp; home</a></p>'
+            "<pre><code>&lt;script&gt;\n</code></pre></div>",
+        )
+
     def test_paragraphs(self):
         md = """
 This is **bolded** paragraph
@@ -61,6 +78,12 @@ the **same** even with inline stuff
             "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
         )
 
+    def test_parse_error_reports_line_number(self):
+        markdown = "# Heading\n\nfine\n\nbroken **bold"
+        with self.assertRaises(Exception) as context:
+            markdown_to_html_node(markdown)
+        self.assertIn("line 5:", str(context.exception))
+
     def test_extract_title_returns_h1_text(self):
         markdown = "# My Page Title\n\nSome paragraph text"
         self.assertEqual(extract_title(markdown), "My Page Title")
@@ -96,6 +119,185 @@ the **same** even with inline stuff
         self.assertIn('href="/docs/"', html)
         self.assertIn('src="/docs/images/pic.png"', html)
 
+    def test_generate_page_fills_metadata_placeholders(self):
+        markdown = "---\nauthor: Tolkien\n---\n# Test Page\n\nBody"
+        template = "<title>{{ Title }}</title><meta content=\"{{ author }}\">{{ Content }}"
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            from_path = os.path.join(tmpdir, "index.md")
+            template_path = os.path.join(tmpdir, "template.html")
+            dest_path = os.path.join(tmpdir, "index.html")
+
+            with open(from_path, "w") as f:
+                f.write(markdown)
+            with open(template_path, "w") as f:
+                f.write(template)
+
+            generate_page(from_path, template_path, dest_path, "/", log=False)
+
+            with open(dest_path, "r") as f:
+                html = f.read()
+
+        self.assertEqual(
+            html,
+            '<title>Test Page</title><meta content="Tolkien"><div><h1>Test Page</h1><p>Body</p></div>',
+        )
+
+    def test_generate_page_escapes_title_and_metadata(self):
+        markdown = '---\ndescription: say "hi" & <bye>\n---\n# Tom & "<Jerry>"\n\nBody'
+        template = (
+            "<title>{{ Title }}</title><meta property=\"og:title\" content=\"{{ Title }}\">"
+            "<meta content=\"{{ description }}\">{{ Content }}"
+        )
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            from_path = os.path.join(tmpdir, "index.md")
+            template_path = os.path.join(tmpdir, "template.html")
+            dest_path = os.path.join(tmpdir, "index.html")
+
+            with open(from_path, "w") as f:
+                f.write(markdown)
+            with open(template_path, "w") as f:
+                f.write(template)
+
+            generate_page(from_path, template_path, dest_path, "/", log=False)
+
+            with open(dest_path, "r") as f:
+                html = f.read()
+
+        self.assertTrue(
+            html.startswith(
+                "<title>Tom &amp; &quot;&lt;Jerry&gt;&quot;</title>"
+                '<meta property="og:title" content="Tom &amp; &quot;&lt;Jerry&gt;&quot;">'
+                '<meta content="say &quot;hi&quot; &amp; &lt;bye&gt;">'
+            ),
+            html,
+        )
+
+    def test_extract_metadata(self):
+        metadata, body = extract_metadata("---\nauthor: Tolkien\ndate: 1954\n---\n# Title")
+        self.assertEqual(metadata, {"author": "Tolkien", "date": "1954"})
+        self.assertEqual(body, "# Title")
+
+    def test_extract_metadata_without_front_matter(self):
+        self.assertEqual(extract_metadata("# Title\n---"), ({}, "# Title\n---"))
+
+
+class TestIncrementalBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        root = self.tmpdir.name
+        self.content_dir = os.path.join(root, "content")
+        self.destination_dir = os.path.join(root, "docs")
+        self.template_path = os.path.join(root, "template.html")
+        self.manifest_path = os.path.join(root, "cache", "manifest.json")
+        self.write(self.template_path, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content_dir, "index.md"), "# Home")
+        self.write(os.path.join(self.content_dir, "blog", "post", "index.md"), "# Post")
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def build(self, basepath="/"):
+        return generate_pages_recursive(
+            self.content_dir, self.template_path, self.destination_dir, basepath, self.manifest_path
+        )
+
+    def test_second_build_skips_unchanged_pages(self):
+        self.assertEqual(self.build(), {"rebuilt": 2, "skipped": 0, "removed": 0})
+        self.assertEqual(self.build(), {"rebuilt": 0, "skipped": 2, "removed": 0})
+
+    def test_rebuilds_only_changed_source(self):
+        self.build()
+        self.write(os.path.join(self.content_dir, "index.md"), "# Changed")
+        self.assertEqual(self.build(), {"rebuilt": 1, "skipped": 1, "removed": 0})
+        with open(os.path.join(self.destination_dir, "index.html")) as f:
+            self.assertIn("Changed", f.read())
+
+    def test_template_or_basepath_change_rebuilds_everything(self):
+        self.build()
+        self.write(self.template_path, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertEqual(self.build()["rebuilt"], 2)
+        self.assertEqual(self.build("/site/")["rebuilt"], 2)
+
+    def test_renderer_change_rebuilds_everything(self):
+        self.build()
+        manifest = load_manifest(self.manifest_path)
+        for entry in manifest["pages"].values():
+            entry["render_version"] = "0"
+        save_manifest(self.manifest_path, manifest)
+        self.assertEqual(self.build()["rebuilt"], 2)
+
+    def test_missing_output_is_rebuilt(self):
+        self.build()
+        os.remove(os.path.join(self.destination_dir, "index.html"))
+        self.assertEqual(self.build(), {"rebuilt": 1, "skipped": 1, "removed": 0})
+
+    def test_template_change_reuses_document_cache(self):
+        doc_cache = DocumentCache(os.path.join(self.tmpdir.name, "cache", "documents"))
+        generate_pages_recursive(
+            self.content_dir, self.template_path, self.destination_dir, "/", self.manifest_path, doc_cache=doc_cache
+        )
+        self.assertEqual(doc_cache.take_stats()["misses"], 2)
+        self.write(self.template_path, "<h1>{{ Title }}</h1>{{ Content }}")
+        generate_pages_recursive(
+            self.content_dir, self.template_path, self.destination_dir, "/", self.manifest_path, doc_cache=doc_cache
+        )
+        stats = doc_cache.take_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 0))
+        with open(os.path.join(self.destination_dir, "index.html")) as f:
+            self.assertEqual(f.read(), "<h1>Home</h1><div><h1>Home</h1></div>")
+
+    def test_removed_source_deletes_output(self):
+        self.build()
+        os.remove(os.path.join(self.content_dir, "blog", "post", "index.md"))
+        self.assertEqual(self.build(), {"rebuilt": 0, "skipped": 1, "removed": 1})
+        self.assertFalse(os.path.exists(os.path.join(self.destination_dir, "blog")))
+
+
+class TestParallelBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        root = self.tmpdir.name
+        self.content_dir = os.path.join(root, "content")
+        self.template_path = os.path.join(root, "template.html")
+        with open(self.template_path, "w") as f:
+            f.write('<title>{{ Title }}</title><link href="/index.css">{{ Content }}')
+        for index in range(6):
+            page_dir = os.path.join(self.content_dir, f"page{index}")
+            os.makedirs(page_dir)
+            with open(os.path.join(page_dir, "index.md"), "w") as f:
+                f.write(f"# Page {index}\n\nSome **bold** and [a link](/page{index + 1})")
+
+    def read_tree(self, directory):
+        files = {}
+        for root, _, names in os.walk(directory):
+            for name in names:
+                path = os.path.join(root, name)
+                with open(path, "rb") as f:
+                    files[os.path.relpath(path, directory)] = f.read()
+        return files
+
+    def test_parallel_output_matches_serial(self):
+        serial_dir = os.path.join(self.tmpdir.name, "serial")
+        parallel_dir = os.path.join(self.tmpdir.name, "parallel")
+        generate_pages_recursive(self.content_dir, self.template_path, serial_dir, "/site/", jobs=1)
+        generate_pages_recursive(self.content_dir, self.template_path, parallel_dir, "/site/", jobs=3)
+        self.assertEqual(self.read_tree(serial_dir), self.read_tree(parallel_dir))
+
+    def test_parallel_build_reports_failed_page(self):
+        broken_path = os.path.join(self.content_dir, "page3", "index.md")
+        with open(broken_path, "w") as f:
+            f.write("No title here")
+        destination_dir = os.path.join(self.tmpdir.name, "docs")
+        with self.assertRaises(Exception) as context:
+            generate_pages_recursive(self.content_dir, self.template_path, destination_dir, "/", jobs=2)
+        self.assertIn(broken_path, str(context.exception))
+
 
 if __name__ == "__main__":
     unittest.main()
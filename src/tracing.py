@@ -0,0 +1,156 @@
+import json
+import os
+import threading
+import time
+
+# Opt-in build instrumentation. While disabled, span() hands back a shared no-op
+# context manager and count() returns immediately, so call sites can stay in hot paths.
+
+_tracer = None
+
+
+class Tracer:
+    def __init__(self, origin=None):
+        self.origin = time.perf_counter_ns() if origin is None else origin
+        self.events = []
+        self.counters = {}
+        # Counters are bumped from the asset-copy thread pool; a read-then-write on the
+        # dict would lose increments without it.
+        self.lock = threading.Lock()
+
+
+class Span:
+    __slots__ = ("tracer", "name", "args", "start")
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end = time.perf_counter_ns()
+        event = {
+            "name": self.name,
+            "ph": "X",
+            "ts": (self.start - self.tracer.origin) / 1000,
+            "dur": (end - self.start) / 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        if self.args:
+            event["args"] = self.args
+        self.tracer.events.append(event)
+        return False
+
+
+class NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+def enable(origin=None):
+    global _tracer
+    _tracer = Tracer(origin)
+    return _tracer
+
+
+def disable():
+    global _tracer
+    tracer = _tracer
+    _tracer = None
+    return tracer
+
+
+def is_enabled():
+    return _tracer is not None
+
+
+def origin():
+    return _tracer.origin if _tracer is not None else None
+
+
+def span(name, args=None):
+    tracer = _tracer
+    if tracer is None:
+        return NULL_SPAN
+    return Span(tracer, name, args)
+
+
+def count(name, amount=1):
+    tracer = _tracer
+    if tracer is None:
+        return
+    with tracer.lock:
+        tracer.counters[name] = tracer.counters.get(name, 0) + amount
+
+
+def drain():
+    # Hands recorded events and counters to the caller (e.g. from a worker process
+    # back to the parent) and starts over with the same clock origin.
+    tracer = _tracer
+    if tracer is None:
+        return [], {}
+    with tracer.lock:
+        events, counters = tracer.events, tracer.counters
+        tracer.events = []
+        tracer.counters = {}
+    return events, counters
+
+
+def merge(events, counters):
+    tracer = _tracer
+    if tracer is None:
+        return
+    tracer.events.extend(events)
+    with tracer.lock:
+        for name, amount in counters.items():
+            tracer.counters[name] = tracer.counters.get(name, 0) + amount
+
+
+def to_chrome_trace(tracer):
+    end = max((event["ts"] + event["dur"] for event in tracer.events), default=0)
+    counter_events = [
+        {"name": name, "ph": "C", "ts": end, "pid": os.getpid(), "tid": 0, "args": {name: amount}}
+        for name, amount in sorted(tracer.counters.items())
+    ]
+    return {"traceEvents": tracer.events + counter_events, "displayTimeUnit": "ms"}
+
+
+def write_chrome_trace(tracer, trace_path):
+    trace_directory = os.path.dirname(trace_path)
+    if trace_directory:
+        os.makedirs(trace_directory, exist_ok=True)
+    with open(trace_path, "w") as f:
+        json.dump(to_chrome_trace(tracer), f)
+
+
+def summarize(tracer, slowest=10):
+    totals = {}
+    for event in tracer.events:
+        total, calls = totals.get(event["name"], (0.0, 0))
+        totals[event["name"]] = (total + event["dur"], calls + 1)
+    lines = ["Stage totals:"]
+    for name, (total, calls) in sorted(totals.items(), key=lambda item: -item[1][0]):
+        lines.append(f"  {name:<28} {total / 1000:10.2f} ms  {calls:8d} calls")
+    if tracer.counters:
+        lines.append("Counters:")
+        for name, amount in sorted(tracer.counters.items()):
+            lines.append(f"  {name:<28} {amount:>14}")
+    pages = [event for event in tracer.events if event["name"] == "generate_page"]
+    if pages:
+        lines.append(f"Slowest {min(slowest, len(pages))} pages:")
+        for event in sorted(pages, key=lambda event: -event["dur"])[:slowest]:
+            lines.append(f"  {event['dur'] / 1000:10.2f} ms  {event['args']['path']}")
+    return "\n".join(lines)
@@ -0,0 +1,336 @@
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from main import build, parse_args, project_paths
+from website_handler import *
+
+RELOAD_PATH = "/__livereload"
+RELOAD_SCRIPT = f'<script>new EventSource("{RELOAD_PATH}").onmessage = () => location.reload();</script>'
+KEEPALIVE_SECONDS = 15
+# A directory modified this recently may still change within the same mtime tick, so
+# its listing is not reused until it is older than this.
+LISTING_SETTLE_NS = 2 * 1000 * 1000 * 1000
+
+
+def file_signature(path):
+    try:
+        file_stat = os.stat(path)
+    except OSError:
+        return None
+    return (file_stat.st_mtime_ns, file_stat.st_size)
+
+
+class TreeScanner:
+    # (mtime_ns, size) signatures of every file under a directory. Adding, removing or
+    # renaming an entry changes the mtime of its directory, so each directory's listing
+    # is kept with that mtime and only directories that changed are listed again.
+    def __init__(self, directory, suffix=""):
+        self.directory = directory
+        self.suffix = suffix
+        self.listings = {}
+
+    def stat_known(self):
+        # Signatures of the files found by the last scan that still exist.
+        signatures = {}
+        for _, files, _ in self.listings.values():
+            for file_path, relative_path in files:
+                try:
+                    file_stat = os.stat(file_path)
+                except OSError:
+                    continue
+                signatures[relative_path] = (file_stat.st_mtime_ns, file_stat.st_size)
+        return signatures
+
+    def list_directory(self, path, prefix, signatures):
+        files, subdirectories = [], []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append((entry.path, f"{prefix}{entry.name}{os.sep}"))
+                elif entry.name.endswith(self.suffix) and entry.is_file():
+                    relative_path = f"{prefix}{entry.name}"
+                    files.append((entry.path, relative_path))
+                    file_stat = entry.stat()
+                    signatures[relative_path] = (file_stat.st_mtime_ns, file_stat.st_size)
+        return files, subdirectories
+
+    def scan(self, known=None):
+        # known is the result of stat_known() from just before, to save statting the
+        # files of unchanged directories twice.
+        if known is None:
+            known = self.stat_known()
+        signatures = {}
+        listings = {}
+        settled_before = time.time_ns() - LISTING_SETTLE_NS
+        pending = [(self.directory, "")]
+        while pending:
+            path, prefix = pending.pop()
+            try:
+                directory_mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            listing = self.listings.get(prefix)
+            if listing is not None and listing[0] == directory_mtime:
+                files, subdirectories = listing[1], listing[2]
+                for _, relative_path in files:
+                    if relative_path in known:
+                        signatures[relative_path] = known[relative_path]
+            else:
+                try:
+                    files, subdirectories = self.list_directory(path, prefix, signatures)
+                except OSError:
+                    continue
+                if directory_mtime >= settled_before:
+                    directory_mtime = None
+            listings[prefix] = (directory_mtime, files, subdirectories)
+            pending.extend(subdirectories)
+        self.listings = listings
+        return signatures
+
+
+def changed_paths(previous, current):
+    changed = [relative_path for relative_path, signature in current.items() if previous.get(relative_path) != signature]
+    removed = [relative_path for relative_path in previous if relative_path not in current]
+    return sorted(changed), sorted(removed)
+
+
+class ReloadNotifier:
+    def __init__(self):
+        self.version = 0
+        self.condition = threading.Condition()
+
+    def notify(self):
+        with self.condition:
+            self.version += 1
+            self.condition.notify_all()
+
+    def wait(self, version, timeout):
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+
+class SiteWatcher:
+    def __init__(self, paths, basepath, notifier=None):
+        self.paths = paths
+        self.basepath = normalize_basepath(basepath)
+        self.notifier = notifier
+        self.block_cache = BlockCache()
+        self.content_scanner = TreeScanner(paths["content"], ".md")
+        self.static_scanner = TreeScanner(paths["static"])
+        self.failed_pages = {}
+        self.failed_assets = {}
+        self.template = file_signature(paths["template"])
+        self.content = self.content_scanner.scan()
+        self.static = self.static_scanner.scan()
+
+    def page_paths(self, relative_path):
+        source_path = os.path.join(self.paths["content"], relative_path)
+        destination_path = os.path.join(self.paths["docs"], os.path.splitext(relative_path)[0] + ".html")
+        return source_path, destination_path
+
+    def generate(self, relative_paths):
+        # Returns the pages that failed. A failing page stops generate_pages, so after
+        # a failure the pages are generated one at a time to rebuild all the others.
+        pages = [self.page_paths(relative_path) for relative_path in relative_paths]
+        try:
+            generate_pages(pages, self.paths["template"], self.basepath, block_cache=self.block_cache)
+            return []
+        except Exception as error:
+            if len(pages) == 1:
+                print(f"Rebuild failed for {relative_paths[0]}: {error}")
+                return list(relative_paths)
+        failed = []
+        for relative_path, page in zip(relative_paths, pages):
+            try:
+                generate_pages([page], self.paths["template"], self.basepath, block_cache=self.block_cache)
+            except Exception as error:
+                print(f"Rebuild failed for {relative_path}: {error}")
+                failed.append(relative_path)
+        return failed
+
+    def apply(self, template, content, static, complete):
+        # Rebuilds what differs from the snapshots and takes the new signatures as the
+        # snapshots. An incomplete pass only has signatures for files already known, so
+        # missing files are left for the complete pass to remove. Paths that fail are
+        # kept out of the snapshots with the signature they failed at, and are retried
+        # once that signature or the template changes.
+        changed_pages, removed_pages = changed_paths(self.content, content)
+        if template != self.template:
+            changed_pages = sorted(content)
+        else:
+            changed_pages = [path for path in changed_pages if self.failed_pages.get(path) != content[path]]
+        changed_assets, removed_assets = changed_paths(self.static, static)
+        changed_assets = [path for path in changed_assets if self.failed_assets.get(path) != static[path]]
+        if complete:
+            removed_pages += [path for path in self.failed_pages if path not in content]
+            removed_assets += [path for path in self.failed_assets if path not in static]
+        else:
+            content = {**self.content, **content}
+            static = {**self.static, **static}
+            removed_pages, removed_assets = [], []
+
+        failed_assets = []
+        for relative_path in changed_assets:
+            try:
+                copy_file(
+                    os.path.join(self.paths["static"], relative_path),
+                    os.path.join(self.paths["docs"], relative_path),
+                )
+            except OSError as error:
+                print(f"Copy failed for {relative_path}: {error}")
+                failed_assets.append(relative_path)
+        for relative_path in removed_assets:
+            remove_output(os.path.join(self.paths["docs"], relative_path), self.paths["docs"])
+        for relative_path in removed_pages:
+            remove_output(self.page_paths(relative_path)[1], self.paths["docs"])
+        failed_pages = self.generate(changed_pages) if changed_pages else []
+
+        for relative_path in changed_pages + removed_pages:
+            self.failed_pages.pop(relative_path, None)
+        for relative_path in changed_assets + removed_assets:
+            self.failed_assets.pop(relative_path, None)
+        for relative_path in failed_pages:
+            self.failed_pages[relative_path] = content[relative_path]
+        for relative_path in failed_assets:
+            self.failed_assets[relative_path] = static[relative_path]
+        for relative_path in self.failed_pages:
+            content.pop(relative_path, None)
+        for relative_path in self.failed_assets:
+            static.pop(relative_path, None)
+        self.template, self.content, self.static = template, content, static
+
+        rebuilt_pages = [relative_path for relative_path in changed_pages if relative_path not in failed_pages]
+        rebuilt_assets = [relative_path for relative_path in changed_assets if relative_path not in failed_assets]
+        removed = removed_pages + removed_assets
+        if (rebuilt_pages or rebuilt_assets or removed) and self.notifier is not None:
+            self.notifier.notify()
+        return rebuilt_pages, rebuilt_assets, removed, failed_pages + failed_assets
+
+    def poll(self):
+        # Edits to known files are rebuilt and reloaded first, without waiting for the
+        # directory pass that finds added and removed files.
+        start = time.perf_counter()
+        template = file_signature(self.paths["template"])
+        known_content = self.content_scanner.stat_known()
+        known_static = self.static_scanner.stat_known()
+        edited = self.apply(template, known_content, known_static, False)
+        found = self.apply(
+            template,
+            self.content_scanner.scan(known_content),
+            self.static_scanner.scan(known_static),
+            True,
+        )
+        pages, assets, removed, failed = (edited[index] + found[index] for index in range(4))
+        if not (pages or assets or removed):
+            return None
+
+        elapsed = time.perf_counter() - start
+        print(
+            f"Rebuilt {len(pages)} pages and {len(assets)} assets, "
+            f"removed {len(removed)} in {elapsed * 1000:.1f} ms"
+        )
+        return {
+            "pages": sorted(pages),
+            "assets": sorted(assets),
+            "removed": removed,
+            "failed": sorted(failed),
+            "seconds": elapsed,
+        }
+
+    def run(self, interval, stop_event):
+        while not stop_event.wait(interval):
+            self.poll()
+
+
+def make_handler(directory, notifier):
+    class LiveReloadHandler(SimpleHTTPRequestHandler):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=directory, **kwargs)
+
+        def do_GET(self):
+            request_path = self.path.split("?", 1)[0].split("#", 1)[0]
+            if request_path == RELOAD_PATH:
+                self.stream_reloads()
+                return
+            file_path = self.translate_path(self.path)
+            if os.path.isdir(file_path) and request_path.endswith("/"):
+                file_path = os.path.join(file_path, "index.html")
+            if file_path.endswith(".html") and os.path.isfile(file_path):
+                self.send_page(file_path)
+                return
+            super().do_GET()
+
+        def send_page(self, file_path):
+            with open(file_path, "rb") as f:
+                body = f.read()
+            closing_tag = body.rfind(b"</body>")
+            script = RELOAD_SCRIPT.encode("utf-8")
+            if closing_tag == -1:
+                body += script
+            else:
+                body = body[:closing_tag] + script + body[closing_tag:]
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def stream_reloads(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            version = notifier.version
+            try:
+                while True:
+                    new_version = notifier.wait(version, KEEPALIVE_SECONDS)
+                    if new_version != version:
+                        version = new_version
+                        self.wfile.write(b"data: reload\n\n")
+                    else:
+                        self.wfile.write(b": keepalive\n\n")
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                return
+
+        def log_message(self, format, *args):
+            pass
+
+    return LiveReloadHandler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild on change and serve docs/ with live reload")
+    parser.add_argument("basepath", nargs="?", default="/")
+    parser.add_argument("--root", default=os.path.join(os.path.dirname(__file__), ".."))
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--interval", type=float, default=0.05, help="seconds between scans (default 0.05)")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    paths = project_paths(args.root)
+    build(parse_args([args.basepath, "--root", args.root, "--incremental"]), paths)
+
+    notifier = ReloadNotifier()
+    server = ThreadingHTTPServer(("", args.port), make_handler(paths["docs"], notifier))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Serving {paths['docs']} at http://localhost:{args.port}/ with live reload")
+
+    watcher = SiteWatcher(paths, args.basepath, notifier)
+    stop_event = threading.Event()
+    try:
+        watcher.run(args.interval, stop_event)
+    except KeyboardInterrupt:
+        stop_event.set()
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
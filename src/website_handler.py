@@ -4,74 +4,156 @@ from htmlnode import *
 from parentnode import *
 from leafnode import *
 from block_handler import *
+from manifest import *
+from page_template import *
+from asset_sync import *
+from shard import *
+from doc_cache import DocumentCache
+from block_cache import BlockCache
+from rawnode import RawNode
+from pipeline import ByteBudget, threaded_stage
+from search_index import SearchIndex, TermCollector
+from link_graph import LinkCollector, LinkGraph
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
 import os
+import re
 import shutil
+import tracing
 
+WRITE_BUFFER_SIZE = 64 * 1024
+# Part of every render cache key; bump it whenever the HTML produced for a given
+# markdown input changes.
+RENDER_VERSION = "5"
+HEADING_TAGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+DEFAULT_MEMORY_LIMIT = 256 * 1024 * 1024
+# Rendering a page as one tree peaks at roughly this many times its source size in RSS
+# (source, blocks, nodes and body string); bigger pages are streamed block by block.
+RENDER_OVERHEAD = 32
+READ_AHEAD_PAGES = 8
+TEMPLATE_LINK_PATTERN = re.compile(r'(?:href|src)="([^"]*)"')
 
-def text_to_children(text):
-    text_nodes = text_to_textnodes(text)
+
+def text_to_children(text, basepath="/", collector=None, assets=None, minifier=None):
+    with tracing.span("text_to_textnodes"):
+        text_nodes = text_to_textnodes(text)
+    tracing.count("nodes_created", len(text_nodes))
+    if collector is not None:
+        collector.add_text_nodes(text_nodes)
+    if basepath != "/" or assets is not None:
+        for text_node in text_nodes:
+            if text_node.url:
+                text_node.url = rewrite_url(text_node.url, basepath, assets)
+    if minifier is not None:
+        for text_node in text_nodes:
+            if text_node.text_type != TextType.CODE:
+                text_node.text = minifier.text(text_node.text)
     return [text_node_to_html_node(text_node) for text_node in text_nodes]
 
 
-def block_to_html_node(block):
-    block_type = block_to_block_type(block)
+def block_to_html_node(block, basepath="/", collector=None, assets=None, minifier=None):
+    if isinstance(block, str):
+        block = text_to_block(block)
+    block_type = block.block_type
+    lines = block.lines
+    if collector is not None:
+        collector.start_block(block)
 
     if block_type == BlockType.PARAGRAPH:
-        paragraph_text = " ".join(block.split("\n"))
-        return ParentNode("p", text_to_children(paragraph_text))
+        paragraph_text = " ".join(lines)
+        return ParentNode("p", text_to_children(paragraph_text, basepath, collector, assets, minifier))
 
     if block_type == BlockType.HEADING:
-        heading_level = 0
-        while heading_level < len(block) and block[heading_level] == "#":
-            heading_level += 1
-        heading_text = block[heading_level + 1 :]
-        return ParentNode(f"h{heading_level}", text_to_children(heading_text))
+        level = heading_level(lines[0])
+        heading_text = block.text[level + 1 :]
+        heading_children = text_to_children(heading_text, basepath, collector, assets, minifier)
+        return ParentNode(HEADING_TAGS[level - 1], heading_children)
 
     if block_type == BlockType.QUOTE:
         quote_lines = []
-        for line in block.split("\n"):
+        for line in lines:
             if line.startswith("> "):
                 quote_lines.append(line[2:])
             else:
                 quote_lines.append(line[1:])
         quote_text = " ".join(quote_lines)
-        return ParentNode("blockquote", text_to_children(quote_text))
+        return ParentNode("blockquote", text_to_children(quote_text, basepath, collector, assets, minifier))
 
     if block_type == BlockType.UNORDERED_LIST:
         list_items = []
-        for line in block.split("\n"):
+        for line in lines:
             item_text = line[2:]
-            list_items.append(ParentNode("li", text_to_children(item_text)))
+            list_items.append(ParentNode("li", text_to_children(item_text, basepath, collector, assets, minifier)))
         return ParentNode("ul", list_items)
 
     if block_type == BlockType.ORDERED_LIST:
         list_items = []
-        for index, line in enumerate(block.split("\n"), start=1):
+        for index, line in enumerate(lines, start=1):
             item_text = line[len(f"{index}. ") :]
-            list_items.append(ParentNode("li", text_to_children(item_text)))
+            list_items.append(ParentNode("li", text_to_children(item_text, basepath, collector, assets, minifier)))
         return ParentNode("ol", list_items)
 
     if block_type == BlockType.CODE:
-        code_text = block[4:-3]
+        code_text = "\n".join(lines[1:])[:-3]
+        if collector is not None:
+            collector.add_text(code_text)
         code_node = text_node_to_html_node(TextNode(code_text, TextType.CODE))
         return ParentNode("pre", [code_node])
 
     raise ValueError(f"Invalid block type: {block_type}")
 
 
-def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
-    children = [block_to_html_node(block) for block in blocks]
-    return ParentNode("div", children)
+def render_key(basepath, assets=None, minifier=None):
+    key = f"{RENDER_VERSION}\0{basepath}"
+    if assets is not None:
+        key = f"{key}\0{assets.digest}"
+    if minifier is not None:
+        key = f"{key}\0minify"
+    return key
+
+
+def cached_block_node(block, basepath, block_cache, key_prefix, assets=None, minifier=None):
+    key = (key_prefix, block.block_type, block.text)
+    html = block_cache.get(key)
+    if html is None:
+        html = block_to_html_node(block, basepath, assets=assets, minifier=minifier).to_html()
+        block_cache.put(key, html)
+    return RawNode(html)
+
+
+def markdown_to_html_node(
+    markdown, basepath="/", first_line=1, block_cache=None, collector=None, assets=None, minifier=None
+):
+    with tracing.span("markdown_to_html_node"):
+        with tracing.span("parse_blocks"):
+            blocks = parse_blocks(markdown)
+        tracing.count("blocks_parsed", len(blocks))
+        key_prefix = render_key(basepath, assets, minifier)
+        children = []
+        for block in blocks:
+            try:
+                # A collector needs every block's text nodes, so it bypasses the block cache.
+                if block_cache is None or collector is not None:
+                    children.append(block_to_html_node(block, basepath, collector, assets, minifier))
+                else:
+                    children.append(cached_block_node(block, basepath, block_cache, key_prefix, assets, minifier))
+            except Exception as error:
+                raise Exception(f"line {block.start_line + first_line - 1}: {error}") from error
+        return ParentNode("div", children)
 
 
-def copy_directory_recursive(source_dir, destination_dir):
+def copy_directory_recursive(source_dir, destination_dir, clean=True):
+    with tracing.span("copy_directory_recursive", {"source": source_dir}):
+        copy_directory_contents(source_dir, destination_dir, clean)
+
+
+def copy_directory_contents(source_dir, destination_dir, clean):
     if not os.path.exists(source_dir):
         raise ValueError(f"Source directory does not exist: {source_dir}")
 
-    if os.path.exists(destination_dir):
+    if clean and os.path.exists(destination_dir):
         shutil.rmtree(destination_dir)
-    os.mkdir(destination_dir)
+    os.makedirs(destination_dir, exist_ok=True)
 
     for item_name in os.listdir(source_dir):
         source_path = os.path.join(source_dir, item_name)
@@ -80,8 +162,9 @@ def copy_directory_recursive(source_dir, destination_dir):
         if os.path.isfile(source_path):
             print(f"Copying file: {source_path} -> {destination_path}")
             shutil.copy(source_path, destination_path)
+            tracing.count("bytes_copied", os.path.getsize(destination_path))
         else:
-            copy_directory_recursive(source_path, destination_path)
+            copy_directory_contents(source_path, destination_path, clean)
 
 
 def extract_title(markdown):
@@ -91,35 +174,256 @@ def extract_title(markdown):
             return line[2:]
     raise Exception("No h1 header found in markdown to extract title from")
 
-def generate_page(from_path, template_path, dest_path, basepath):
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+def extract_metadata(markdown):
+    if not markdown.startswith("---\n"):
+        return {}, markdown
+    end = markdown.find("\n---", 3)
+    if end == -1:
+        return {}, markdown
+    metadata = {}
+    for line in markdown[4:end].split("\n"):
+        key, separator, value = line.partition(":")
+        if separator and key.strip():
+            metadata[key.strip()] = value.strip()
+    body_start = markdown.find("\n", end + 4)
+    body = "" if body_start == -1 else markdown[body_start + 1 :]
+    return metadata, body
+
+
+def normalize_basepath(basepath):
     if not basepath:
         basepath = "/"
     if not basepath.startswith("/"):
         basepath = f"/{basepath}"
     if not basepath.endswith("/"):
         basepath = f"{basepath}/"
-    with open(from_path, "r") as f:
-        markdown = f.read()
-    with open(template_path, "r") as f:
-        template = f.read()
-    html_string = markdown_to_html_node(markdown).to_html()
-    title = extract_title(markdown)
-    final_html = (
-        template
-        .replace("{{ Content }}", html_string)
-        .replace("{{ Title }}", title)
-        .replace('href="/', f'href="{basepath}')
-        .replace('src="/', f'src="{basepath}')
-    )
-    destination_directory = os.path.dirname(dest_path)
-    if destination_directory:
-        os.makedirs(destination_directory, exist_ok=True)
-    with open(dest_path, "w") as f:
-        f.write(final_html)
+    return basepath
+
+
+def write_chunks(dest_path, chunks):
+    # Writes through a temporary sibling and keeps the existing file when the bytes are
+    # identical, so unchanged pages keep their mtime and are never seen half written.
+    digest = hashlib.sha256()
+    buffered = []
+    buffered_size = 0
+    temporary_path = os.path.join(os.path.dirname(dest_path), f".{os.path.basename(dest_path)}.tmp")
+    try:
+        with open(temporary_path, "wb") as f:
+            for chunk in chunks:
+                buffered.append(chunk)
+                buffered_size += len(chunk)
+                if buffered_size >= WRITE_BUFFER_SIZE:
+                    data = "".join(buffered).encode("utf-8")
+                    digest.update(data)
+                    f.write(data)
+                    buffered = []
+                    buffered_size = 0
+            data = "".join(buffered).encode("utf-8")
+            digest.update(data)
+            f.write(data)
+            size = f.tell()
+        tracing.count("bytes_written", size)
+        output_hash = digest.hexdigest()
+        if output_is_unchanged(dest_path, size, output_hash):
+            os.remove(temporary_path)
+            tracing.count("pages_unchanged")
+        else:
+            os.replace(temporary_path, dest_path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+    return output_hash
+
+
+def output_is_unchanged(dest_path, size, output_hash):
+    try:
+        if os.path.getsize(dest_path) != size:
+            return False
+        return hash_file(dest_path) == output_hash
+    except OSError:
+        return False
+
+
+def render_body(
+    markdown, basepath, first_line, doc_cache=None, block_cache=None, collector=None, assets=None, minifier=None
+):
+    if doc_cache is None or collector is not None:
+        return markdown_to_html_node(markdown, basepath, first_line, block_cache, collector, assets, minifier)
+    key = doc_cache.key(markdown, render_key(basepath, assets, minifier))
+    with tracing.span("document_cache_get"):
+        body_html = doc_cache.get(key)
+    if body_html is None:
+        body_html = markdown_to_html_node(
+            markdown, basepath, first_line, block_cache, assets=assets, minifier=minifier
+        ).to_html()
+        with tracing.span("document_cache_put"):
+            doc_cache.put(key, body_html)
+    return body_html
+
+
+class StreamedBody:
+    # Stands in for the body node of a page too large to hold in memory: iter_html reads
+    # the source again and renders it one block at a time.
+    def __init__(
+        self, source_path, first_line, basepath, block_cache=None, collector=None, assets=None, minifier=None
+    ):
+        self.source_path = source_path
+        self.first_line = first_line
+        self.basepath = basepath
+        self.block_cache = block_cache
+        self.collector = collector
+        self.assets = assets
+        self.minifier = minifier
+
+    def iter_lines(self):
+        with open(self.source_path, "r") as f:
+            for line_number, line in enumerate(f, start=1):
+                if line_number >= self.first_line:
+                    yield line[:-1] if line.endswith("\n") else line
+
+    def iter_html(self):
+        key_prefix = render_key(self.basepath, self.assets, self.minifier)
+        yield "<div>"
+        for block in iter_blocks(self.iter_lines()):
+            tracing.count("blocks_parsed")
+            try:
+                if self.block_cache is None or self.collector is not None:
+                    node = block_to_html_node(block, self.basepath, self.collector, self.assets, self.minifier)
+                else:
+                    node = cached_block_node(
+                        block, self.basepath, self.block_cache, key_prefix, self.assets, self.minifier
+                    )
+                html = node.to_html()
+            except Exception as error:
+                raise Exception(f"line {block.start_line + self.first_line - 1}: {error}") from error
+            yield html
+        yield "</div>"
+
+
+class CollectorGroup:
+    # Hands every rendering event to several collectors at once.
+    __slots__ = ("collectors",)
+
+    def __init__(self, collectors):
+        self.collectors = collectors
+
+    def start_block(self, block):
+        for collector in self.collectors:
+            collector.start_block(block)
+
+    def add_text(self, text, weight=None):
+        for collector in self.collectors:
+            collector.add_text(text, weight)
+
+    def add_text_nodes(self, text_nodes):
+        for collector in self.collectors:
+            collector.add_text_nodes(text_nodes)
+
+
+def combine_collectors(*collectors):
+    collectors = [collector for collector in collectors if collector is not None]
+    if not collectors:
+        return None
+    if len(collectors) == 1:
+        return collectors[0]
+    return CollectorGroup(collectors)
+
+
+def read_page_header(source_path):
+    # Front matter and title of a page, read line by line without loading the page.
+    metadata = {}
+    first_line = 1
+    title = None
+    with open(source_path, "r") as f:
+        lines = iter(f)
+        first = next(lines, "")
+        if first == "---\n":
+            front_matter = []
+            for line in lines:
+                if line.startswith("---"):
+                    metadata, _ = extract_metadata("---\n" + "".join(front_matter) + line.rstrip("\n"))
+                    first_line = len(front_matter) + 3
+                    break
+                front_matter.append(line)
+            else:
+                first_line = 1
+        if first_line == 1:
+            f.seek(0)
+            lines = iter(f)
+        for line in lines:
+            if line.startswith("# "):
+                title = line[2:].rstrip("\n")
+                break
+    if title is None:
+        raise Exception("No h1 header found in markdown to extract title from")
+    return metadata, title, first_line
+
+
+def generate_page(
+    from_path,
+    template_path,
+    dest_path,
+    basepath,
+    log=True,
+    template=None,
+    doc_cache=None,
+    block_cache=None,
+    source=None,
+    stream_threshold=DEFAULT_MEMORY_LIMIT // RENDER_OVERHEAD,
+    search_index=None,
+    link_graph=None,
+    assets=None,
+    minifier=None,
+):
+    if log:
+        print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    basepath = normalize_basepath(basepath)
+    with tracing.span("generate_page", {"path": from_path}):
+        if template is None:
+            template = load_template(template_path, basepath, assets, minifier is not None)
+        term_collector = TermCollector() if search_index is not None else None
+        link_collector = LinkCollector() if link_graph is not None else None
+        collector = combine_collectors(term_collector, link_collector)
+        if source is None and os.path.getsize(from_path) > stream_threshold:
+            with tracing.span("read_page_header"):
+                metadata, title, first_line = read_page_header(from_path)
+            body = StreamedBody(from_path, first_line, basepath, block_cache, collector, assets, minifier)
+            tracing.count("pages_streamed")
+        else:
+            if source is None:
+                source = read_source(from_path)
+            metadata, markdown = extract_metadata(source)
+            first_line = source.count("\n", 0, len(source) - len(markdown)) + 1
+            body = render_body(markdown, basepath, first_line, doc_cache, block_cache, collector, assets, minifier)
+            title = extract_title(markdown)
+        destination_directory = os.path.dirname(dest_path)
+        if destination_directory:
+            os.makedirs(destination_directory, exist_ok=True)
+        with tracing.span("render_and_write"):
+            output_hash = write_chunks(
+                dest_path, template.iter_render({**metadata, "Title": title, "Content": body})
+            )
+        if minifier is not None:
+            minifier.add_page(template)
+        if search_index is not None:
+            search_index.add_page(dest_path, title, term_collector)
+        if link_graph is not None:
+            link_graph.add_page(from_path, dest_path, link_collector)
+        tracing.count("pages_built")
+        return output_hash
+
+
+def read_source(source_path):
+    with tracing.span("read_source"):
+        with open(source_path, "r") as f:
+            source = f.read()
+    tracing.count("bytes_read", len(source))
+    return source
 
 
-def generate_pages_recursive(content_dir, template_path, destination_dir, basepath):
+def find_pages(content_dir, destination_dir):
+    pages = []
     for root, _, files in os.walk(content_dir):
         for file_name in files:
             if not file_name.endswith(".md"):
@@ -129,4 +433,278 @@ def generate_pages_recursive(content_dir, template_path, destination_dir, basepa
             relative_path = os.path.relpath(source_path, content_dir)
             destination_relative_path = os.path.splitext(relative_path)[0] + ".html"
             destination_path = os.path.join(destination_dir, destination_relative_path)
-            generate_page(source_path, template_path, destination_path, basepath)
\ No newline at end of file
+            pages.append((relative_path, source_path, destination_path))
+    return pages
+
+
+def page_is_current(entry, source_hash, template_hash, basepath, destination_path, assets_digest=None, minify=False):
+    if entry is None:
+        return False
+    if (
+        entry.get("source_hash") != source_hash
+        or entry.get("template_hash") != template_hash
+        or entry.get("basepath") != basepath
+        or entry.get("assets") != assets_digest
+        or entry.get("render_version") != RENDER_VERSION
+        or entry.get("minify", False) != minify
+    ):
+        return False
+    try:
+        return os.path.getsize(destination_path) == entry.get("output_size")
+    except OSError:
+        return False
+
+
+def remove_output(output_path, destination_dir):
+    if os.path.exists(output_path):
+        print(f"Removing stale page: {output_path}")
+        os.remove(output_path)
+    directory = os.path.dirname(output_path)
+    destination_dir = os.path.abspath(destination_dir)
+    while os.path.abspath(directory).startswith(destination_dir + os.sep):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            break
+        directory = os.path.dirname(directory)
+
+
+def generate_page_job(page_job):
+    source_path, template_path, destination_path, basepath, page_options = page_job
+    try:
+        return generate_page(source_path, template_path, destination_path, basepath, **page_options)
+    except Exception as error:
+        raise Exception(f"Failed to generate page {source_path}: {error}") from error
+
+
+def read_page_job(page_job, budget):
+    # Read stage of the serial pipeline: loads a page's source ahead of rendering unless
+    # it is large enough to be streamed, holding its size against the byte budget.
+    source_path = page_job[0]
+    page_options = page_job[-1]
+    try:
+        size = os.path.getsize(source_path)
+    except OSError as error:
+        raise Exception(f"Failed to generate page {source_path}: {error}") from error
+    if size > page_options["stream_threshold"]:
+        return page_job, 0
+    budget.acquire(size)
+    try:
+        source = read_source(source_path)
+    except BaseException as error:
+        budget.release(size)
+        raise Exception(f"Failed to generate page {source_path}: {error}") from error
+    return (*page_job[:-1], {**page_options, "source": source}), size
+
+
+def generate_pages_serially(page_jobs, read_ahead_bytes):
+    budget = ByteBudget(read_ahead_bytes)
+    pages_read = threaded_stage(page_jobs, lambda page_job: read_page_job(page_job, budget), READ_AHEAD_PAGES)
+    output_hashes = []
+    try:
+        for page_job, size in pages_read:
+            try:
+                output_hashes.append(generate_page_job(page_job))
+            finally:
+                budget.release(size)
+    finally:
+        budget.close()
+        pages_read.close()
+    return output_hashes
+
+
+def take_option_stats(page_options):
+    return {
+        name: option.take_stats() for name, option in page_options.items() if hasattr(option, "take_stats")
+    }
+
+
+def generate_page_worker(page_job):
+    # Runs in a pool process. When the parent is tracing, record this page's spans
+    # against the parent's clock, and ship them back with the result together with
+    # any cache statistics gathered here.
+    *page_job, trace_origin = page_job
+    page_options = page_job[-1]
+    # Options arrive pickled from the parent; drop whatever statistics they carried.
+    take_option_stats(page_options)
+    if trace_origin is None:
+        output_hash = generate_page_job(page_job)
+        return output_hash, None, take_option_stats(page_options)
+    tracing.enable(trace_origin)
+    try:
+        output_hash = generate_page_job(page_job)
+        return output_hash, tracing.drain(), take_option_stats(page_options)
+    finally:
+        tracing.disable()
+
+
+def resolve_jobs(jobs):
+    if not jobs or jobs < 1:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def generate_pages(pages, template_path, basepath, jobs=1, memory_limit=None, **page_options):
+    # Pages are read ahead, parsed, rendered and written as a pipeline. memory_limit caps
+    # the source bytes read ahead and, shared between worker processes, decides which
+    # pages are too big to render as a whole tree and get streamed instead.
+    jobs = resolve_jobs(jobs)
+    basepath = normalize_basepath(basepath)
+    memory_limit = memory_limit or DEFAULT_MEMORY_LIMIT
+    page_options["template"] = load_template(
+        template_path, basepath, page_options.get("assets"), page_options.get("minifier") is not None
+    )
+    if jobs == 1 or len(pages) < 2:
+        page_options["stream_threshold"] = memory_limit // RENDER_OVERHEAD
+        return generate_pages_serially(
+            [(source_path, template_path, destination_path, basepath, page_options) for source_path, destination_path in pages],
+            memory_limit // 4,
+        )
+    page_options["stream_threshold"] = memory_limit // jobs // RENDER_OVERHEAD
+
+    trace_origin = tracing.origin()
+    worker_options = {**page_options, "log": False}
+    page_jobs = [
+        (source_path, template_path, destination_path, basepath, worker_options, trace_origin)
+        for source_path, destination_path in pages
+    ]
+    chunksize = max(1, len(page_jobs) // (jobs * 8))
+    output_hashes = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        try:
+            results = executor.map(generate_page_worker, page_jobs, chunksize=chunksize)
+            for (source_path, destination_path), (output_hash, trace, stats) in zip(pages, results):
+                print(f"Generating page from {source_path} to {destination_path} using {template_path}")
+                if trace is not None:
+                    tracing.merge(*trace)
+                for name, option_stats in stats.items():
+                    page_options[name].merge_stats(option_stats)
+                output_hashes.append(output_hash)
+        except Exception:
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+    return output_hashes
+
+
+def template_links(template_path):
+    with open(template_path, "r") as f:
+        return TEMPLATE_LINK_PATTERN.findall(f.read())
+
+
+def finish_analysis(pages, template_path, destination_dir, search_index=None, link_graph=None, assets=None):
+    # Runs once every page has been written, since the link check needs the whole
+    # output tree, search index included.
+    destination_paths = [destination_path for _, _, destination_path in pages]
+    if search_index is not None:
+        with tracing.span("write_search_index"):
+            search_index.write(destination_paths)
+    if link_graph is not None:
+        with tracing.span("check_links"):
+            extra_links = [(os.path.basename(template_path), url) for url in template_links(template_path)]
+            # Pages and the template link assets by their original names.
+            output_files = [*scan_files(destination_dir), *(assets.files if assets is not None else ())]
+            link_graph.check(destination_paths, output_files, extra_links)
+
+
+def generate_pages_recursive(
+    content_dir,
+    template_path,
+    destination_dir,
+    basepath,
+    manifest_path=None,
+    jobs=1,
+    doc_cache=None,
+    block_cache=None,
+    shard=None,
+    balance_shards=False,
+    memory_limit=None,
+    search_index=None,
+    link_graph=None,
+    assets=None,
+    minifier=None,
+):
+    pages = find_pages(content_dir, destination_dir)
+    if shard is not None:
+        if manifest_path is None:
+            raise ValueError("A sharded build needs a manifest path for its partial manifest")
+        pages = select_shard(pages, shard, balance_shards)
+    if manifest_path is None:
+        generate_pages(
+            [(source_path, destination_path) for _, source_path, destination_path in pages],
+            template_path,
+            basepath,
+            jobs,
+            doc_cache=doc_cache,
+            block_cache=block_cache,
+            memory_limit=memory_limit,
+            search_index=search_index,
+            link_graph=link_graph,
+            assets=assets,
+            minifier=minifier,
+        )
+        finish_analysis(pages, template_path, destination_dir, search_index, link_graph, assets)
+        return {"rebuilt": len(pages), "skipped": 0, "removed": 0}
+
+    basepath = normalize_basepath(basepath)
+    with tracing.span("load_manifest"):
+        previous_pages = load_manifest(manifest_path)["pages"]
+    manifest = empty_manifest()
+    if shard is not None:
+        manifest["shard"] = list(shard)
+    template_hash = hash_file(template_path)
+    assets_digest = assets.digest if assets is not None else None
+    stale_pages = []
+    skipped = 0
+    for relative_path, source_path, destination_path in pages:
+        source_hash = hash_file(source_path)
+        entry = previous_pages.get(relative_path)
+        analyzed = (search_index is None or search_index.has_page(destination_path)) and (
+            link_graph is None or link_graph.has_page(destination_path)
+        )
+        if analyzed and page_is_current(
+            entry, source_hash, template_hash, basepath, destination_path, assets_digest, minifier is not None
+        ):
+            manifest["pages"][relative_path] = entry
+            skipped += 1
+            continue
+        stale_pages.append((relative_path, source_path, destination_path, source_hash))
+
+    output_hashes = generate_pages(
+        [(source_path, destination_path) for _, source_path, destination_path, _ in stale_pages],
+        template_path,
+        basepath,
+        jobs,
+        doc_cache=doc_cache,
+        block_cache=block_cache,
+        memory_limit=memory_limit,
+        search_index=search_index,
+        link_graph=link_graph,
+        assets=assets,
+        minifier=minifier,
+    )
+    for (relative_path, _, destination_path, source_hash), output_hash in zip(stale_pages, output_hashes):
+        manifest["pages"][relative_path] = {
+            "source_hash": source_hash,
+            "template_hash": template_hash,
+            "basepath": basepath,
+            "assets": assets_digest,
+            "render_version": RENDER_VERSION,
+            "minify": minifier is not None,
+            "output": os.path.relpath(destination_path, destination_dir),
+            "output_hash": output_hash,
+            "output_size": os.path.getsize(destination_path),
+        }
+    rebuilt = len(stale_pages)
+
+    removed = 0
+    for relative_path, entry in previous_pages.items():
+        if relative_path in manifest["pages"]:
+            continue
+        remove_output(os.path.join(destination_dir, entry["output"]), destination_dir)
+        removed += 1
+
+    finish_analysis(pages, template_path, destination_dir, search_index, link_graph, assets)
+    with tracing.span("save_manifest"):
+        save_manifest(manifest_path, manifest)
+    print(f"Rebuilt {rebuilt} pages, skipped {skipped} unchanged, removed {removed} stale")
+    return {"rebuilt": rebuilt, "skipped": skipped, "removed": removed}